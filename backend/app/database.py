@@ -1,5 +1,8 @@
 """Database connection and session management."""
 
+import json
+
+import orjson
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.config import settings
@@ -9,13 +12,24 @@ database_url = settings.DATABASE_URL.replace(
     "postgresql://", "postgresql+asyncpg://"
 )
 
+
+def _json_serializer(value) -> str:
+    """Serialize JSON/JSONB bind values with orjson"""
+    try:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+    except TypeError:
+        # e.g. ints wider than 64 bits
+        return json.dumps(value)
+
+
 # Create async engine
 engine = create_async_engine(
     database_url,
     echo=settings.LOG_LEVEL == "DEBUG",
     pool_pre_ping=True,
     pool_size=20,
-    max_overflow=10
+    max_overflow=10,
+    json_serializer=_json_serializer
 )
 
 # Create session factory
@@ -2,6 +2,7 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import logging
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -208,10 +209,27 @@ async def startup_event():
     # Start APScheduler
     start_scheduler()
     
+    # Periodically apply enrichment cache hit counters buffered in Redis
+    from app.services.enrichment_service import run_hit_count_flusher
+    app.state.hit_count_flusher = asyncio.create_task(run_hit_count_flusher())
+    
     logger.info("Application started successfully!")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown."""
-    logger.info("Shutting down Lead Generation Automation API...")
\ No newline at end of file
+    logger.info("Shutting down Lead Generation Automation API...")
+    
+    # Persist any write-behind enrichment cache rows and hit counters,
+    # then close pooled clients
+    from app.services.enrichment_service import (
+        flush_cache_writes, flush_hit_counts, close_http_clients
+    )
+    app.state.hit_count_flusher.cancel()
+    await flush_cache_writes()
+    await flush_hit_counts()
+    await close_http_clients()
+    
+    from app.services.export_service import export_service
+    await export_service.aclose()
\ No newline at end of file
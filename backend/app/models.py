@@ -22,6 +22,7 @@ import uuid
 import hashlib
 from uuid import uuid4
 from decimal import Decimal
+from typing import Optional, Tuple
 
 
 # ============================================================================
@@ -122,11 +123,14 @@ class ICP(Base):
     # Weight config - importance of each dimension
     weight_config = Column(JSONB, default={})
     # Example: {
-    #   "job_title": 40,
+    #   "seniority": 40,
     #   "company_size": 30,
     #   "industry": 20,
-    #   "seniority": 10
+    #   "tech_stack": 10
     # }
+    # Keys: industry, company_size, seniority, tech_stack, geography,
+    # company_type. When set, only the listed dimensions count (the score is
+    # their weighted mean); empty uses the engine's default weights.
     
     # ========================================================================
     # AUTO-QUALIFICATION THRESHOLDS
@@ -297,9 +301,10 @@ class ICP(Base):
         
         return rules
     
-    def matches_filters(self, lead):
-        """Check if a lead passes this ICP's filters"""
-        rules = self.get_scoring_rules()
+    def matches_filters(self, lead, rules=None):
+        """Check if a lead passes this ICP's filters (pass `rules` to reuse get_scoring_rules())"""
+        if rules is None:
+            rules = self.get_scoring_rules()
         filters = rules.get('filters', {})
         required = filters.get('required', {})
         
@@ -340,9 +345,10 @@ class ICP(Base):
         
         return True
     
-    def calculate_fit_score(self, lead):
-        """Calculate fit score for a lead (0-100)"""
-        rules = self.get_scoring_rules()
+    def calculate_fit_score(self, lead, rules=None):
+        """Calculate fit score for a lead (0-100) (pass `rules` to reuse get_scoring_rules())"""
+        if rules is None:
+            rules = self.get_scoring_rules()
         weights = rules.get('weights', {})
         score = 0.0
         
@@ -655,6 +661,80 @@ class Lead(Base):
         """Check if email is verified"""
         return self.email_verified == True
     
+    @property
+    def company_employee_count_int(self) -> Optional[int]:
+        """
+        company_employee_count as an int ("1,200" -> 1200), None if missing
+        or not a number. Parsed once per value and kept on the instance.
+        """
+        raw = self.company_employee_count
+        cached = getattr(self, '_employee_count_parsed', None)
+        if cached is not None and cached[0] == raw:
+            return cached[1]
+        
+        try:
+            value = int(str(raw).replace(',', '')) if raw else None
+        except (ValueError, AttributeError):
+            value = None
+        
+        self._employee_count_parsed = (raw, value)
+        return value
+    
+    def _lowered(self, field: str) -> str:
+        """Lowercased value of a text column ('' if empty), cached per value"""
+        raw = getattr(self, field)
+        cache = getattr(self, '_lowered_fields', None)
+        if cache is None:
+            cache = self._lowered_fields = {}
+        
+        cached = cache.get(field)
+        if cached is not None and cached[0] is raw:
+            return cached[1]
+        
+        value = (raw or "").lower()
+        cache[field] = (raw, value)
+        return value
+    
+    @property
+    def job_title_lc(self) -> str:
+        """job_title lowercased for case-insensitive matching"""
+        return self._lowered('job_title')
+    
+    @property
+    def company_industry_lc(self) -> str:
+        """company_industry lowercased for case-insensitive matching"""
+        return self._lowered('company_industry')
+    
+    @property
+    def company_description_lc(self) -> str:
+        """company_description lowercased for case-insensitive matching"""
+        return self._lowered('company_description')
+    
+    @property
+    def country_lc(self) -> str:
+        """country lowercased for case-insensitive matching"""
+        return self._lowered('country')
+    
+    @property
+    def tech_stack_lc(self) -> Tuple[str, ...]:
+        """
+        enrichment_data['tech_stack'] lowercased, empty if missing or not a
+        list. Cached on a snapshot of the list's contents, so in-place edits
+        (e.g. .append) are picked up too.
+        """
+        raw = (self.enrichment_data or {}).get('tech_stack')
+        if not isinstance(raw, list):
+            return ()
+        
+        snapshot = tuple(raw)
+        cached = getattr(self, '_tech_stack_lc', None)
+        if cached is not None and cached[0] == snapshot:
+            return cached[1]
+        
+        value = tuple(str(t).lower() for t in snapshot)
+        self._tech_stack_lc = (snapshot, value)
+        return value
+    
     def get_assignment_for_icp(self, icp_id):
         """Get assignment for specific ICP"""
         for assignment in self.icp_assignments:
@@ -844,6 +924,12 @@ class LeadICPAssignment(Base):
     icp = relationship("ICP", foreign_keys=[icp_id])
     processing_records = relationship("RawLeadProcessing", foreign_keys="RawLeadProcessing.assignment_id")
     
+    __table_args__ = (
+        # One assignment per (lead, ICP); its index also serves the
+        # existing-assignment checks and the reprocess anti-join
+        UniqueConstraint('lead_id', 'icp_id', name='uq_lead_icp_assignment'),
+    )
+    
     def __repr__(self):
         return f"<LeadICPAssignment(lead={self.lead_id}, icp={self.icp_id}, status='{self.status}', score={self.fit_score_percentage})>"
 # ============================================================================
@@ -1512,7 +1598,7 @@ class EnrichmentCache(Base):
     # Options: 'company_enrichment', 'email_verification', 'tech_stack'
     
     cache_key_hash = Column(String(64), nullable=False, index=True)  
-    # SHA256 hash of domain/email (e.g., hash('techcorp.com'))
+    # BLAKE2b-128 hash of domain/email (e.g., hash('techcorp.com')); older rows use SHA256
     
     # Cached data
     enrichment_data = Column(JSONB, nullable=False, default=dict)
@@ -1542,13 +1628,18 @@ class EnrichmentCache(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Composite index for fast lookups
+    # Composite index for fast lookups: matches _get_from_cache's
+    # (tenant_id, cache_key_hash) probe, and INCLUDE lets the expiry
+    # check run inside the index
     __table_args__ = (
         Index(
             'idx_enrichment_cache_lookup',
-            'tenant_id', 'cache_type', 'cache_key_hash'
+            'tenant_id', 'cache_key_hash',
+            postgresql_include=['expires_at']
         ),
         Index('idx_enrichment_cache_expires', 'expires_at'),
+        # Upsert target: one entry per key per tenant
+        UniqueConstraint('tenant_id', 'cache_key_hash', name='uq_enrichment_cache_tenant_key'),
     )
     
     # Relationships
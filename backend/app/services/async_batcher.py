@@ -0,0 +1,198 @@
+# backend/app/services/async_batcher.py
+"""
+Async Batch Coalescer / Write-Behind Buffer
+
+AsyncBatcher buffers lookups for a short window and flushes them together:
+- Identical keys inside a window share a single call
+- A batch flushes after `wait` seconds or once `max_size` keys are pending
+- Each caller awaits its own future and gets the shared result
+
+AsyncBulkWriter buffers writes the same way and hands each batch to one
+bulk flush function, so callers never wait on the write.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBatcher:
+    """
+    Coalesce concurrent async lookups into deduplicated batches
+
+    Usage:
+        batcher = AsyncBatcher(fetch_company, max_size=10, wait=0.2)
+        result = await batcher.add("acme.com")
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[Hashable], Awaitable[Any]],
+        max_size: int = 10,
+        wait: float = 0.2
+    ):
+        """
+        Args:
+            fn: Async function called once per unique key in a batch
+            max_size: Flush as soon as this many unique keys are pending
+            wait: Seconds to buffer before flushing a partial batch
+        """
+        self.fn = fn
+        self.max_size = max_size
+        self.wait = wait
+
+        self.pending: Dict[Hashable, List[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks; hold in-flight batches
+        self._tasks: set = set()
+
+        # Stats
+        self.calls_requested = 0
+        self.calls_made = 0
+
+    async def add(self, key: Hashable) -> Any:
+        """Queue a lookup for `key` and wait for its (possibly shared) result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        self.pending.setdefault(key, []).append(future)
+        self.calls_requested += 1
+
+        if len(self.pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Hand the pending batch to a background task"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self.pending:
+            return
+
+        batch, self.pending = self.pending, {}
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: Dict[Hashable, List[asyncio.Future]]):
+        """Run one call per unique key and fan results out to every waiter"""
+        keys = list(batch.keys())
+        self.calls_made += len(keys)
+
+        logger.debug(
+            f"📦 Flushing batch: {len(keys)} unique keys, "
+            f"{sum(len(f) for f in batch.values())} waiters"
+        )
+
+        results = await asyncio.gather(
+            *(self.fn(key) for key in keys),
+            return_exceptions=True
+        )
+
+        for key, result in zip(keys, results):
+            for future in batch[key]:
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def get_stats(self) -> Dict:
+        """Get batching stats"""
+        return {
+            "calls_requested": self.calls_requested,
+            "calls_made": self.calls_made,
+            "pending": len(self.pending),
+            "max_size": self.max_size,
+            "wait": self.wait,
+        }
+
+
+class AsyncBulkWriter:
+    """
+    Write-behind buffer that hands items to a bulk flush function
+
+    Usage:
+        writer = AsyncBulkWriter(insert_rows, max_size=50, wait=0.5)
+        writer.add(row)        # returns immediately
+        await writer.flush()   # e.g. on shutdown
+    """
+
+    def __init__(
+        self,
+        flush_fn: Callable[[List[Any]], Awaitable[None]],
+        max_size: int = 50,
+        wait: float = 0.5
+    ):
+        """
+        Args:
+            flush_fn: Async function receiving every buffered item at once
+            max_size: Flush as soon as this many items are buffered
+            wait: Seconds to buffer before flushing a partial batch
+        """
+        self.flush_fn = flush_fn
+        self.max_size = max_size
+        self.wait = wait
+
+        self.pending: List[Any] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+        # Stats
+        self.items_written = 0
+        self.flushes = 0
+
+    def add(self, item: Any):
+        """Buffer an item without waiting for it to be written"""
+        self.pending.append(item)
+
+        if len(self.pending) >= self.max_size:
+            self._schedule_flush()
+        elif self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.wait, self._schedule_flush)
+
+    def _schedule_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self.pending:
+            return
+
+        items, self.pending = self.pending, []
+        task = asyncio.ensure_future(self._write(items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, items: List[Any]):
+        try:
+            await self.flush_fn(items)
+            self.items_written += len(items)
+            self.flushes += 1
+        except Exception as e:
+            logger.error(f"Bulk write of {len(items)} items failed: {e}")
+
+    async def flush(self):
+        """Write everything buffered now and wait for in-flight writes"""
+        self._schedule_flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict:
+        """Get write-behind stats"""
+        return {
+            "items_written": self.items_written,
+            "flushes": self.flushes,
+            "pending": len(self.pending),
+            "max_size": self.max_size,
+            "wait": self.wait,
+        }
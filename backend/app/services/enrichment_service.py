@@ -2,25 +2,99 @@
 """
 Lead Enrichment Service - Multi-Source Orchestration
 Uses: Wappalyzer (tech) + SerpApi (company) + Google KG (employee count)
+      + optional Clearbit (company) and Apollo (fallback)
 """
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from decimal import Decimal
 import logging
+import asyncio
 import hashlib
+import re
+import time
 import requests
-import json
-from sqlalchemy.orm import Session
+import httpx
+import orjson
+from sqlalchemy import bindparam, select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
+import os
 
 from app.models import EnrichmentCache
 from app.redis_client import redis_client
+from app.services.async_batcher import AsyncBatcher, AsyncBulkWriter
+from app.services.provider_rate_limiter import ProviderRateLimiter
 from app.services.google_kg_service import create_google_kg_service
+from app.services.apollo_service import create_apollo_service
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+# Tech fingerprints almost always sit in <head> or early <body>, so
+# only the start of each page is downloaded and scanned
+TECH_SCAN_MAX_BYTES = 65536
+
+# Tech fingerprints found in page HTML: needle -> technology
+_TECH_SIGNATURES = {
+    "wordpress": "WordPress",
+    "wp-content": "WordPress",
+    "shopify": "Shopify",
+    "google-analytics.com": "Google Analytics",
+    "gtag": "Google Analytics",
+    "react": "React",
+}
+
+# Fingerprints in Server / X-Powered-By / Set-Cookie headers
+_HEADER_SIGNATURES = {
+    "cloudflare": "Cloudflare",
+    "wp_": "WordPress",
+    "wordpress_": "WordPress",
+    "_shopify": "Shopify",
+    "php": "PHP",
+    "express": "Express",
+    "next.js": "Next.js",
+}
+
+# Ordered so a later CMS wins, matching the original if-chain
+_TECH_DETAILS = {
+    "WordPress": {"category": "CMS", "cms": True, "analytics": False},
+    "Shopify": {"category": "E-commerce", "cms": True, "analytics": False},
+    "Google Analytics": {"category": None, "cms": False, "analytics": True},
+    "React": {"category": "JavaScript Framework", "cms": False, "analytics": False},
+    "Next.js": {"category": "JavaScript Framework", "cms": False, "analytics": False},
+    "Express": {"category": "Web Framework", "cms": False, "analytics": False},
+    "PHP": {"category": "Programming Language", "cms": False, "analytics": False},
+    "Cloudflare": {"category": "CDN", "cms": False, "analytics": False},
+}
+
+_BODY_TECHS = set(_TECH_SIGNATURES.values())
+
+
+def _compile_signatures(signatures: Dict[str, str]) -> "re.Pattern[bytes]":
+    """Build one case-insensitive bytes alternation (longest needle first)"""
+    needles = sorted(signatures, key=len, reverse=True)
+    return re.compile(
+        b"|".join(re.escape(needle.encode()) for needle in needles),
+        re.IGNORECASE
+    )
+
+
+_TECH_PATTERN = _compile_signatures(_TECH_SIGNATURES)
+_HEADER_PATTERN = _compile_signatures(_HEADER_SIGNATURES)
+
+# Bytes carried over between streamed chunks so a fingerprint split
+# across a chunk boundary still matches
+_TECH_OVERLAP = max(len(needle) for needle in _TECH_SIGNATURES) - 1
+
+
+class ProviderError(Exception):
+    """A provider call failed (timeout, rate limit, 5xx) rather than finding nothing"""
+
+
 class EnrichmentResult:
     """Result of enrichment with field-level tracking"""
     
@@ -56,6 +130,226 @@ class EnrichmentResult:
         }
 
 
+# One pooled HTTP/2 client for all Clearbit calls, so TLS sessions and
+# connections are reused across leads (closed on app shutdown)
+_clearbit_http = httpx.AsyncClient(
+    http2=True,
+    timeout=10.0,
+    limits=httpx.Limits(max_keepalive_connections=20)
+)
+
+
+class ClearbitClient:
+    """Clearbit Person/Company API client"""
+    
+    CLEARBIT_PERSON_URL = "https://person.clearbit.com/v2/combined/find"
+    CLEARBIT_COMPANY_URL = "https://company.clearbit.com/v2/companies/find"
+    
+    def __init__(self):
+        self.api_key = settings.CLEARBIT_API_KEY
+        self.enabled = settings.ENABLE_ENRICHMENT and bool(self.api_key)
+    
+    async def enrich_person(self, email: str) -> Optional[Dict[str, Any]]:
+        """
+        Enrich person data from Clearbit Person API.
+        Returns enrichment data or None if not found/disabled.
+        """
+        if not self.enabled:
+            logger.debug("Enrichment disabled or no API key")
+            return None
+        
+        try:
+            response = await _clearbit_http.get(
+                self.CLEARBIT_PERSON_URL,
+                params={"email": email},
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                logger.info(f"Person enrichment successful: {email}")
+                return self._parse_person_data(data)
+            elif response.status_code == 404:
+                logger.debug(f"No enrichment data found: {email}")
+                return None
+            else:
+                logger.warning(f"Clearbit API error {response.status_code}: {email}")
+                return None
+                    
+        except Exception as e:
+            logger.error(f"Enrichment failed for {email}: {e}")
+            return None
+    
+    async def enrich_company(self, domain: str, raise_errors: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Enrich company data from Clearbit Company API.
+        Returns enrichment data or None if not found/disabled. With
+        `raise_errors`, a failed call raises ProviderError instead of
+        returning None, so it can't be mistaken for "not found".
+        """
+        if not self.enabled:
+            return None
+        
+        try:
+            response = await _clearbit_http.get(
+                self.CLEARBIT_COMPANY_URL,
+                params={"domain": domain},
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                logger.info(f"Company enrichment successful: {domain}")
+                return self._parse_company_data(data)
+            elif response.status_code == 404:
+                logger.debug(f"No company data found: {domain}")
+                return None
+            else:
+                logger.warning(f"Clearbit API error {response.status_code}: {domain}")
+                if raise_errors:
+                    raise ProviderError(f"Clearbit API error {response.status_code}")
+                return None
+                    
+        except Exception as e:
+            logger.error(f"Company enrichment failed for {domain}: {e}")
+            if raise_errors:
+                if isinstance(e, ProviderError):
+                    raise
+                raise ProviderError(str(e)) from e
+            return None
+    
+    def _parse_person_data(self, data: Dict) -> Dict[str, Any]:
+        """Extract relevant fields from Clearbit person response."""
+        person = data.get('person', {})
+        company = data.get('company', {})
+        enriched_at = datetime.utcnow().isoformat()
+        
+        parsed = {
+            'source': 'clearbit',
+            'enriched_at': enriched_at,
+            'person': {},
+            'company': {}
+        }
+        
+        # Person data
+        if person:
+            name = person.get('name', {})
+            employment = person.get('employment', {})
+            
+            parsed['person'] = {
+                'first_name': name.get('givenName'),
+                'last_name': name.get('familyName'),
+                'job_title': employment.get('title'),
+                'seniority': employment.get('seniority'),
+                'role': employment.get('role'),
+                'linkedin_url': person.get('linkedin', {}).get('handle'),
+                'twitter_url': person.get('twitter', {}).get('handle'),
+                'location': person.get('location'),
+                'avatar': person.get('avatar')
+            }
+        
+        # Company data
+        if company:
+            parsed['company'] = self._parse_company_data(company, enriched_at)['company']
+        
+        return parsed
+    
+    def _parse_company_data(self, data: Dict, enriched_at: Optional[str] = None) -> Dict[str, Any]:
+        """Extract relevant fields from Clearbit company response."""
+        parsed = {
+            'source': 'clearbit',
+            'enriched_at': enriched_at or datetime.utcnow().isoformat(),
+            'company': {
+                'name': data.get('name'),
+                'domain': data.get('domain'),
+                'legal_name': data.get('legalName'),
+                'description': data.get('description'),
+                'industry': data.get('category', {}).get('industry'),
+                'sector': data.get('category', {}).get('sector'),
+                'tags': data.get('tags', []),
+                'employee_count': data.get('metrics', {}).get('employees'),
+                'employee_range': data.get('metrics', {}).get('employeesRange'),
+                'annual_revenue': data.get('metrics', {}).get('estimatedAnnualRevenue'),
+                'raised': data.get('metrics', {}).get('raised'),
+                'founded_year': data.get('foundedYear'),
+                'location': data.get('location'),
+                'phone': data.get('phone'),
+                'website': data.get('url'),
+                'logo_url': data.get('logo'),
+                'linkedin_url': data.get('linkedin', {}).get('handle'),
+                'twitter_url': data.get('twitter', {}).get('handle'),
+                'tech_stack': data.get('tech', [])
+            }
+        }
+        
+        return parsed
+    
+    async def enrich_lead(self, email: str, domain: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Enrich lead with both person and company data.
+        Returns combined enrichment data.
+        """
+        enrichment_data = {
+            'enriched': self.enabled,
+            'enriched_at': datetime.utcnow().isoformat(),
+            'person': None,
+            'company': None
+        }
+        
+        if not self.enabled:
+            return enrichment_data
+        
+        # Enrich person data
+        person_data = await self.enrich_person(email)
+        if person_data:
+            enrichment_data['person'] = person_data.get('person')
+            # Use company from person enrichment if available
+            if person_data.get('company'):
+                enrichment_data['company'] = person_data['company']
+        
+        # Enrich company data separately if we have a domain and no company data yet
+        if domain and not enrichment_data['company']:
+            company_data = await self.enrich_company(domain)
+            if company_data:
+                enrichment_data['company'] = company_data.get('company')
+        
+        return enrichment_data
+
+
+# Clearbit company fields -> flat enrichment fields used by the waterfall
+_CLEARBIT_FIELD_MAP = {
+    "description": "company_description",
+    "industry": "company_industry",
+    "employee_count": "company_employee_count",
+    "founded_year": "company_founded",
+    "location": "company_headquarters",
+    "annual_revenue": "company_revenue",
+    "tech_stack": "company_tech_stack",
+}
+
+# Fields each provider can fill; a provider is skipped when none of its
+# fields are missing on the lead
+PROVIDER_FIELDS: Dict[str, Set[str]] = {
+    "wappalyzer": {
+        "company_tech_stack", "company_tech_categories",
+        "company_cms", "company_analytics",
+    },
+    "serpapi": {
+        "company_description", "company_type",
+        "company_founded", "company_headquarters",
+    },
+    "google_kg": {
+        "company_description", "company_employee_count",
+        "company_founded", "company_revenue", "company_industry",
+    },
+    "clearbit": set(_CLEARBIT_FIELD_MAP.values()),
+    "apollo": {
+        "company_employee_count", "company_industry", "company_headquarters",
+        "company_founded", "company_revenue", "company_tech_stack",
+    },
+}
+
+
 class EnrichmentService:
     """
     Multi-source enrichment orchestration
@@ -65,27 +359,38 @@ class EnrichmentService:
     2. Wappalyzer - Tech stack (FREE)
     3. SerpApi - Company info ($0.002)
     4. Google KG - Employee count (FREE)
-    5. Store in cache
+    5. Clearbit - Company info (optional)
+    6. Apollo - Fallback for missing employee count/industry (optional, uses quota)
+    7. Store in cache
     """
     
     def __init__(
         self,
-        db: Session,
+        db: AsyncSession,
         serpapi_key: str = None,
         google_maps_key: str = None,
         enable_wappalyzer: bool = True,
         enable_serpapi: bool = True,
-        enable_google_maps: bool = False
+        enable_google_maps: bool = False,
+        enable_clearbit: bool = False,
+        enable_apollo: bool = False
     ):
         self.db = db
         self.serpapi_key = serpapi_key
         self.google_maps_key = google_maps_key
         self.cache_ttl_days = 90
+        self.negative_cache_ttl_days = 7
         
         # Feature flags
         self.enable_wappalyzer = enable_wappalyzer
         self.enable_serpapi = enable_serpapi
         self.enable_google_maps = enable_google_maps
+        self.enable_clearbit = enable_clearbit and clearbit_client.enabled
+        self.enable_apollo = enable_apollo
+        
+        # Provider clients are shared across instances (one service is built per lead)
+        self._google_kg = _shared_client("google_kg", create_google_kg_service)
+        self._apollo = _shared_client("apollo", create_apollo_service) if enable_apollo else None
         
         # Log enabled providers
         enabled = []
@@ -96,6 +401,10 @@ class EnrichmentService:
         if self.enable_google_maps and self.google_maps_key:
             enabled.append("Google Maps")
         enabled.append("Google KG")  # Always available if API key set
+        if self.enable_clearbit:
+            enabled.append("Clearbit")
+        if self.enable_apollo:
+            enabled.append("Apollo")
         
         logger.info(f"Enrichment providers enabled: {', '.join(enabled) or 'None'}")
     
@@ -105,13 +414,15 @@ class EnrichmentService:
         company_domain: Optional[str],
         company_name: Optional[str],
         tenant_id: str,
-        icp_id: str
+        icp_id: str,
+        missing_fields: Optional[Set[str]] = None
     ) -> EnrichmentResult:
         """Enrich lead with ICP-specific provider configuration"""
         from app.models import ICP
         
         # Get ICP configuration
-        icp = self.db.query(ICP).filter(ICP.id == uuid.UUID(icp_id)).first()
+        result = await self.db.execute(select(ICP).where(ICP.id == uuid.UUID(icp_id)))
+        icp = result.scalar_one_or_none()
         
         if not icp or not icp.enrichment_enabled:
             logger.info(f"Enrichment disabled for ICP {icp_id}")
@@ -129,7 +440,8 @@ class EnrichmentService:
             email=email,
             company_domain=company_domain,
             company_name=company_name,
-            tenant_id=tenant_id
+            tenant_id=tenant_id,
+            missing_fields=missing_fields
         )
     
     async def enrich_lead(
@@ -137,14 +449,19 @@ class EnrichmentService:
         email: str,
         company_domain: Optional[str],
         company_name: Optional[str],
-        tenant_id: str
+        tenant_id: str,
+        missing_fields: Optional[Set[str]] = None
     ) -> EnrichmentResult:
         """
-        ✅ UPDATED: 3-source enrichment waterfall
+        Multi-source enrichment waterfall
+        
+        Wappalyzer → SerpApi → Google KG → Clearbit, then Apollo as a
+        fallback for missing critical fields
         
-        Wappalyzer → SerpApi → Google KG
+        If `missing_fields` is given, providers that can't fill any of
+        those fields are skipped (see PROVIDER_FIELDS).
         """
-        start_time = datetime.utcnow()
+        start_ns = time.monotonic_ns()
         
         # Determine cache key
         cache_key = company_domain or email
@@ -152,10 +469,28 @@ class EnrichmentService:
         
         # Check cache first
         try:
-            cached = await self._get_from_cache(cache_hash, tenant_id)
+            cached = await self._get_from_cache(
+                cache_hash, tenant_id, legacy_hash=self._legacy_hash_key(cache_key)
+            )
+            if cached and cached.get("enriched_data", {}).get("_negative"):
+                logger.info(f"Negative cache hit for {cache_key}")
+                try:
+                    await redis_client.incr("enrich:negative_hits")
+                except:
+                    pass
+                return EnrichmentResult(
+                    success=True,
+                    fields_added=[],
+                    enriched_data={},
+                    cache_hit=True,
+                    cost=0.0,
+                    providers_used=[],
+                    processing_time_ms=self._elapsed_ms(start_ns)
+                )
+            
             if cached:
                 logger.info(f"Cache hit for {cache_key}")
-                processing_time = self._elapsed_ms(start_time)
+                processing_time = self._elapsed_ms(start_ns)
                 return EnrichmentResult(
                     success=True,
                     fields_added=list(cached.get("enriched_data", {}).keys()),
@@ -168,59 +503,163 @@ class EnrichmentService:
         except Exception as e:
             logger.warning(f"Cache check failed for {cache_key}: {e}")
         
-        # Cache miss - enrich from sources
+        # Cache miss - if another lead is already enriching this key,
+        # share its result instead of paying for the same calls again
+        inflight_key = f"{tenant_id}:{cache_hash}"
+        if missing_fields:
+            inflight_key += ":" + ",".join(sorted(missing_fields))
+        pending = _inflight.get(inflight_key)
+        if pending:
+            logger.info(f"Joining in-flight enrichment for {cache_key}")
+            shared = await asyncio.shield(pending)
+            return EnrichmentResult(
+                success=shared.success,
+                fields_added=shared.fields_added,
+                enriched_data=shared.enriched_data,
+                cache_hit=True,
+                cost=0.0,
+                providers_used=shared.providers_used,
+                error=shared.error,
+                processing_time_ms=self._elapsed_ms(start_ns)
+            )
+        
+        task = asyncio.ensure_future(self._enrich_from_sources(
+            email=email,
+            company_domain=company_domain,
+            company_name=company_name,
+            tenant_id=tenant_id,
+            cache_key=cache_key,
+            cache_hash=cache_hash,
+            start_ns=start_ns,
+            missing_fields=missing_fields
+        ))
+        _inflight[inflight_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(inflight_key, None))
+        return await asyncio.shield(task)
+    
+    async def _enrich_from_sources(
+        self,
+        email: str,
+        company_domain: Optional[str],
+        company_name: Optional[str],
+        tenant_id: str,
+        cache_key: str,
+        cache_hash: str,
+        start_ns: int,
+        missing_fields: Optional[Set[str]] = None
+    ) -> EnrichmentResult:
+        """Run the provider waterfall for a cache miss and cache the result"""
         logger.info(f"Cache miss for {cache_key}, enriching...")
         
         all_enriched_data = {}
         fields_added = []
         providers_used = []
         total_cost = 0.0
+        provider_errors = 0
+        
+        # Skip providers whose fields the caller already has
+        skipped = []
+        
+        def wanted(provider: str) -> bool:
+            if not missing_fields or PROVIDER_FIELDS[provider] & missing_fields:
+                return True
+            skipped.append(provider)
+            return False
+        
+        # Providers are independent, so fan them out concurrently:
+        # (name, coroutine, cost per successful call)
+        tasks = []
         
         # 1️⃣ Wappalyzer (tech stack - FREE)
-        if self.enable_wappalyzer and company_domain:
-            try:
-                wapp_result = await self._enrich_from_wappalyzer(company_domain)
-                if wapp_result:
-                    all_enriched_data.update(wapp_result)
-                    fields_added.extend(wapp_result.keys())
-                    providers_used.append("wappalyzer")
-                    logger.info(f"  ✅ Wappalyzer: Added {len(wapp_result)} fields")
-            except Exception as e:
-                logger.warning(f"Wappalyzer failed for {cache_key}: {e}")
+        if self.enable_wappalyzer and company_domain and wanted("wappalyzer"):
+            tasks.append(("wappalyzer", self._enrich_from_wappalyzer(company_domain), 0.0))
         
         # 2️⃣ SerpApi (company info - $0.002)
-        if self.enable_serpapi and self.serpapi_key and company_name:
-            try:
-                serp_result = await self._enrich_from_serpapi(company_name)
-                if serp_result:
-                    all_enriched_data.update(serp_result)
-                    fields_added.extend(serp_result.keys())
-                    providers_used.append("serpapi")
-                    total_cost += 0.002
-                    logger.info(f"  ✅ SerpApi: Added {len(serp_result)} fields, cost=$0.002")
-            except Exception as e:
-                logger.warning(f"SerpApi failed for {cache_key}: {e}")
+        if self.enable_serpapi and self.serpapi_key and company_name and wanted("serpapi"):
+            tasks.append(("serpapi", self._enrich_from_serpapi(company_name), 0.002))
         
         # 3️⃣ Google Knowledge Graph (employee count - FREE)
-        if company_name and not all_enriched_data.get('company_employee_count'):
+        if company_name and wanted("google_kg"):
+            tasks.append(("google_kg", self._enrich_from_google_kg(company_name, company_domain), 0.0))
+        
+        # 4️⃣ Clearbit (company info - $0.10, opt-in)
+        if self.enable_clearbit and company_domain and wanted("clearbit"):
+            tasks.append(("clearbit", self._enrich_from_clearbit(company_domain), 0.10))
+        
+        if skipped:
+            logger.info(f"  ⏭️ Skipping providers with nothing missing to fill: {skipped}")
+        
+        if missing_fields and not tasks and not (
+            self.enable_apollo and company_domain and PROVIDER_FIELDS["apollo"] & missing_fields
+        ):
+            # Nothing we can fill - don't count this as a failure
+            return EnrichmentResult(
+                success=True,
+                fields_added=[],
+                enriched_data={},
+                cache_hit=False,
+                cost=0.0,
+                providers_used=[],
+                processing_time_ms=self._elapsed_ms(start_ns)
+            )
+        
+        results = await asyncio.gather(*(coro for _, coro, _ in tasks), return_exceptions=True)
+        
+        # Merge in waterfall order, only filling fields we don't already have
+        for (provider, _, cost), result in zip(tasks, results):
+            if isinstance(result, Exception):
+                logger.warning(f"{provider} failed for {cache_key}: {result}")
+                provider_errors += 1
+                continue
+            if not result:
+                continue
+            if provider == "google_kg" and all_enriched_data.get('company_employee_count'):
+                continue
+            
+            self._merge_missing(all_enriched_data, fields_added, result)
+            providers_used.append(provider)
+            total_cost += cost
+            logger.info(f"  ✅ {provider}: Added {list(result.keys())}, cost=${cost}")
+        
+        # 5️⃣ Apollo (fallback for missing critical data - uses quota)
+        critical_missing = [
+            field for field in ("company_employee_count", "company_industry")
+            if not all_enriched_data.get(field)
+        ]
+        if self.enable_apollo and company_domain and critical_missing and wanted("apollo"):
+            logger.info(f"  ℹ️ Missing critical fields: {critical_missing}, trying Apollo...")
             try:
-                kg_result = await self._enrich_from_google_kg(company_name, company_domain)
-                if kg_result:
-                    # Only add fields we don't already have
-                    for key, value in kg_result.items():
-                        if key not in all_enriched_data or not all_enriched_data[key]:
-                            all_enriched_data[key] = value
-                            if key not in fields_added:
-                                fields_added.append(key)
-                    providers_used.append("google_kg")
-                    logger.info(f"  ✅ Google KG: Added {list(kg_result.keys())}")
+                apollo_result = await self._enrich_from_apollo(company_domain, company_name)
+                if apollo_result:
+                    self._merge_missing(all_enriched_data, fields_added, apollo_result)
+                    providers_used.append("apollo")
+                    logger.info(f"  ✅ apollo: Added {list(apollo_result.keys())}")
             except Exception as e:
-                logger.warning(f"Google KG failed for {cache_key}: {e}")
+                logger.warning(f"apollo failed for {cache_key}: {e}")
+                provider_errors += 1
         
         # Check if we got ANY data
         if not all_enriched_data:
             logger.warning(f"No enrichment data obtained for {cache_key}")
-            processing_time = self._elapsed_ms(start_time)
+            
+            # Remember clean "nothing found" answers so the next lead for
+            # this key doesn't pay for the same lookups again; don't cache
+            # when a provider errored (may be transient), was skipped, or
+            # no provider was asked at all
+            if tasks and not provider_errors and not skipped:
+                try:
+                    await self._save_to_cache(
+                        cache_hash=cache_hash,
+                        tenant_id=tenant_id,
+                        enriched_data={"_negative": True},
+                        providers_used=providers_used,
+                        cost=total_cost,
+                        ttl_days=self.negative_cache_ttl_days
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to save negative cache for {cache_key}: {e}")
+            
+            processing_time = self._elapsed_ms(start_ns)
             return EnrichmentResult(
                 success=False,
                 error="All enrichment providers failed",
@@ -232,19 +671,20 @@ class EnrichmentService:
                 processing_time_ms=processing_time
             )
         
-        # Store in cache
+        # Store in cache (a partial run would hide fields from later callers)
         try:
-            await self._save_to_cache(
-                cache_hash=cache_hash,
-                tenant_id=tenant_id,
-                enriched_data=all_enriched_data,
-                providers_used=providers_used,
-                cost=total_cost
-            )
+            if not skipped:
+                await self._save_to_cache(
+                    cache_hash=cache_hash,
+                    tenant_id=tenant_id,
+                    enriched_data=all_enriched_data,
+                    providers_used=providers_used,
+                    cost=total_cost
+                )
         except Exception as e:
             logger.warning(f"Failed to save to cache for {cache_key}: {e}")
         
-        processing_time = self._elapsed_ms(start_time)
+        processing_time = self._elapsed_ms(start_ns)
         
         logger.info(
             f"✅ Enrichment complete: {len(fields_added)} fields, "
@@ -262,67 +702,59 @@ class EnrichmentService:
         )
     
     async def _enrich_from_wappalyzer(self, domain: str) -> Dict:
-        """Get tech stack using direct detection"""
-        try:
-            tech_data = await self._detect_tech_stack_direct(domain)
-            
-            if tech_data:
-                return {
-                    "company_tech_stack": tech_data.get("technologies", []),
-                    "company_tech_categories": tech_data.get("categories", []),
-                    "company_cms": tech_data.get("cms"),
-                    "company_analytics": tech_data.get("analytics", [])
-                }
-            
-            return {}
-        except Exception as e:
-            logger.error(f"Tech stack error for {domain}: {e}")
-            return {}
+        """Get tech stack using direct detection (raises ProviderError if the scan failed)"""
+        tech_data = await _wappalyzer_batcher.add(domain.lower())
+        
+        # A completed scan always returns its keys, even with nothing found;
+        # an empty dict means the site couldn't be fetched
+        if not tech_data:
+            raise ProviderError(f"Tech detection failed for {domain}")
+        
+        return {
+            "company_tech_stack": tech_data.get("technologies", []),
+            "company_tech_categories": tech_data.get("categories", []),
+            "company_cms": tech_data.get("cms"),
+            "company_analytics": tech_data.get("analytics", [])
+        }
     
-    async def _detect_tech_stack_direct(self, domain: str) -> Dict:
+    @staticmethod
+    async def _detect_tech_stack_direct(domain: str) -> Dict:
         """Direct tech detection by fetching website"""
         try:
             if not domain.startswith('http'):
                 domain = f"https://{domain}"
             
-            response = requests.get(
-                domain,
-                headers={'User-Agent': 'Mozilla/5.0'},
-                timeout=10,
-                allow_redirects=True
-            )
+            async with _wappalyzer_limiter:
+                headers, found = await asyncio.to_thread(
+                    EnrichmentService._scan_page, domain
+                )
             
-            html = response.text.lower()
+            # Response headers carry strong signals for free
+            header_text = " ".join(
+                headers.get(name, "") for name in ("server", "x-powered-by", "set-cookie")
+            ).encode()
+            for match in _HEADER_PATTERN.finditer(header_text):
+                found.add(_HEADER_SIGNATURES[match.group().lower().decode()])
             
             technologies = []
             categories = []
             cms = None
             analytics = []
             
-            # Detect CMS
-            if 'wordpress' in html or 'wp-content' in html:
-                cms = "WordPress"
-                technologies.append("WordPress")
-                categories.append("CMS")
-            
-            if 'shopify' in html or 'cdn.shopify.com' in html:
-                cms = "Shopify"
-                technologies.append("Shopify")
-                categories.append("E-commerce")
-            
-            # Detect analytics
-            if 'google-analytics.com' in html or 'gtag' in html:
-                analytics.append("Google Analytics")
-                technologies.append("Google Analytics")
-            
-            # Detect frameworks
-            if 'react' in html or '__react' in html:
-                technologies.append("React")
-                categories.append("JavaScript Framework")
+            for tech, details in _TECH_DETAILS.items():
+                if tech not in found:
+                    continue
+                technologies.append(tech)
+                if details["category"] and details["category"] not in categories:
+                    categories.append(details["category"])
+                if details["cms"]:
+                    cms = tech
+                if details["analytics"]:
+                    analytics.append(tech)
             
             return {
-                "technologies": list(set(technologies)),
-                "categories": list(set(categories)),
+                "technologies": technologies,
+                "categories": categories,
                 "cms": cms,
                 "analytics": analytics
             }
@@ -330,28 +762,72 @@ class EnrichmentService:
             logger.error(f"Direct tech detection failed for {domain}: {e}")
             return {}
     
+    @staticmethod
+    def _scan_page(url: str) -> Tuple[Dict, Set[str]]:
+        """
+        Stream a page and match body fingerprints chunk by chunk
+        
+        Each chunk is scanned as it arrives; the download stops once every
+        body fingerprint has matched or TECH_SCAN_MAX_BYTES have been read.
+        Returns the response headers and the technologies found.
+        """
+        response = requests.get(
+            url,
+            headers={'User-Agent': 'Mozilla/5.0'},
+            timeout=10,
+            allow_redirects=True,
+            stream=True
+        )
+        try:
+            found = set()
+            tail = b""
+            read = 0
+            for chunk in response.iter_content(16384):
+                chunk = chunk[:TECH_SCAN_MAX_BYTES - read]
+                read += len(chunk)
+                window = tail + chunk
+                for match in _TECH_PATTERN.finditer(window):
+                    found.add(_TECH_SIGNATURES[match.group().lower().decode()])
+                if _BODY_TECHS <= found or read >= TECH_SCAN_MAX_BYTES:
+                    break
+                tail = window[-_TECH_OVERLAP:]
+            return response.headers, found
+        finally:
+            response.close()
+    
     async def _enrich_from_serpapi(self, query: str) -> Dict:
-        """Get company info using SerpApi"""
+        """Get company info using SerpApi (coalesced across concurrent leads)"""
         if not self.serpapi_key:
             return {}
         
+        return await _serpapi_batcher.add((self.serpapi_key, query))
+    
+    @staticmethod
+    async def _search_serpapi(api_key: str, query: str) -> Dict:
+        """Run a single SerpApi search"""
         try:
             url = "https://serpapi.com/search"
             
             params = {
-                "api_key": self.serpapi_key,
+                "api_key": api_key,
                 "q": f"{query} company",
                 "num": 1,
-                "engine": "google"
+                "engine": "google",
+                # Only the knowledge graph is used - have SerpApi drop
+                # organic results etc. from the payload
+                "json_restrictor": "knowledge_graph"
             }
             
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+            async with _serpapi_limiter:
+                response = await asyncio.to_thread(requests.get, url, params=params, timeout=10)
+            
+            # 429/5xx bodies carry no knowledge graph; don't read them as "not found"
+            response.raise_for_status()
             
             enriched = {}
             
             # Extract knowledge graph
-            knowledge_graph = data.get("knowledge_graph", {})
+            knowledge_graph = orjson.loads(response.content).get("knowledge_graph", {})
             
             if knowledge_graph:
                 if "description" in knowledge_graph:
@@ -366,59 +842,98 @@ class EnrichmentService:
             return enriched
         except Exception as e:
             logger.error(f"SerpApi error for {query}: {e}")
-            return {}
+            raise
     
     async def _enrich_from_google_kg(self, company_name: str, company_domain: str = None) -> Dict:
         """
         ✅ NEW: Enrich from Google Knowledge Graph (FREE)
         
-        Gets: employee count, founded year, revenue, description
+        Gets: employee count, founded year, revenue, description.
+        Lookup errors propagate so they aren't cached as "not found".
         """
-        try:
-            google_kg = create_google_kg_service()
-            result = await google_kg.enrich_company(company_name, company_domain)
-            
-            if result:
-                logger.info(f"  ✅ Google KG enriched: {list(result.keys())}")
-                return result
-            
-            return {}
-            
-        except Exception as e:
-            logger.error(f"Google KG enrichment error: {e}")
+        result = await self._google_kg.enrich_company(company_name, company_domain)
+        
+        if result:
+            logger.info(f"  ✅ Google KG enriched: {list(result.keys())}")
+            return result
+        
+        return {}
+    
+    async def _enrich_from_clearbit(self, domain: str) -> Dict:
+        """Get company info from Clearbit, mapped to flat enrichment fields"""
+        company_data = await clearbit_client.enrich_company(domain, raise_errors=True)
+        if not company_data:
             return {}
+        
+        company = company_data.get("company", {})
+        return {
+            field: company[source]
+            for source, field in _CLEARBIT_FIELD_MAP.items()
+            if company.get(source)
+        }
+    
+    async def _enrich_from_apollo(self, domain: str, company_name: str = None) -> Dict:
+        """Get company info from Apollo (fallback, uses quota)"""
+        return await self._apollo.enrich_company(domain, company_name)
+    
+    @staticmethod
+    def _merge_missing(enriched_data: Dict, fields_added: List[str], result: Dict):
+        """Merge a provider result, only filling fields we don't already have"""
+        for key, value in result.items():
+            if key not in enriched_data or not enriched_data[key]:
+                enriched_data[key] = value
+                if key not in fields_added:
+                    fields_added.append(key)
     
-    async def _get_from_cache(self, cache_hash: str, tenant_id: str) -> Optional[Dict]:
-        """Get enrichment from cache"""
+    async def _get_from_cache(
+        self,
+        cache_hash: str,
+        tenant_id: str,
+        legacy_hash: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Get enrichment from cache
+        
+        Redis is authoritative for hits; on a Redis miss the row is read
+        from Postgres. Hits are counted in Redis (see flush_hit_counts), so
+        a cache hit never writes to Postgres. `legacy_hash` also matches
+        rows written with the old SHA-256 key.
+        """
         cache_key = f"enrich:{tenant_id}:{cache_hash}"
         
         try:
             cached = await redis_client.get(cache_key)
             if cached:
-                return json.loads(cached)
+                await _count_hit(tenant_id, cache_hash)
+                return orjson.loads(cached)
         except:
             pass
         
-        cached = self.db.query(EnrichmentCache).filter(
-            EnrichmentCache.cache_key_hash == cache_hash,
-            EnrichmentCache.tenant_id == uuid.UUID(tenant_id),
-            EnrichmentCache.expires_at > datetime.utcnow()
-        ).first()
+        result = await self.db.execute(
+            select(EnrichmentCache.enrichment_data, EnrichmentCache.cache_key_hash)
+            .where(
+                EnrichmentCache.tenant_id == uuid.UUID(tenant_id),
+                EnrichmentCache.cache_key_hash.in_([cache_hash, legacy_hash])
+                if legacy_hash else EnrichmentCache.cache_key_hash == cache_hash,
+                EnrichmentCache.expires_at > datetime.utcnow()
+            )
+            .limit(1)
+        )
+        row = result.first()
         
-        if cached:
+        if row:
             result = {
-                "enriched_data": cached.enrichment_data,
-                "providers_used": cached.enrichment_data.get("_providers", [])
+                "enriched_data": row.enrichment_data,
+                "providers_used": row.enrichment_data.get("_providers", [])
             }
             
+            await _count_hit(tenant_id, row.cache_key_hash)
+            
             try:
-                await redis_client.setex(cache_key, 86400, json.dumps(result))
+                await redis_client.setex(cache_key, 86400, orjson.dumps(result))
             except:
                 pass
             
-            cached.hit_count = (cached.hit_count or 0) + 1
-            self.db.commit()
-            
             return result
         
         return None
@@ -429,47 +944,264 @@ class EnrichmentService:
         tenant_id: str,
         enriched_data: Dict,
         providers_used: List[str],
-        cost: float
+        cost: float,
+        ttl_days: Optional[int] = None
     ):
-        """Save enrichment to cache"""
+        """
+        Save enrichment to cache (write-behind)
+        
+        The entry goes to Redis immediately so it is visible to the next
+        lead; the Postgres row is buffered and bulk-inserted off the
+        request path.
+        """
+        now = datetime.utcnow()
         enriched_data["_providers"] = providers_used
-        enriched_data["_cached_at"] = datetime.utcnow().isoformat()
-        
-        completeness = len([v for v in enriched_data.values() if v]) / len(enriched_data) * 100
-        
-        cache_entry = EnrichmentCache(
-            id=uuid.uuid4(),
-            tenant_id=uuid.UUID(tenant_id),
-            cache_type="company_enrichment",
-            cache_key_hash=cache_hash,
-            enrichment_data=enriched_data,
-            provider=",".join(providers_used),
-            api_cost=Decimal(str(cost)),
-            completeness_score=Decimal(str(completeness)),
-            hit_count=0,
-            expires_at=datetime.utcnow() + timedelta(days=self.cache_ttl_days),
-            created_at=datetime.utcnow()
-        )
+        enriched_data["_cached_at"] = now.isoformat()
         
-        self.db.add(cache_entry)
-        self.db.commit()
+        try:
+            await redis_client.setex(
+                f"enrich:{tenant_id}:{cache_hash}",
+                86400,
+                orjson.dumps({"enriched_data": enriched_data, "providers_used": providers_used})
+            )
+        except:
+            pass
+        
+        filled = sum(1 for v in enriched_data.values() if v)
+        completeness = filled * 100 / len(enriched_data) if enriched_data else 0.0
+        
+        _cache_writer.add({
+            "id": uuid.uuid4(),
+            "tenant_id": uuid.UUID(tenant_id),
+            "cache_type": "company_enrichment",
+            "cache_key_hash": cache_hash,
+            "enrichment_data": enriched_data,
+            "provider": ",".join(providers_used),
+            "api_cost": Decimal(str(cost)),
+            "completeness_score": Decimal(str(completeness)),
+            "hit_count": 0,
+            "expires_at": now + timedelta(days=ttl_days or self.cache_ttl_days),
+            "created_at": now
+        })
     
     def _hash_key(self, key: str) -> str:
-        """Generate cache key hash"""
+        """Generate cache key hash (non-cryptographic use, 128 bits is plenty)"""
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    
+    def _legacy_hash_key(self, key: str) -> str:
+        """
+        SHA-256 key used before the switch to BLAKE2b
+        
+        Only needed to read rows cached before the switch; drop once
+        they have expired (cache_ttl_days).
+        """
         return hashlib.sha256(key.encode()).hexdigest()
     
-    def _elapsed_ms(self, start_time: datetime) -> int:
-        """Calculate elapsed milliseconds"""
-        return int((datetime.utcnow() - start_time).total_seconds() * 1000)
+    def _elapsed_ms(self, start_ns: int) -> int:
+        """Calculate elapsed milliseconds since a time.monotonic_ns() reading"""
+        return (time.monotonic_ns() - start_ns) // 1_000_000
+
+
+# Provider clients created on first use (after env/config is loaded)
+_shared_clients: Dict[str, Any] = {}
+
+
+def _shared_client(name: str, factory):
+    """Return the process-wide provider client, creating it on first use"""
+    client = _shared_clients.get(name)
+    if client is None:
+        client = _shared_clients[name] = factory()
+    return client
+
+
+# In-flight cache-miss enrichments keyed by "tenant_id:cache_hash"
+_inflight: Dict[str, asyncio.Future] = {}
+
+# Clearbit client shared by the waterfall and the person/company pipeline
+clearbit_client = ClearbitClient()
+
+# Shared by every EnrichmentService instance (one is built per lead), so
+# limits hold across concurrent enrichments and duplicate queries/domains
+# collapse into one call
+_serpapi_limiter = ProviderRateLimiter(
+    "serpapi",
+    max_rate=float(os.getenv("SERPAPI_MAX_RATE", "10")),
+    time_period=1.0,
+    max_concurrency=8
+)
+_wappalyzer_limiter = ProviderRateLimiter(
+    "wappalyzer",
+    max_rate=float(os.getenv("WAPPALYZER_MAX_RATE", "20")),
+    time_period=1.0,
+    max_concurrency=16
+)
+_serpapi_batcher = AsyncBatcher(
+    lambda key: EnrichmentService._search_serpapi(*key),
+    max_size=10,
+    wait=0.2
+)
+_wappalyzer_batcher = AsyncBatcher(
+    EnrichmentService._detect_tech_stack_direct,
+    max_size=10,
+    wait=0.2
+)
+
+
+# Cleared the first time the database turns out to lack
+# uq_enrichment_cache_tenant_key; later flushes go straight to a plain INSERT
+_cache_upsert_supported = True
+
+
+async def _write_cache_rows(rows: List[Dict]):
+    """
+    Upsert buffered cache rows in one multi-row INSERT
+    
+    Uses its own session: the request that produced a row may have
+    closed its session by the time the batch is flushed.
+    ON CONFLICT (tenant_id, cache_key_hash) refreshes the existing entry,
+    so concurrent misses for the same key can't create duplicate rows.
+    Databases that predate uq_enrichment_cache_tenant_key fall back to
+    a plain INSERT, as before the constraint existed.
+    """
+    global _cache_upsert_supported
+    from app.database import AsyncSessionLocal
+    
+    # Postgres rejects one INSERT touching the same key twice; last write wins
+    unique_rows = {(row["tenant_id"], row["cache_key_hash"]): row for row in rows}
+    insert_stmt = pg_insert(EnrichmentCache).values(list(unique_rows.values()))
+    
+    async with AsyncSessionLocal() as db:
+        if _cache_upsert_supported:
+            stmt = insert_stmt.on_conflict_do_update(
+                index_elements=["tenant_id", "cache_key_hash"],
+                set_={
+                    "enrichment_data": insert_stmt.excluded.enrichment_data,
+                    "provider": insert_stmt.excluded.provider,
+                    "api_cost": insert_stmt.excluded.api_cost,
+                    "completeness_score": insert_stmt.excluded.completeness_score,
+                    "expires_at": insert_stmt.excluded.expires_at,
+                    "updated_at": insert_stmt.excluded.created_at,
+                }
+            )
+            
+            try:
+                await db.execute(stmt)
+                await db.commit()
+                return
+            except DBAPIError as e:
+                await db.rollback()
+                if "no unique or exclusion constraint" not in str(e):
+                    logger.warning(f"Failed to write {len(unique_rows)} cache rows: {e}")
+                    return
+                _cache_upsert_supported = False
+                logger.warning(
+                    "enrichment_cache is missing uq_enrichment_cache_tenant_key; "
+                    "using plain INSERT for cache writes from now on"
+                )
+            except Exception as e:
+                logger.warning(f"Failed to write {len(unique_rows)} cache rows: {e}")
+                await db.rollback()
+                return
+        
+        try:
+            await db.execute(insert_stmt)
+            await db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to write {len(unique_rows)} cache rows: {e}")
+            await db.rollback()
+
+
+_cache_writer = AsyncBulkWriter(_write_cache_rows, max_size=50, wait=0.5)
+
+
+# Cache hit counters, buffered in one Redis hash ("tenant_id:cache_hash" ->
+# hits) and applied to Postgres periodically. hit_count is analytics-only,
+# so lagging by a flush interval is fine.
+HIT_COUNTS_KEY = "enrich:hit_counts"
+HIT_COUNT_FLUSH_INTERVAL = 60
+
+
+async def _count_hit(tenant_id: str, cache_hash: str):
+    try:
+        await redis_client.hincrby(HIT_COUNTS_KEY, f"{tenant_id}:{cache_hash}", 1)
+    except Exception as e:
+        logger.debug(f"Failed to count cache hit: {e}")
+
+
+async def flush_hit_counts():
+    """Apply buffered Redis hit counters to enrichment_cache.hit_count"""
+    from app.database import AsyncSessionLocal
+    
+    flushing_key = f"{HIT_COUNTS_KEY}:flushing"
+    try:
+        # RENAME is atomic, so hits counted during the flush land in a fresh hash
+        await redis_client.rename(HIT_COUNTS_KEY, flushing_key)
+    except Exception:
+        return  # No hits since the last flush
+    
+    counts = await redis_client.hgetall(flushing_key) or {}
+    params = []
+    for field, hits in counts.items():
+        if isinstance(field, bytes):
+            field = field.decode()
+        tenant_id, cache_hash = field.split(":", 1)
+        params.append({"t_id": uuid.UUID(tenant_id), "key_hash": cache_hash, "hits": int(hits)})
+    
+    if params:
+        table = EnrichmentCache.__table__
+        stmt = (
+            table.update()
+            .where(
+                table.c.tenant_id == bindparam("t_id"),
+                table.c.cache_key_hash == bindparam("key_hash")
+            )
+            .values(hit_count=func.coalesce(table.c.hit_count, 0) + bindparam("hits"))
+        )
+        async with AsyncSessionLocal() as db:
+            try:
+                await db.execute(stmt, params)
+                await db.commit()
+                logger.info(f"📈 Flushed hit counts for {len(params)} cache entries")
+            except Exception as e:
+                logger.warning(f"Failed to flush {len(params)} cache hit counts: {e}")
+                await db.rollback()
+    
+    await redis_client.delete(flushing_key)
+
+
+async def run_hit_count_flusher(interval: float = HIT_COUNT_FLUSH_INTERVAL):
+    """Background loop flushing hit counters every `interval` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await flush_hit_counts()
+        except Exception as e:
+            logger.warning(f"Hit count flush failed: {e}")
+
+
+async def flush_cache_writes():
+    """Write any buffered cache rows now (call on shutdown)"""
+    await _cache_writer.flush()
+
+
+async def close_http_clients():
+    """Close pooled HTTP clients (call on shutdown)"""
+    await _clearbit_http.aclose()
+    
+    google_kg = _shared_clients.get("google_kg")
+    if google_kg is not None:
+        await google_kg.aclose()
 
 
 def create_enrichment_service(
-    db: Session,
+    db: AsyncSession,
     serpapi_key: str = None,
     google_maps_key: str = None,
     enable_wappalyzer: bool = None,
     enable_serpapi: bool = None,
-    enable_google_maps: bool = None
+    enable_google_maps: bool = None,
+    enable_clearbit: bool = None,
+    enable_apollo: bool = None
 ) -> EnrichmentService:
     """Create enrichment service instance"""
     import os
@@ -483,11 +1215,19 @@ def create_enrichment_service(
     if enable_google_maps is None:
         enable_google_maps = os.getenv("ENABLE_GOOGLE_MAPS", "false").lower() == "true"
     
+    if enable_clearbit is None:
+        enable_clearbit = os.getenv("ENABLE_CLEARBIT", "false").lower() == "true"
+    
+    if enable_apollo is None:
+        enable_apollo = os.getenv("ENABLE_APOLLO", "false").lower() == "true"
+    
     return EnrichmentService(
         db=db,
         serpapi_key=serpapi_key or os.getenv("SERPAPI_API_KEY"),
         google_maps_key=google_maps_key or os.getenv("GOOGLE_MAPS_API_KEY"),
         enable_wappalyzer=enable_wappalyzer,
         enable_serpapi=enable_serpapi,
-        enable_google_maps=enable_google_maps
+        enable_google_maps=enable_google_maps,
+        enable_clearbit=enable_clearbit,
+        enable_apollo=enable_apollo
     )
\ No newline at end of file
@@ -4,21 +4,51 @@ Smart Enrichment Strategy Service - BULLETPROOF VERSION
 Handles ICP as both object and dict
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from enum import IntFlag, auto
+from functools import lru_cache
+from operator import attrgetter
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Lead attributes checked by _get_missing_fields, fetched with one attrgetter call
+_LEAD_FIELD_NAMES = (
+    "company_employee_count",
+    "company_industry",
+    "company_description",
+    "country",
+    "enrichment_data",
+)
+_LEAD_FIELDS = attrgetter(*_LEAD_FIELD_NAMES)
 
-@dataclass
+
+class MissingField(IntFlag):
+    """Lead fields that enrichment can fill, one bit each"""
+    COMPANY_EMPLOYEE_COUNT = auto()
+    COMPANY_INDUSTRY = auto()
+    COMPANY_DESCRIPTION = auto()
+    COUNTRY = auto()
+    COMPANY_TECH_STACK = auto()
+    
+    def to_tuple(self) -> Tuple[str, ...]:
+        """Field names, in definition order (e.g. ("company_industry", "country"))"""
+        return tuple(field.name.lower() for field in self)
+
+
+# Any of these missing means SerpApi is worth calling
+_SERPAPI_FIELDS = MissingField.COMPANY_DESCRIPTION | MissingField.COMPANY_INDUSTRY | MissingField.COUNTRY
+
+
+@dataclass(slots=True, frozen=True)
 class EnrichmentPlan:
-    """Plan for enriching a lead"""
+    """Plan for enriching a lead (cached plans are shared, so it is frozen)"""
     should_enrich: bool
     reason: str
-    providers_to_use: List[str]
-    fields_to_enrich: List[str]
+    providers_to_use: Tuple[str, ...]
+    fields_to_enrich: Tuple[str, ...]
     estimated_cost: float
     priority: str
 
@@ -49,29 +79,88 @@ class EnrichmentStrategyService:
         "wappalyzer": 0.0,
         "serpapi": 0.002,
         "google_kg": 0.0,
+        "clearbit": 0.10,
     }
     
-    def create_enrichment_plan(self, raw_lead, lead, icp=None) -> EnrichmentPlan:
-        """Create smart enrichment plan - BULLETPROOF"""
+    def create_enrichment_plan(
+        self,
+        raw_lead,
+        lead,
+        icp=None,
+        *,
+        now: Optional[datetime] = None
+    ) -> EnrichmentPlan:
+        """
+        Create smart enrichment plan - BULLETPROOF
+        
+        The decision only depends on (source, data age, missing fields), so
+        plans are cached on that key and shared between leads - treat the
+        returned plan as read-only. `now` lets batch callers age every lead
+        against one timestamp.
+        """
         
         # Get source quality
         source_name = getattr(raw_lead, 'source_name', None) or "unknown"
-        source_quality = self.SOURCE_QUALITY.get(source_name, "unknown")
         
         email = getattr(lead, 'email', 'unknown')
-        logger.info(f"📋 Creating enrichment plan for {email} (source: {source_name}, quality: {source_quality})")
+        logger.info(f"📋 Creating enrichment plan for {email} (source: {source_name}, "
+                    f"quality: {self.SOURCE_QUALITY.get(source_name, 'unknown')})")
         
-        # ✅ Skip high-quality sources if fresh
-        if source_quality == "high":
+        enriched_at = getattr(lead, 'enriched_at', None)
+        age_days = ((now or datetime.utcnow()) - enriched_at).days if enriched_at else None
+        
+        # ICP filtering is applied here, so the ICP doesn't need to be in the key
+        missing_fields = self._get_missing_fields(lead, icp)
+        
+        return self._plan_for_key(source_name, age_days, missing_fields)
+    
+    def create_plans_bulk(self, leads: Iterable[Tuple[Any, Any]], icp=None) -> List[EnrichmentPlan]:
+        """
+        Create plans for (raw_lead, lead) pairs sharing one ICP
+        
+        Same plans as create_enrichment_plan, but the ICP rules and the
+        timestamp are resolved once for the batch, and a single summary
+        line is logged instead of one line per lead.
+        """
+        now = datetime.utcnow()
+        icp_mask = self._icp_field_mask(icp)
+        
+        plans = []
+        for raw_lead, lead in leads:
+            source_name = getattr(raw_lead, 'source_name', None) or "unknown"
             enriched_at = getattr(lead, 'enriched_at', None)
-            if enriched_at:
-                age_days = (datetime.utcnow() - enriched_at).days
-                if age_days < self.REFRESH_INTERVALS['high']:
+            age_days = (now - enriched_at).days if enriched_at else None
+            plans.append(self._plan_for_key(
+                source_name, age_days, self._lead_missing_fields(lead) & icp_mask
+            ))
+        
+        logger.info(
+            f"📋 Created {len(plans)} enrichment plans "
+            f"({sum(plan.should_enrich for plan in plans)} to enrich)"
+        )
+        return plans
+    
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def _plan_for_key(
+        cls,
+        source_name: str,
+        age_days: Optional[int],
+        missing_fields: MissingField
+    ) -> EnrichmentPlan:
+        """Build the plan for a (source, age in days or None, missing fields) key"""
+        source_quality = cls.SOURCE_QUALITY.get(source_name, "unknown")
+        ever_enriched = age_days is not None
+        
+        # ✅ Skip high-quality sources if fresh
+        if source_name in HIGH_QUALITY_SOURCES:
+            if ever_enriched:
+                if age_days < cls.REFRESH_INTERVALS['high']:
                     return EnrichmentPlan(
                         should_enrich=False,
                         reason=f"High-quality source '{source_name}' with fresh data",
-                        providers_to_use=[],
-                        fields_to_enrich=[],
+                        providers_to_use=(),
+                        fields_to_enrich=(),
                         estimated_cost=0.0,
                         priority="skip"
                     )
@@ -79,96 +168,107 @@ class EnrichmentStrategyService:
                 return EnrichmentPlan(
                     should_enrich=False,
                     reason=f"Source '{source_name}' provides pre-enriched data",
-                    providers_to_use=[],
-                    fields_to_enrich=[],
+                    providers_to_use=(),
+                    fields_to_enrich=(),
                     estimated_cost=0.0,
                     priority="skip"
                 )
         
         # Check if stale
         is_stale = False
-        age_days = 0
-        enriched_at = getattr(lead, 'enriched_at', None)
-        if enriched_at:
-            age_days = (datetime.utcnow() - enriched_at).days
-            refresh_interval = self.REFRESH_INTERVALS.get(source_quality, 30)
-            is_stale = age_days >= refresh_interval
-        
-        # Check missing fields
-        missing_fields = self._get_missing_fields(lead, icp)
+        if ever_enriched:
+            is_stale = age_days >= SOURCE_REFRESH_DAYS.get(source_name, 30)
         
         if not missing_fields and not is_stale:
             return EnrichmentPlan(
                 should_enrich=False,
                 reason="All required fields present and data is fresh",
-                providers_to_use=[],
-                fields_to_enrich=[],
+                providers_to_use=(),
+                fields_to_enrich=(),
                 estimated_cost=0.0,
                 priority="skip"
             )
         
         # Select providers
-        providers = self._select_providers(source_name, missing_fields)
+        providers = cls._select_providers(source_name, missing_fields)
         
         if not providers:
             return EnrichmentPlan(
                 should_enrich=False,
                 reason="No providers available",
-                providers_to_use=[],
-                fields_to_enrich=missing_fields,
+                providers_to_use=(),
+                fields_to_enrich=missing_fields.to_tuple(),
                 estimated_cost=0.0,
                 priority="skip"
             )
         
         # Calculate priority
-        priority = self._calculate_priority(lead, missing_fields, source_quality, is_stale)
-        estimated_cost = sum(self.PROVIDER_COSTS.get(p, 0) for p in providers)
+        priority = cls._calculate_priority(ever_enriched, missing_fields, source_quality, is_stale)
+        estimated_cost = sum(cls.PROVIDER_COSTS.get(p, 0) for p in providers)
         
         # Build reason
         reasons = []
         if is_stale:
             reasons.append(f"Data is stale ({age_days} days old)")
-        elif not enriched_at:
+        elif not ever_enriched:
             reasons.append("Never enriched")
         
         if source_quality in ["low", "unknown"]:
             reasons.append(f"Low-quality source '{source_name}'")
         
         if missing_fields:
-            reasons.append(f"Missing {len(missing_fields)} fields")
+            reasons.append(f"Missing {missing_fields.bit_count()} fields")
         
         return EnrichmentPlan(
             should_enrich=True,
             reason="; ".join(reasons),
-            providers_to_use=providers,
-            fields_to_enrich=missing_fields,
+            providers_to_use=tuple(providers),
+            fields_to_enrich=missing_fields.to_tuple(),
             estimated_cost=estimated_cost,
             priority=priority
         )
     
-    def _get_missing_fields(self, lead, icp) -> List[str]:
+    def _get_missing_fields(self, lead, icp) -> MissingField:
         """Check missing fields - BULLETPROOF"""
-        missing = []
+        return self._lead_missing_fields(lead) & self._icp_field_mask(icp)
+    
+    @staticmethod
+    def _lead_missing_fields(lead) -> MissingField:
+        """Fields that are empty on the lead"""
+        missing = MissingField(0)
+        
+        # Snapshot the checked attributes in one go
+        try:
+            employee_count, industry, description, country, enrichment_data = _LEAD_FIELDS(lead)
+        except AttributeError:
+            employee_count, industry, description, country, enrichment_data = (
+                getattr(lead, name, None) for name in _LEAD_FIELD_NAMES
+            )
         
         # Check core fields
-        if not getattr(lead, 'company_employee_count', None):
-            missing.append("company_employee_count")
+        if not employee_count:
+            missing |= MissingField.COMPANY_EMPLOYEE_COUNT
         
-        if not getattr(lead, 'company_industry', None):
-            missing.append("company_industry")
+        if not industry:
+            missing |= MissingField.COMPANY_INDUSTRY
         
-        if not getattr(lead, 'company_description', None):
-            missing.append("company_description")
+        if not description:
+            missing |= MissingField.COMPANY_DESCRIPTION
         
-        if not getattr(lead, 'country', None):
-            missing.append("country")
+        if not country:
+            missing |= MissingField.COUNTRY
         
         # Tech stack
-        enrichment_data = getattr(lead, 'enrichment_data', None) or {}
-        if "tech_stack" not in enrichment_data:
-            missing.append("company_tech_stack")
+        if "tech_stack" not in (enrichment_data or {}):
+            missing |= MissingField.COMPANY_TECH_STACK
+        
+        return missing
+    
+    @staticmethod
+    def _icp_field_mask(icp) -> MissingField:
+        """Fields the ICP cares about (all of them unless its rules say otherwise)"""
+        mask = ~MissingField(0)
         
-        # Filter based on ICP (if provided)
         if icp is not None:
             try:
                 # Handle both dict and object
@@ -182,40 +282,43 @@ class EnrichmentStrategyService:
                 if rules:
                     # If ICP doesn't care about tech
                     if not rules.get("required_technologies") and not rules.get("preferred_technologies"):
-                        missing = [f for f in missing if f != "company_tech_stack"]
+                        mask &= ~MissingField.COMPANY_TECH_STACK
                     
                     # If ICP doesn't filter by size
                     if not rules.get("ideal_company_size_min"):
-                        missing = [f for f in missing if f != "company_employee_count"]
+                        mask &= ~MissingField.COMPANY_EMPLOYEE_COUNT
             except Exception as e:
                 logger.warning(f"Error filtering fields by ICP: {e}")
         
-        return missing
+        return mask
     
-    def _select_providers(self, source_name: str, missing_fields: List[str]) -> List[str]:
+    @staticmethod
+    def _select_providers(source_name: str, missing_fields: MissingField) -> List[str]:
         """Select providers"""
         providers = []
         
-        if source_name in ["apollo", "hunter", "peopledatalabs", "clearbit"]:
+        if source_name in HIGH_QUALITY_SOURCES:
             return []
         
-        if "company_tech_stack" in missing_fields:
+        if missing_fields & MissingField.COMPANY_TECH_STACK:
             providers.append("wappalyzer")
         
-        serpapi_fields = ["company_description", "company_industry", "country"]
-        if any(f in missing_fields for f in serpapi_fields):
+        if missing_fields & _SERPAPI_FIELDS:
             providers.append("serpapi")
         
-        if "company_employee_count" in missing_fields:
+        if missing_fields & MissingField.COMPANY_EMPLOYEE_COUNT:
             providers.append("google_kg")
         
-        return list(set(providers))
+        # Each provider is added at most once, so no dedup pass is needed and
+        # the order (cheapest/most specific first) stays deterministic
+        return providers
     
-    def _calculate_priority(self, lead, missing_fields, source_quality, is_stale) -> str:
+    @staticmethod
+    def _calculate_priority(ever_enriched, missing_fields, source_quality, is_stale) -> str:
         """Calculate priority"""
-        enriched_at = getattr(lead, 'enriched_at', None)
+        missing_count = missing_fields.bit_count()
         
-        if not enriched_at and len(missing_fields) >= 3:
+        if not ever_enriched and missing_count >= 3:
             return "high"
         
         if source_quality in ["low", "unknown"]:
@@ -224,18 +327,28 @@ class EnrichmentStrategyService:
         if is_stale:
             return "high"
         
-        if len(missing_fields) >= 2:
+        if missing_count >= 2:
             return "medium"
         
         return "low"
     
     def calculate_next_refresh(self, source_name: str) -> datetime:
         """Calculate refresh date"""
-        source_quality = self.SOURCE_QUALITY.get(source_name, "unknown")
-        days = self.REFRESH_INTERVALS.get(source_quality, 30)
+        days = SOURCE_REFRESH_DAYS.get(source_name, 30)
         return datetime.utcnow() + timedelta(days=days)
 
 
+# Flattened source lookups for the per-lead path
+SOURCE_REFRESH_DAYS: Dict[str, int] = {
+    source: EnrichmentStrategyService.REFRESH_INTERVALS[quality]
+    for source, quality in EnrichmentStrategyService.SOURCE_QUALITY.items()
+}
+HIGH_QUALITY_SOURCES = frozenset(
+    source for source, quality in EnrichmentStrategyService.SOURCE_QUALITY.items()
+    if quality == "high"
+)
+
+
 def create_enrichment_strategy_service():
     """Factory function"""
     return EnrichmentStrategyService()
\ No newline at end of file
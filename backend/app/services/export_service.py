@@ -1,22 +1,129 @@
 """Export services for integrating with campaign platforms."""
 
+import asyncio
 import logging
 import csv
 import io
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
 from datetime import datetime
-import aiohttp
-import pandas as pd
+import httpx
+import orjson
 
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-class InstantlyExporter:
-    """Export leads to Instantly.ai platform."""
+def _iter_csv_chunks(
+    fieldnames: List[str],
+    rows: Iterable[Tuple[Any, ...]],
+    chunk_rows: int
+) -> Iterator[bytes]:
+    """
+    Write rows as UTF-8 CSV, yielding bytes every `chunk_rows` rows from one reused buffer.
     
-    BASE_URL = "https://api.instantly.ai/api/v1"
+    Rows are tuples in `fieldnames` order (csv.writer, not DictWriter, so no
+    per-row dict building or fieldname lookups). The text is encoded as it is
+    written, so chunks can go straight to a StreamingResponse.
+    """
+    buffer = io.BytesIO()
+    output = io.TextIOWrapper(buffer, encoding="utf-8", newline="", write_through=True)
+    writer = csv.writer(output, quoting=csv.QUOTE_ALL)
+    writer.writerow(fieldnames)
+    
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _csv_text(fieldnames: List[str], rows: Iterable[Tuple[Any, ...]]) -> str:
+    """Write rows as one CSV string (for JSON responses that embed the file)."""
+    output = io.StringIO()
+    writer = csv.writer(output, quoting=csv.QUOTE_ALL)
+    writer.writerow(fieldnames)
+    writer.writerows(rows)
+    return output.getvalue()
+
+
+def _nested(lead: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """Return a nested dict field of a lead (e.g. company, metadata), or {}."""
+    value = lead.get(key)
+    return value if isinstance(value, dict) else {}
+
+
+def _dedupe_by_email(leads: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """Keep the first lead per email (case-insensitive); drop leads without one."""
+    seen = set()
+    unique = []
+    for lead in leads:
+        email = (lead.get("email") or "").strip().lower()
+        if email and email not in seen:
+            seen.add(email)
+            unique.append(lead)
+    return unique, len(leads) - len(unique)
+
+
+def _lead_field(col: str) -> Callable[[Dict[str, Any], Dict[str, Any]], Any]:
+    """Extractor for a plain lead column."""
+    return lambda lead, company: lead.get(col, "")
+
+
+def _company_field(key: str) -> Callable[[Dict[str, Any], Dict[str, Any]], Any]:
+    """Extractor for a field of the lead's company dict."""
+    return lambda lead, company: company.get(key, "")
+
+
+def _acquisition_timestamp(lead: Dict[str, Any], company: Dict[str, Any]) -> str:
+    ts = lead.get("acquisition_timestamp")
+    if not ts:
+        return ""
+    if isinstance(ts, str):
+        return ts
+    return ts.isoformat() if hasattr(ts, 'isoformat') else str(ts)
+
+
+# Rate-limited or temporarily unavailable: worth retrying the batch. 500 is
+# left out: the lead endpoints aren't idempotent, and a 500 may come after
+# the server already added part of the batch.
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+MAX_RETRY_DELAY = 60.0
+
+
+def _retry_delay(headers, attempt: int) -> float:
+    """Seconds to wait before retrying: Retry-After if given, else exponential backoff."""
+    try:
+        delay = float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        # Missing, or an HTTP-date we don't bother parsing
+        delay = 2.0 ** attempt
+    return min(max(delay, 0.0), MAX_RETRY_DELAY)
+
+
+class _PlatformExporter:
+    """
+    Shared API and CSV export for a campaign platform.
+    
+    Subclasses set the platform's endpoint, payload key, batch size and
+    success statuses, and map leads with _api_lead() and _iter_rows().
+    """
+    
+    PLATFORM = ""
+    BASE_URL = ""
+    ENDPOINT = ""
+    PAYLOAD_KEY = ""
+    BATCH_SIZE = 100
+    SUCCESS_STATUSES = frozenset({200})
+    MAX_CONCURRENT_BATCHES = 4  # Stay under platform rate limits
+    _TIMEOUT = httpx.Timeout(30.0)
+    MAX_ATTEMPTS = 4
+    
+    CSV_FIELDNAMES: List[str] = []
     
     def __init__(self, api_key: str):
         self.api_key = api_key
@@ -24,6 +131,24 @@ class InstantlyExporter:
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP/2 client shared by every batch, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                headers=self.headers,
+                timeout=self._TIMEOUT,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     async def export_leads(
         self,
@@ -31,7 +156,7 @@ class InstantlyExporter:
         campaign_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Export leads to Instantly.ai via API.
+        Export leads to the platform via API.
         
         Args:
             leads: List of lead dictionaries
@@ -41,74 +166,88 @@ class InstantlyExporter:
             Export result with success/failure counts
         """
         if not leads:
-            return {"success": 0, "failed": 0, "errors": []}
+            return {"success": 0, "failed": 0, "skipped": 0, "errors": []}
         
-        # Transform leads to Instantly.ai format
-        instantly_leads = []
-        for lead in leads:
-            instantly_lead = {
-                "email": lead.get("email"),
-                "first_name": lead.get("first_name"),
-                "last_name": lead.get("last_name"),
-                "company_name": lead.get("company", {}).get("name") if isinstance(lead.get("company"), dict) else None,
-                "website": lead.get("company", {}).get("website") if isinstance(lead.get("company"), dict) else None,
-                "personalization": {},
-                "variables": {
-                    "job_title": lead.get("job_title"),
-                    "phone": lead.get("phone"),
-                    "linkedin_url": lead.get("linkedin_url"),
-                }
-            }
-            instantly_leads.append(instantly_lead)
+        # Don't spend batch slots / API quota on repeated or missing emails
+        leads, skipped = _dedupe_by_email(leads)
+        api_leads = [self._api_lead(lead) for lead in leads]
         
-        # Split into batches of 100 (Instantly.ai limit)
-        batch_size = 100
-        results = {"success": 0, "failed": 0, "errors": []}
+        # Split into platform-sized batches and post them concurrently
+        batch_size = self.BATCH_SIZE
+        client = self._get_client()
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_BATCHES)
         
-        for i in range(0, len(instantly_leads), batch_size):
-            batch = instantly_leads[i:i+batch_size]
-            
-            payload = {
-                "leads": batch
-            }
-            
-            if campaign_id:
-                payload["campaign_id"] = campaign_id
-            
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        f"{self.BASE_URL}/lead/add",
-                        headers=self.headers,
-                        json=payload,
-                        timeout=aiohttp.ClientTimeout(total=30)
-                    ) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            results["success"] += len(batch)
-                            logger.info(f"Successfully exported {len(batch)} leads to Instantly.ai")
-                        else:
-                            error_text = await response.text()
-                            results["failed"] += len(batch)
-                            results["errors"].append({
-                                "batch": i // batch_size,
-                                "error": error_text
-                            })
-                            logger.error(f"Instantly.ai export failed: {error_text}")
-            
-            except Exception as e:
-                results["failed"] += len(batch)
-                results["errors"].append({
-                    "batch": i // batch_size,
-                    "error": str(e)
-                })
-                logger.error(f"Instantly.ai export error: {str(e)}")
+        partials = await asyncio.gather(*(
+            self._post_batch(client, semaphore, api_leads[i:i+batch_size], i // batch_size, campaign_id)
+            for i in range(0, len(api_leads), batch_size)
+        ))
+        
+        results = {"success": 0, "failed": 0, "skipped": skipped, "errors": []}
+        for partial in partials:
+            results["success"] += partial["success"]
+            results["failed"] += partial["failed"]
+            results["errors"].extend(partial["errors"])
         
         return results
     
+    async def _post_batch(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        batch: List[Dict[str, Any]],
+        batch_index: int,
+        campaign_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Post one batch of leads and return its partial result."""
+        payload = {
+            self.PAYLOAD_KEY: batch
+        }
+        
+        if campaign_id:
+            payload["campaign_id"] = campaign_id
+        
+        body = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+        url = f"{self.BASE_URL}{self.ENDPOINT}"
+        
+        try:
+            async with semaphore:
+                for attempt in range(self.MAX_ATTEMPTS):
+                    response = await client.post(url, content=body)
+                    if response.status_code in self.SUCCESS_STATUSES:
+                        response.json()
+                        logger.info(f"Successfully exported {len(batch)} leads to {self.PLATFORM}")
+                        return {"success": len(batch), "failed": 0, "errors": []}
+                    
+                    error_text = response.text
+                    if response.status_code not in RETRYABLE_STATUSES or attempt == self.MAX_ATTEMPTS - 1:
+                        logger.error(f"{self.PLATFORM} export failed: {error_text}")
+                        return {
+                            "success": 0,
+                            "failed": len(batch),
+                            "errors": [{"batch": batch_index, "error": error_text}]
+                        }
+                    
+                    delay = _retry_delay(response.headers, attempt)
+                    logger.warning(
+                        f"{self.PLATFORM} returned {response.status_code} for batch {batch_index}, "
+                        f"retrying in {delay:.1f}s"
+                    )
+                    
+                    # Keep the semaphore slot while backing off so other
+                    # batches don't pile onto a rate-limited API
+                    await asyncio.sleep(delay)
+        
+        except Exception as e:
+            logger.error(f"{self.PLATFORM} export error: {str(e)}")
+            return {
+                "success": 0,
+                "failed": len(batch),
+                "errors": [{"batch": batch_index, "error": str(e)}]
+            }
+    
     def generate_csv(self, leads: List[Dict[str, Any]]) -> str:
         """
-        Generate CSV file for Instantly.ai upload.
+        Generate the platform's CSV upload file.
         
         Args:
             leads: List of lead dictionaries
@@ -116,171 +255,138 @@ class InstantlyExporter:
         Returns:
             CSV content as string
         """
-        output = io.StringIO()
-        
-        fieldnames = [
-            "Email",
-            "First Name",
-            "Last Name",
-            "Company Name",
-            "Website",
-            "Job Title",
-            "Phone",
-            "LinkedIn URL",
-            "Custom Field 1"
-        ]
-        
-        writer = csv.DictWriter(output, fieldnames=fieldnames, quoting=csv.QUOTE_ALL)
-        writer.writeheader()
+        return _csv_text(self.CSV_FIELDNAMES, self._iter_rows(leads))
+    
+    def iter_csv_chunks(
+        self,
+        leads: Iterable[Dict[str, Any]],
+        chunk_rows: int = 1000
+    ) -> Iterator[bytes]:
+        """
+        Stream the platform's CSV in chunks of `chunk_rows` rows.
         
-        for lead in leads:
-            row = {
-                "Email": lead.get("email", ""),
-                "First Name": lead.get("first_name", ""),
-                "Last Name": lead.get("last_name", ""),
-                "Company Name": lead.get("company", {}).get("name", "") if isinstance(lead.get("company"), dict) else "",
-                "Website": lead.get("company", {}).get("website", "") if isinstance(lead.get("company"), dict) else "",
-                "Job Title": lead.get("job_title", ""),
-                "Phone": lead.get("phone", ""),
-                "LinkedIn URL": lead.get("linkedin_url", ""),
-                "Custom Field 1": lead.get("metadata", {}).get("custom1", "") if isinstance(lead.get("metadata"), dict) else ""
+        Suitable for a StreamingResponse; memory stays O(chunk_rows).
+        """
+        return _iter_csv_chunks(self.CSV_FIELDNAMES, self._iter_rows(leads), chunk_rows)
+    
+    def _api_lead(self, lead: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a lead to the platform's API format."""
+        raise NotImplementedError
+    
+    def _iter_rows(self, leads: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Any, ...]]:
+        """Yield one CSV row per lead, in CSV_FIELDNAMES order."""
+        raise NotImplementedError
+
+
+class InstantlyExporter(_PlatformExporter):
+    """Export leads to Instantly.ai platform."""
+    
+    PLATFORM = "Instantly.ai"
+    BASE_URL = "https://api.instantly.ai/api/v1"
+    ENDPOINT = "/lead/add"
+    PAYLOAD_KEY = "leads"
+    BATCH_SIZE = 100  # Instantly.ai limit
+    SUCCESS_STATUSES = frozenset({200})
+    
+    CSV_FIELDNAMES = [
+        "Email",
+        "First Name",
+        "Last Name",
+        "Company Name",
+        "Website",
+        "Job Title",
+        "Phone",
+        "LinkedIn URL",
+        "Custom Field 1"
+    ]
+    
+    def _api_lead(self, lead: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a lead to Instantly.ai's /lead/add format."""
+        company = _nested(lead, "company")
+        return {
+            "email": lead.get("email"),
+            "first_name": lead.get("first_name"),
+            "last_name": lead.get("last_name"),
+            "company_name": company.get("name"),
+            "website": company.get("website"),
+            "personalization": {},
+            "variables": {
+                "job_title": lead.get("job_title"),
+                "phone": lead.get("phone"),
+                "linkedin_url": lead.get("linkedin_url"),
             }
-            writer.writerow(row)
-        
-        return output.getvalue()
+        }
+    
+    def _iter_rows(self, leads: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Any, ...]]:
+        """Yield one CSV row per lead, in CSV_FIELDNAMES order."""
+        for lead in leads:
+            get = lead.get
+            company = _nested(lead, "company")
+            metadata = _nested(lead, "metadata")
+            yield (
+                get("email", ""),
+                get("first_name", ""),
+                get("last_name", ""),
+                company.get("name", ""),
+                company.get("website", ""),
+                get("job_title", ""),
+                get("phone", ""),
+                get("linkedin_url", ""),
+                metadata.get("custom1", ""),
+            )
 
 
-class SmartleadExporter:
+class SmartleadExporter(_PlatformExporter):
     """Export leads to Smartlead.ai platform."""
     
+    PLATFORM = "Smartlead.ai"
     BASE_URL = "https://server.smartlead.ai/api/v1"
+    ENDPOINT = "/campaigns/leads"
+    PAYLOAD_KEY = "lead_list"
+    BATCH_SIZE = 50  # Smartlead limit
+    SUCCESS_STATUSES = frozenset({200, 201})
     
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
+    CSV_FIELDNAMES = [
+        "Email",
+        "First Name",
+        "Last Name",
+        "Company",
+        "Title",
+        "Phone",
+        "Website",
+        "LinkedIn"
+    ]
+    
+    def _api_lead(self, lead: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a lead to Smartlead.ai's /campaigns/leads format."""
+        company = _nested(lead, "company")
+        return {
+            "email": lead.get("email"),
+            "first_name": lead.get("first_name"),
+            "last_name": lead.get("last_name"),
+            "company_name": company.get("name"),
+            "title": lead.get("job_title"),
+            "phone": lead.get("phone"),
+            "website": company.get("website"),
+            "linkedin": lead.get("linkedin_url"),
+            "custom_fields": _nested(lead, "metadata")
         }
     
-    async def export_leads(
-        self,
-        leads: List[Dict[str, Any]],
-        campaign_id: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """
-        Export leads to Smartlead.ai via API.
-        
-        Args:
-            leads: List of lead dictionaries
-            campaign_id: Optional campaign ID
-        
-        Returns:
-            Export result with success/failure counts
-        """
-        if not leads:
-            return {"success": 0, "failed": 0, "errors": []}
-        
-        # Transform leads to Smartlead format
-        smartlead_leads = []
+    def _iter_rows(self, leads: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Any, ...]]:
+        """Yield one CSV row per lead, in CSV_FIELDNAMES order."""
         for lead in leads:
-            smartlead_lead = {
-                "email": lead.get("email"),
-                "first_name": lead.get("first_name"),
-                "last_name": lead.get("last_name"),
-                "company_name": lead.get("company", {}).get("name") if isinstance(lead.get("company"), dict) else None,
-                "title": lead.get("job_title"),
-                "phone": lead.get("phone"),
-                "website": lead.get("company", {}).get("website") if isinstance(lead.get("company"), dict) else None,
-                "linkedin": lead.get("linkedin_url"),
-                "custom_fields": lead.get("metadata", {}) if isinstance(lead.get("metadata"), dict) else {}
-            }
-            smartlead_leads.append(smartlead_lead)
-        
-        # Split into batches of 50 (Smartlead limit)
-        batch_size = 50
-        results = {"success": 0, "failed": 0, "errors": []}
-        
-        for i in range(0, len(smartlead_leads), batch_size):
-            batch = smartlead_leads[i:i+batch_size]
-            
-            payload = {
-                "lead_list": batch
-            }
-            
-            if campaign_id:
-                payload["campaign_id"] = campaign_id
-            
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        f"{self.BASE_URL}/campaigns/leads",
-                        headers=self.headers,
-                        json=payload,
-                        timeout=aiohttp.ClientTimeout(total=30)
-                    ) as response:
-                        if response.status in [200, 201]:
-                            result = await response.json()
-                            results["success"] += len(batch)
-                            logger.info(f"Successfully exported {len(batch)} leads to Smartlead.ai")
-                        else:
-                            error_text = await response.text()
-                            results["failed"] += len(batch)
-                            results["errors"].append({
-                                "batch": i // batch_size,
-                                "error": error_text
-                            })
-                            logger.error(f"Smartlead.ai export failed: {error_text}")
-            
-            except Exception as e:
-                results["failed"] += len(batch)
-                results["errors"].append({
-                    "batch": i // batch_size,
-                    "error": str(e)
-                })
-                logger.error(f"Smartlead.ai export error: {str(e)}")
-        
-        return results
-    
-    def generate_csv(self, leads: List[Dict[str, Any]]) -> str:
-        """
-        Generate CSV file for Smartlead.ai upload.
-        
-        Args:
-            leads: List of lead dictionaries
-        
-        Returns:
-            CSV content as string
-        """
-        output = io.StringIO()
-        
-        fieldnames = [
-            "Email",
-            "First Name",
-            "Last Name",
-            "Company",
-            "Title",
-            "Phone",
-            "Website",
-            "LinkedIn"
-        ]
-        
-        writer = csv.DictWriter(output, fieldnames=fieldnames, quoting=csv.QUOTE_ALL)
-        writer.writeheader()
-        
-        for lead in leads:
-            row = {
-                "Email": lead.get("email", ""),
-                "First Name": lead.get("first_name", ""),
-                "Last Name": lead.get("last_name", ""),
-                "Company": lead.get("company", {}).get("name", "") if isinstance(lead.get("company"), dict) else "",
-                "Title": lead.get("job_title", ""),
-                "Phone": lead.get("phone", ""),
-                "Website": lead.get("company", {}).get("website", "") if isinstance(lead.get("company"), dict) else "",
-                "LinkedIn": lead.get("linkedin_url", "")
-            }
-            writer.writerow(row)
-        
-        return output.getvalue()
+            get = lead.get
+            company = _nested(lead, "company")
+            yield (
+                get("email", ""),
+                get("first_name", ""),
+                get("last_name", ""),
+                company.get("name", ""),
+                get("job_title", ""),
+                get("phone", ""),
+                company.get("website", ""),
+                get("linkedin_url", ""),
+            )
 
 
 class GenericCSVExporter:
@@ -300,6 +406,13 @@ class GenericCSVExporter:
         "acquisition_timestamp"
     ]
     
+    # Columns that aren't plain lead keys: column -> fn(lead, company)
+    COLUMN_EXTRACTORS = {
+        "company_name": _company_field("name"),
+        "company_website": _company_field("website"),
+        "acquisition_timestamp": _acquisition_timestamp,
+    }
+    
     def generate_csv(
         self,
         leads: List[Dict[str, Any]],
@@ -318,36 +431,39 @@ class GenericCSVExporter:
         if columns is None:
             columns = self.DEFAULT_COLUMNS
         
-        output = io.StringIO()
-        
-        # Convert to pandas DataFrame for easier manipulation
-        df_data = []
-        for lead in leads:
-            row = {}
-            for col in columns:
-                if col == "company_name":
-                    row[col] = lead.get("company", {}).get("name", "") if isinstance(lead.get("company"), dict) else ""
-                elif col == "company_website":
-                    row[col] = lead.get("company", {}).get("website", "") if isinstance(lead.get("company"), dict) else ""
-                elif col == "acquisition_timestamp":
-                    ts = lead.get("acquisition_timestamp")
-                    if ts:
-                        if isinstance(ts, str):
-                            row[col] = ts
-                        else:
-                            row[col] = ts.isoformat() if hasattr(ts, 'isoformat') else str(ts)
-                    else:
-                        row[col] = ""
-                else:
-                    row[col] = lead.get(col, "")
-            df_data.append(row)
+        return _csv_text(columns, self._iter_rows(leads, columns))
+    
+    def iter_csv_chunks(
+        self,
+        leads: Iterable[Dict[str, Any]],
+        columns: Optional[List[str]] = None,
+        chunk_rows: int = 1000
+    ) -> Iterator[bytes]:
+        """
+        Stream the generic CSV in chunks of `chunk_rows` rows.
         
-        df = pd.DataFrame(df_data, columns=columns)
+        Suitable for a StreamingResponse; memory stays O(chunk_rows).
+        """
+        if columns is None:
+            columns = self.DEFAULT_COLUMNS
         
-        # Write to CSV
-        df.to_csv(output, index=False, quoting=csv.QUOTE_ALL)
+        return _iter_csv_chunks(columns, self._iter_rows(leads, columns), chunk_rows)
+    
+    def _iter_rows(
+        self,
+        leads: Iterable[Dict[str, Any]],
+        columns: List[str]
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Yield one CSV row per lead, in `columns` order."""
+        # Resolve each column's extractor once, not per row
+        extractors = [
+            self.COLUMN_EXTRACTORS.get(col) or _lead_field(col)
+            for col in columns
+        ]
         
-        return output.getvalue()
+        for lead in leads:
+            company = _nested(lead, "company")
+            yield tuple(extract(lead, company) for extract in extractors)
 
 
 class ExportService:
@@ -358,6 +474,12 @@ class ExportService:
         self.smartlead = None
         self.generic = GenericCSVExporter()
     
+    async def aclose(self):
+        """Close pooled HTTP clients held by the platform exporters."""
+        for exporter in (self.instantly, self.smartlead):
+            if exporter is not None:
+                await exporter.aclose()
+    
     def set_instantly_credentials(self, api_key: str):
         """Set Instantly.ai API credentials."""
         self.instantly = InstantlyExporter(api_key)
@@ -366,6 +488,28 @@ class ExportService:
         """Set Smartlead.ai API credentials."""
         self.smartlead = SmartleadExporter(api_key)
     
+    def iter_csv(
+        self,
+        leads: Iterable[Dict[str, Any]],
+        destination: str,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[bytes]:
+        """
+        Stream a CSV export in UTF-8 byte chunks (for StreamingResponse).
+        
+        Args:
+            leads: Lead dictionaries (any iterable, consumed lazily)
+            destination: 'instantly', 'smartlead' or 'csv'
+            columns: Column names for the generic 'csv' destination
+        """
+        if destination == "instantly":
+            return (self.instantly or InstantlyExporter("")).iter_csv_chunks(leads)
+        if destination == "smartlead":
+            return (self.smartlead or SmartleadExporter("")).iter_csv_chunks(leads)
+        if destination == "csv":
+            return self.generic.iter_csv_chunks(leads, columns)
+        raise ValueError(f"Unknown destination: {destination}")
+    
     async def export(
         self,
         leads: List[Dict[str, Any]],
@@ -3,22 +3,149 @@
 Google Knowledge Graph Service - Enhanced Employee Count Extraction
 """
 
+import asyncio
+import hashlib
+import json
 import os
-import requests
 import re
 import logging
-from typing import Dict, Optional
-from bs4 import BeautifulSoup
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+import httpx
+import orjson
+from bs4 import BeautifulSoup, SoupStrainer
 
 logger = logging.getLogger(__name__)
 
+# Prefer the C lxml parser for Wikipedia pages when it is installed
+try:
+    import lxml  # noqa: F401
+    _WIKI_HTML_PARSER = "lxml"
+except ImportError:
+    _WIKI_HTML_PARSER = "html.parser"
+
+
+def _is_infobox_or_paragraph(name: str, attrs: Dict) -> bool:
+    """Parse filter: only build infobox tables and paragraphs (all the extraction reads)"""
+    return name == 'p' or (name == 'table' and 'infobox' in (attrs.get('class') or ''))
+
+
+_WIKI_PARSE_ONLY = SoupStrainer(_is_infobox_or_paragraph)
+
+# Infobox row headers that hold the employee count
+_EMPLOYEE_HEADER_WORDS = ('employee', 'staff', 'workforce')
+
+# Parsed Wikipedia lookups (url -> employee count), one JSON file per URL
+WIKI_CACHE_DIR = os.getenv('WIKI_CACHE_DIR', os.path.expanduser('~/.cache/leadgen/wiki'))
+WIKI_CACHE_MAX_AGE_SECONDS = 30 * 86400
+
+
+# Extraction patterns, compiled once at import
+
+# Just numbers with comma (for Wikipedia infobox); both need a ","
+# Matches: "8,100" or "8,100 (2024)" or "10,000+"
+_SIMPLE_NUMBER_PATTERNS = tuple(re.compile(p) for p in [
+    r'^(\d{1,3}(?:,\d{3})+)',  # Start of string with comma-separated number
+    r'(\d{1,3}(?:,\d{3})+)\s*(?:\(|$|\+)',  # Number followed by ( or end or +
+])
+
+# Enhanced patterns (ordered by specificity)
+_EMPLOYEE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    # Exact numbers with separators
+    r'(\d{1,3}(?:,\d{3})+)\s*(?:\+)?\s*(?:employees|staff|people|workers)',
+    r'(?<!\d)(\d{4,})\s*(?:\+)?\s*(?:employees|staff|people|workers)',
+    
+    # "employs X" format
+    r'employs?\s+(?:over|about|around|approximately|nearly)?\s*(\d{1,3}(?:,\d{3})+)',
+    r'employs?\s+(?:over|about|around|approximately|nearly)?\s*(\d{4,})',
+    
+    # "staff of X" format
+    r'staff\s+of\s+(?:over|about|around|approximately)?\s*(\d{1,3}(?:,\d{3})+)',
+    r'staff\s+of\s+(?:over|about|around|approximately)?\s*(\d{4,})',
+    
+    # "workforce of X" format
+    r'workforce\s+of\s+(?:over|about|around|approximately)?\s*(\d{1,3}(?:,\d{3})+)',
+    r'workforce\s+of\s+(?:over|about|around|approximately)?\s*(\d{4,})',
+    
+    # "has X employees" format
+    r'has\s+(?:over|about|around|approximately)?\s*(\d{1,3}(?:,\d{3})+)\s+(?:employees|staff)',
+    r'has\s+(?:over|about|around|approximately)?\s*(\d{4,})\s+(?:employees|staff)',
+    
+    # Range format "between X and Y employees"
+    r'between\s+(\d{1,3}(?:,\d{3})+)\s+and\s+\d+\s+(?:employees|staff)',
+    
+    # Number before "employee" word
+    r'(\d{1,3}(?:,\d{3})+)\s*(?:\+|–|-)?\s*(?:full-time|full time)?\s*(?:employees|staff)',
+])
+
+# Every employee and abbreviated pattern needs one of these words, so
+# checking for them rules out the whole pattern list on text that can't
+# match. Substring checks on casefolded text (which folds everything
+# IGNORECASE would match to these letters) are much cheaper than a regex.
+# (A single alternation of the patterns themselves is slower with re's
+# backtracking engine, and its leftmost match ignores pattern priority.)
+_EMPLOYEE_KEYWORDS = ('employ', 'staff', 'people', 'work')
+
+# Abbreviated formats (e.g., "10k employees", "2.5K staff")
+_ABBREV_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r'(?<!\d)(\d+(?:\.\d*)?)\s*[kK]\s+(?:employees|staff|people)',
+    r'employs?\s+(\d+(?:\.\d*)?)\s*[kK]',
+])
+
+# (literal the pattern needs, in casefolded text; pattern)
+_FOUNDED_PATTERNS = tuple((trigger, re.compile(p, re.IGNORECASE)) for trigger, p in [
+    ('founded', r'founded\s+in\s+(\d{4})'),
+    ('establ', r'established\s+in?\s*(\d{4})'),
+    ('created', r'created\s+in\s+(\d{4})'),
+    ('formed', r'formed\s+in\s+(\d{4})'),
+    ('launched', r'launched\s+in\s+(\d{4})'),
+    ('(', r'\((\d{4})\)'),  # Year in parentheses
+])
+
+# All of these need a "$"
+_REVENUE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r'\$(\d+(?:\.\d*)?)\s*(billion|million|B|M)',
+    r'revenue\s+of\s+\$(\d+(?:\.\d*)?)\s*(billion|million|B|M)',
+    r'annual\s+revenue\s+\$(\d+(?:\.\d*)?)\s*(billion|million|B|M)',
+    r'\$(\d+(?:\.\d*)?)\s*([BM])\s+in\s+revenue',
+])
+
 
 class GoogleKnowledgeGraphService:
     """Get company data from Google Knowledge Graph with enhanced extraction"""
     
+    # Results per (company name, domain); KG and Wikipedia data change slowly
+    CACHE_TTL_SECONDS = 86400
+    CACHE_MAX_SIZE = 10_000
+    
     def __init__(self):
         self.api_key = os.getenv('GOOGLE_KG_API_KEY')
         self.base_url = "https://kgsearch.googleapis.com/v1/entities:search"
+        
+        # (name, domain) -> (monotonic expiry, enriched data), least recently used first
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, Dict]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP/2 client for KG and Wikipedia, creating it on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the pooled HTTP client (call on shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     async def enrich_company(self, company_name: str, domain: str = None) -> Dict:
         """
@@ -28,11 +155,72 @@ class GoogleKnowledgeGraphService:
         - Multiple query strategies
         - Better employee count extraction
         - Wikipedia fallback
+        - In-memory TTL cache, with concurrent lookups of one company sharing a fetch
         """
         if not self.api_key:
             logger.warning("GOOGLE_KG_API_KEY not configured, skipping Google KG enrichment")
             return {}
         
+        key = (company_name.strip().lower(), (domain or "").lower())
+        
+        cached = self._cache.get(key)
+        if cached:
+            expires_at, enriched = cached
+            if expires_at > time.monotonic():
+                self._cache.move_to_end(key)
+                return dict(enriched)
+            del self._cache[key]
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_cache(key, company_name, domain))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        return dict(await asyncio.shield(task))
+    
+    async def enrich_companies_batch(
+        self,
+        companies: Iterable[Tuple[str, Optional[str]]],
+        concurrency: int = 16
+    ) -> List[Dict]:
+        """
+        Enrich many (company_name, domain) pairs concurrently
+        
+        At most `concurrency` lookups run at once; results come back in input order.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def enrich_one(company_name: str, domain: Optional[str]) -> Dict:
+            async with semaphore:
+                try:
+                    return await self.enrich_company(company_name, domain)
+                except Exception:
+                    return {}
+        
+        return await asyncio.gather(*(
+            enrich_one(company_name, domain) for company_name, domain in companies
+        ))
+    
+    async def _fetch_and_cache(self, key: Tuple[str, str], company_name: str, domain: str = None) -> Dict:
+        """
+        Fetch a company and cache the result
+        
+        Empty results aren't cached either; lookup errors propagate to the
+        caller (and every concurrent waiter) without being cached.
+        """
+        enriched = await self._fetch_company(company_name, domain)
+        
+        if enriched:
+            self._cache[key] = (time.monotonic() + self.CACHE_TTL_SECONDS, enriched)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.CACHE_MAX_SIZE:
+                self._cache.popitem(last=False)
+        
+        return enriched
+    
+    async def _fetch_company(self, company_name: str, domain: str = None) -> Dict:
+        """Query Knowledge Graph (and Wikipedia if needed) for one company"""
         try:
             # Strategy 1: Try primary query
             result = await self._query_knowledge_graph(company_name, domain)
@@ -83,7 +271,7 @@ class GoogleKnowledgeGraphService:
             
         except Exception as e:
             logger.error(f"Google KG error for {company_name}: {e}")
-            return {}
+            raise
     
     async def _query_knowledge_graph(self, company_name: str, domain: str = None) -> Optional[Dict]:
         """Query Google Knowledge Graph with optimized parameters"""
@@ -102,9 +290,9 @@ class GoogleKnowledgeGraphService:
             
             logger.info(f"🔍 Google KG: Searching for '{query}'")
             
-            response = requests.get(self.base_url, params=params, timeout=10)
+            response = await self._get_client().get(self.base_url, params=params)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             if not data.get('itemListElement'):
                 return None
@@ -113,65 +301,94 @@ class GoogleKnowledgeGraphService:
             
         except Exception as e:
             logger.error(f"Google KG query error: {e}")
-            return None
+            raise
     
     async def _extract_from_wikipedia(self, wikipedia_url: str) -> Optional[int]:
         """
         Extract employee count directly from Wikipedia page
         
-        Looks in the infobox for employee data
+        Looks in the infobox for employee data. Article URLs are fetched
+        through the MediaWiki parse API, which returns just the lead section
+        (infobox + intro) instead of the whole page. Results (including "not
+        found") are cached on disk for WIKI_CACHE_MAX_AGE_SECONDS.
         """
+        cached = _read_wiki_cache(wikipedia_url)
+        if cached is not None:
+            count = cached.get("employee_count")
+            logger.info(f"  📖 Wikipedia cache hit: {count}")
+            return count
+        
         try:
             logger.info(f"  📖 Fetching Wikipedia: {wikipedia_url}")
             
             # ✅ Add proper headers to avoid 403 Forbidden
+            # (Accept-Encoding is left to httpx: gzip/deflate, plus br when
+            # a brotli decoder is installed)
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
                 'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
                 'DNT': '1',
-                'Connection': 'keep-alive',
                 'Upgrade-Insecure-Requests': '1'
             }
             
-            response = requests.get(wikipedia_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Strategy 1: Look in infobox
-            infobox = soup.find('table', {'class': 'infobox'})
-            if infobox:
-                # Find rows with "employees" or "staff"
-                for row in infobox.find_all('tr'):
-                    header = row.find('th')
-                    if header:
-                        header_text = header.get_text().lower()
-                        if any(word in header_text for word in ['employee', 'staff', 'workforce']):
-                            data = row.find('td')
-                            if data:
-                                text = data.get_text()
-                                count = self._extract_employee_count(text)
-                                if count:
-                                    logger.info(f"  ✅ Found in Wikipedia infobox: {count}")
-                                    return count
+            client = self._get_client()
+            api_request = _wikipedia_lead_section_request(wikipedia_url)
             
-            # Strategy 2: Look in first few paragraphs
-            paragraphs = soup.find_all('p', limit=5)
-            for para in paragraphs:
-                text = para.get_text()
-                count = self._extract_employee_count(text)
-                if count:
-                    logger.info(f"  ✅ Found in Wikipedia paragraph: {count}")
-                    return count
+            if api_request:
+                api_url, params = api_request
+                response = await client.get(api_url, params=params, headers=headers)
+                response.raise_for_status()
+                html = orjson.loads(response.content)['parse']['text']
+            else:
+                response = await client.get(wikipedia_url, headers=headers, follow_redirects=True)
+                response.raise_for_status()
+                html = response.text
             
-            logger.info("  ⚠️ Employee count not found in Wikipedia")
-            return None
+            count = self._employee_count_from_wikipedia_html(html)
             
         except Exception as e:
             logger.error(f"Wikipedia extraction error: {e}")
             return None
+        
+        _write_wiki_cache(wikipedia_url, {"employee_count": count})
+        return count
+    
+    def _employee_count_from_wikipedia_html(self, html: str) -> Optional[int]:
+        """Find the employee count in a Wikipedia article's HTML"""
+        soup = BeautifulSoup(html, _WIKI_HTML_PARSER, parse_only=_WIKI_PARSE_ONLY)
+        
+        # Strategy 1: Look in infobox
+        infobox = soup.find('table', {'class': 'infobox'})
+        if infobox:
+            # Find rows with "employees" or "staff"
+            for row in infobox.find_all('tr'):
+                header = row.find('th')
+                if not header:
+                    continue
+                
+                header_text = header.get_text().casefold()
+                if not any(word in header_text for word in _EMPLOYEE_HEADER_WORDS):
+                    continue
+                
+                data = row.find('td')
+                if data:
+                    count = self._extract_employee_count(data.get_text())
+                    if count:
+                        logger.info(f"  ✅ Found in Wikipedia infobox: {count}")
+                        return count
+        
+        # Strategy 2: Look in first few paragraphs
+        paragraphs = soup.find_all('p', limit=5)
+        for para in paragraphs:
+            text = para.get_text()
+            count = self._extract_employee_count(text)
+            if count:
+                logger.info(f"  ✅ Found in Wikipedia paragraph: {count}")
+                return count
+        
+        logger.info("  ⚠️ Employee count not found in Wikipedia")
+        return None
 
     def _extract_employee_count(self, text: str) -> Optional[int]:
         """
@@ -188,79 +405,45 @@ class GoogleKnowledgeGraphService:
         text = text.replace('\n', ' ')
         
         # ✅ PRIORITY: Match just numbers with comma (for Wikipedia infobox)
-        # Matches: "8,100" or "8,100 (2024)" or "10,000+"
-        simple_number_patterns = [
-            r'^(\d{1,3}(?:,\d{3})+)',  # Start of string with comma-separated number
-            r'(\d{1,3}(?:,\d{3})+)\s*(?:\(|$|\+)',  # Number followed by ( or end or +
-        ]
-        
-        for pattern in simple_number_patterns:
-            match = re.search(pattern, text.strip())
-            if match:
-                count_str = match.group(1).replace(',', '')
-                try:
-                    count = int(count_str)
-                    if 10 <= count <= 10_000_000:
-                        logger.debug(f"Matched simple number: {pattern} -> {count}")
-                        return count
-                except ValueError:
-                    continue
+        if ',' in text:
+            stripped = text.strip()
+            for rx in _SIMPLE_NUMBER_PATTERNS:
+                match = rx.search(stripped)
+                if match:
+                    count_str = match.group(1).replace(',', '')
+                    try:
+                        count = int(count_str)
+                        if 10 <= count <= 10_000_000:
+                            logger.debug(f"Matched simple number: {rx.pattern} -> {count}")
+                            return count
+                    except ValueError:
+                        continue
         
-        # Enhanced patterns (ordered by specificity)
-        patterns = [
-            # Exact numbers with separators
-            r'(\d{1,3}(?:,\d{3})+)\s*(?:\+)?\s*(?:employees|staff|people|workers)',
-            r'(\d{4,})\s*(?:\+)?\s*(?:employees|staff|people|workers)',
-            
-            # "employs X" format
-            r'employs?\s+(?:over|about|around|approximately|nearly)?\s*(\d{1,3}(?:,\d{3})+)',
-            r'employs?\s+(?:over|about|around|approximately|nearly)?\s*(\d{4,})',
-            
-            # "staff of X" format
-            r'staff\s+of\s+(?:over|about|around|approximately)?\s*(\d{1,3}(?:,\d{3})+)',
-            r'staff\s+of\s+(?:over|about|around|approximately)?\s*(\d{4,})',
-            
-            # "workforce of X" format
-            r'workforce\s+of\s+(?:over|about|around|approximately)?\s*(\d{1,3}(?:,\d{3})+)',
-            r'workforce\s+of\s+(?:over|about|around|approximately)?\s*(\d{4,})',
-            
-            # "has X employees" format
-            r'has\s+(?:over|about|around|approximately)?\s*(\d{1,3}(?:,\d{3})+)\s+(?:employees|staff)',
-            r'has\s+(?:over|about|around|approximately)?\s*(\d{4,})\s+(?:employees|staff)',
-            
-            # Range format "between X and Y employees"
-            r'between\s+(\d{1,3}(?:,\d{3})+)\s+and\s+\d+\s+(?:employees|staff)',
-            
-            # Number before "employee" word
-            r'(\d{1,3}(?:,\d{3})+)\s*(?:\+|–|-)?\s*(?:full-time|full time)?\s*(?:employees|staff)',
-        ]
+        # No trigger word: none of the remaining patterns can match
+        folded = text.casefold()
+        if not any(keyword in folded for keyword in _EMPLOYEE_KEYWORDS):
+            return None
         
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for rx in _EMPLOYEE_PATTERNS:
+            match = rx.search(text)
             if match:
                 count_str = match.group(1).replace(',', '').replace(' ', '')
                 try:
                     count = int(count_str)
                     if 10 <= count <= 10_000_000:
-                        logger.debug(f"Matched pattern: {pattern} -> {count}")
+                        logger.debug(f"Matched pattern: {rx.pattern} -> {count}")
                         return count
                 except ValueError:
                     continue
         
-        # Try abbreviated formats (e.g., "10k employees", "2.5K staff")
-        abbrev_patterns = [
-            r'(\d+\.?\d*)\s*[kK]\s+(?:employees|staff|people)',
-            r'employs?\s+(\d+\.?\d*)\s*[kK]',
-        ]
-        
-        for pattern in abbrev_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for rx in _ABBREV_PATTERNS:
+            match = rx.search(text)
             if match:
                 try:
                     num = float(match.group(1))
                     count = int(num * 1000)
                     if 10 <= count <= 10_000_000:
-                        logger.debug(f"Matched abbreviated pattern: {pattern} -> {count}")
+                        logger.debug(f"Matched abbreviated pattern: {rx.pattern} -> {count}")
                         return count
                 except ValueError:
                     continue
@@ -269,17 +452,11 @@ class GoogleKnowledgeGraphService:
 
     def _extract_founded_year(self, text: str) -> Optional[str]:
         """Extract founding year with enhanced patterns"""
-        patterns = [
-            r'founded\s+in\s+(\d{4})',
-            r'established\s+in?\s*(\d{4})',
-            r'created\s+in\s+(\d{4})',
-            r'formed\s+in\s+(\d{4})',
-            r'launched\s+in\s+(\d{4})',
-            r'\((\d{4})\)',  # Year in parentheses
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        folded = text.casefold()
+        for trigger, rx in _FOUNDED_PATTERNS:
+            if trigger not in folded:
+                continue
+            match = rx.search(text)
             if match:
                 year = match.group(1)
                 # Sanity check: reasonable year range
@@ -290,15 +467,11 @@ class GoogleKnowledgeGraphService:
     
     def _extract_revenue(self, text: str) -> Optional[str]:
         """Extract revenue with enhanced patterns"""
-        patterns = [
-            r'\$(\d+\.?\d*)\s*(billion|million|B|M)',
-            r'revenue\s+of\s+\$(\d+\.?\d*)\s*(billion|million|B|M)',
-            r'annual\s+revenue\s+\$(\d+\.?\d*)\s*(billion|million|B|M)',
-            r'\$(\d+\.?\d*)\s*([BM])\s+in\s+revenue',
-        ]
+        if '$' not in text:
+            return None
         
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for rx in _REVENUE_PATTERNS:
+            match = rx.search(text)
             if match:
                 amount = match.group(1)
                 unit = match.group(2)
@@ -309,6 +482,59 @@ class GoogleKnowledgeGraphService:
         return None
 
 
+def _wikipedia_lead_section_request(url: str) -> Optional[Tuple[str, Dict]]:
+    """
+    Build the parse API request for an article URL's lead section
+    
+    Returns (api_url, params), or None if the URL isn't a /wiki/<title> link.
+    """
+    parsed = urlparse(url)
+    if not parsed.netloc.endswith('wikipedia.org') or not parsed.path.startswith('/wiki/'):
+        return None
+    
+    title = unquote(parsed.path[len('/wiki/'):])
+    if not title:
+        return None
+    
+    return f"https://{parsed.netloc}/w/api.php", {
+        "action": "parse",
+        "page": title,
+        "prop": "text",
+        "section": 0,
+        "redirects": 1,
+        "format": "json",
+        "formatversion": 2,
+    }
+
+
+def _wiki_cache_path(url: str) -> str:
+    return os.path.join(WIKI_CACHE_DIR, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+
+def _read_wiki_cache(url: str) -> Optional[Dict]:
+    """Return the cached entry for a Wikipedia URL, or None if missing/stale"""
+    path = _wiki_cache_path(url)
+    try:
+        if time.time() - os.path.getmtime(path) > WIKI_CACHE_MAX_AGE_SECONDS:
+            return None
+        with open(path, 'rb') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_wiki_cache(url: str, entry: Dict):
+    """Write a cache entry atomically (temp file + rename)"""
+    try:
+        os.makedirs(WIKI_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=WIKI_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, _wiki_cache_path(url))
+    except OSError as e:
+        logger.warning(f"Could not write Wikipedia cache for {url}: {e}")
+
+
 def create_google_kg_service():
     """Factory function"""
     return GoogleKnowledgeGraphService()
\ No newline at end of file
@@ -8,23 +8,194 @@ This service handles:
 4. Auto-assigning leads to appropriate buckets
 """
 
-from typing import List, Dict, Optional, Tuple
+from typing import Any, Callable, Collection, Iterable, Iterator, List, Dict, Optional, Set, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, not_, exists
+from sqlalchemy import and_, or_, delete, func, insert, select, update
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain
 import logging
 
 from app.models import Lead, ICP, LeadICPAssignment, Tenant
 from app.schemas import LeadProcessingStatus
+from app.utils.text_matching import title_matcher
 
 logger = logging.getLogger(__name__)
 
+# Distinct lead feature combinations memoized per compiled ICP
+FEATURE_CACHE_SIZE = 4096
+
+# Bucket -> assignment status (kept for backward compatibility)
+_BUCKET_TO_STATUS = {
+    'new': 'pending_review',
+    'score': 'pending_review',
+    'enriched': 'pending_review',
+    'verified': 'pending_review',
+    'review': 'pending_review',
+    'qualified': 'qualified',
+    'rejected': 'rejected',
+    'exported': 'exported'
+}
+
+
+def _lookup_set(values: Iterable[Any]) -> Collection[Any]:
+    """frozenset for O(1) membership, falling back to a tuple for unhashable values"""
+    if isinstance(values, str):
+        return values
+    values = tuple(values)
+    try:
+        return frozenset(values)
+    except TypeError:
+        return values
+
+
+@dataclass(slots=True, frozen=True)
+class CompiledICPRules:
+    """An ICP's scoring rules, preprocessed once per batch by compile_icp_rules()"""
+    rules: Dict
+    # (lead, lead.job_title lowercased or None) -> (matches_filters, fit_score)
+    evaluate: Callable[[Lead, Optional[str]], Tuple[bool, float]]
+    # Lowercased job title -> contains one of the required job titles
+    required_title_match: Callable[[str], bool]
+    # Per-ICP parts of scoring_details, shared by every assignment in the batch
+    score_breakdown: Dict
+    rules_used: Dict
+
+
+def compile_icp_rules(rules: Dict) -> CompiledICPRules:
+    """
+    Turn an ICP's scoring rules into a single (matches, score) function
+    
+    Equivalent to ICP.matches_filters + ICP.calculate_fit_score, but the rules
+    dict is walked once here instead of once per lead: job titles are
+    lowercased up front, list lookups become sets and weights/bounds are
+    bound as locals. Results are memoized on the lead features the rules
+    actually read, so leads sharing title/industry/size/country are scored
+    once per batch.
+    
+    Args:
+        rules: Output of ICP.get_scoring_rules()
+        
+    Returns:
+        CompiledICPRules; its evaluate() returns (matches_filters, fit_score),
+        with score 0.0 when the lead does not match
+    """
+    filters = rules.get('filters', {})
+    required = filters.get('required', {})
+    excluded = filters.get('excluded', {})
+    weights = rules.get('weights', {})
+    
+    has_required_titles = bool(required.get('job_titles'))
+    required_title_match = title_matcher(required.get('job_titles') or ())
+    required_industries = _lookup_set(required.get('industries') or ())
+    required_countries = _lookup_set(required.get('countries') or ())
+    has_excluded_titles = bool(excluded.get('job_titles'))
+    excluded_title_match = title_matcher(excluded.get('job_titles') or ())
+    excluded_domains = _lookup_set(excluded.get('domains') or ())
+    
+    min_size = required.get('company_size_min', 1)
+    max_size = required.get('company_size_max', 999999)
+    mid_point = (min_size + max_size) / 2
+    range_size = max_size - min_size
+    
+    job_title_weight = weights.get('job_title_match', 40)
+    company_size_weight = weights.get('company_size_fit', 20)
+    industry_weight = weights.get('industry_match', 20)
+    geographic_weight = weights.get('geographic_fit', 10)
+    
+    uses_titles = has_required_titles or has_excluded_titles
+    
+    @lru_cache(maxsize=FEATURE_CACHE_SIZE)
+    def evaluate_features(
+        job_title_lower: Optional[str],
+        industry: Optional[str],
+        company_size: Any,
+        country: Optional[str],
+        email_domain: Optional[str]
+    ) -> Tuple[bool, float]:
+        # Filters
+        title_match = has_required_titles and bool(job_title_lower) and required_title_match(job_title_lower)
+        if has_required_titles and not title_match:
+            return False, 0.0
+        
+        if required_industries and (not industry or industry not in required_industries):
+            return False, 0.0
+        
+        if company_size and not (min_size <= company_size <= max_size):
+            return False, 0.0
+        
+        if has_excluded_titles and job_title_lower and excluded_title_match(job_title_lower):
+            return False, 0.0
+        
+        if email_domain is not None and email_domain in excluded_domains:
+            return False, 0.0
+        
+        # Score
+        score = 0.0
+        
+        if title_match:
+            score += job_title_weight
+        
+        if company_size:
+            distance = abs(company_size - mid_point)
+            fit_ratio = max(0, 1 - (distance / range_size)) if range_size > 0 else 1
+            score += company_size_weight * fit_ratio
+        
+        if industry and industry in required_industries:
+            score += industry_weight
+        
+        if country and country in required_countries:
+            score += geographic_weight
+        
+        return True, min(100, score)
+    
+    def evaluate(lead: Lead, job_title_lower: Optional[str]) -> Tuple[bool, float]:
+        # Features the rules don't look at are passed as None to raise the hit rate
+        email = lead.email
+        email_domain = None
+        if excluded_domains and email:
+            email_domain = email.split('@')[-1] if '@' in email else ''
+        
+        return evaluate_features(
+            job_title_lower if uses_titles else None,
+            lead.company_industry if required_industries else None,
+            lead.company_size,
+            lead.country if required_countries else None,
+            email_domain
+        )
+    
+    score_breakdown = {
+        "job_title_match": weights.get('job_title_match', 0),
+        "company_size_fit": weights.get('company_size_fit', 0),
+        "industry_match": weights.get('industry_match', 0),
+        "geographic_fit": weights.get('geographic_fit', 0),
+        "technographic_signals": weights.get('technographic_signals', 0)
+    }
+    rules_used = {
+        "job_titles": required.get('job_titles', []),
+        "industries": required.get('industries', []),
+        "company_size_range": [
+            required.get('company_size_min', 1),
+            required.get('company_size_max', 999999)
+        ],
+        "countries": required.get('countries', [])
+    }
+    
+    return CompiledICPRules(rules, evaluate, required_title_match, score_breakdown, rules_used)
+
 
 class ICPProcessor:
     """
     Processes leads against ICP scoring rules to create assignments
     """
     
+    # Leads handled per transaction
+    CHUNK_SIZE = 500
+    
+    # Assignments deleted per transaction on force reprocess
+    DELETE_BATCH_SIZE = 10000
+    
     def __init__(self, db: Session):
         self.db = db
     
@@ -66,8 +237,9 @@ class ICPProcessor:
                 "leads_processed": 0
             }
         
-        # Get raw leads (not yet processed)
-        raw_leads_query = self.db.query(Lead).filter(
+        # Get raw leads (not yet processed); ids are paged one chunk at a
+        # time and each chunk is loaded in _process_chunk
+        raw_leads_query = self.db.query(Lead.id).filter(
             Lead.tenant_id == tenant_id,
             or_(
                 Lead.processing_status == 'raw',
@@ -75,12 +247,10 @@ class ICPProcessor:
             )
         )
         
-        if limit:
-            raw_leads_query = raw_leads_query.limit(limit)
+        id_chunks = self._iter_id_chunks(raw_leads_query, limit)
+        first_chunk = next(id_chunks, None)
         
-        raw_leads = raw_leads_query.all()
-        
-        if not raw_leads:
+        if first_chunk is None:
             logger.info(f"No raw leads found for tenant {tenant_id}")
             return {
                 "status": "no_leads",
@@ -88,125 +258,288 @@ class ICPProcessor:
                 "leads_processed": 0
             }
         
-        # Process each lead
+        # Process leads in chunks, one transaction each
         stats = {
             "leads_processed": 0,
             "total_assignments": 0,
             "by_icp": {},
             "errors": []
         }
+        icp_names = {icp.id: icp.name for icp in icps}
+        compiled_by_icp = {icp.id: compile_icp_rules(icp.get_scoring_rules()) for icp in icps}
         
-        for lead in raw_leads:
-            try:
-                # Mark as processing
-                lead.processing_status = 'processing'
-                self.db.commit()
-                
-                # Process against all ICPs
-                assignments = await self.process_lead_against_icps(lead, icps)
-                
-                # Update lead status
-                lead.icp_match_count = len(assignments)
-                lead.processing_status = 'processed'
-                lead.last_processed_at = datetime.utcnow()
-                lead.processing_error = None
-                
-                stats["leads_processed"] += 1
-                stats["total_assignments"] += len(assignments)
-                
-                # Track per-ICP stats
-                for assignment in assignments:
-                    icp_name = assignment.icp.name
-                    if icp_name not in stats["by_icp"]:
-                        stats["by_icp"][icp_name] = 0
-                    stats["by_icp"][icp_name] += 1
-                
-                self.db.commit()
-                
-            except Exception as e:
-                logger.error(f"Error processing lead {lead.id}: {str(e)}")
-                lead.processing_status = 'error'
-                lead.processing_error = str(e)
-                lead.last_processed_at = datetime.utcnow()
-                self.db.commit()
-                
-                stats["errors"].append({
-                    "lead_id": str(lead.id),
-                    "error": str(e)
-                })
+        for chunk_ids in chain([first_chunk], id_chunks):
+            await self._process_chunk(chunk_ids, icps, icp_names, compiled_by_icp, stats)
         
         # Update last_processed_at for each ICP
+        now = datetime.utcnow()
         for icp in icps:
-            icp.last_processed_at = datetime.utcnow()
+            icp.last_processed_at = now
         self.db.commit()
         
         logger.info(f"Processing complete: {stats}")
         return stats
     
+    async def _process_chunk(
+        self,
+        lead_ids: List[Any],
+        icps: List[ICP],
+        icp_names: Dict[Any, str],
+        compiled_by_icp: Dict[Any, CompiledICPRules],
+        stats: Dict
+    ):
+        """
+        Process one chunk of leads in a single transaction
+        
+        Marks the chunk as processing, scores every lead, then bulk-inserts
+        the assignments and bulk-updates the leads. If the write fails, the
+        whole chunk is marked as errored.
+        
+        Args:
+            lead_ids: Ids of the leads in this chunk
+            icps: ICPs to check against
+            icp_names: ICP id -> name, for per-ICP stats
+            compiled_by_icp: ICP id -> compile_icp_rules(), built once per batch
+            stats: Run statistics, updated in place
+        """
+        # Mark as processing
+        self.db.query(Lead).filter(Lead.id.in_(lead_ids)).update(
+            {"processing_status": "processing"},
+            synchronize_session=False
+        )
+        self.db.commit()
+        
+        # Load the chunk after the commit: objects loaded before it would be
+        # expired and refreshed with one SELECT per lead
+        leads = self.db.query(Lead).filter(Lead.id.in_(lead_ids)).all()
+        existing = self._existing_pairs(lead_ids, [icp.id for icp in icps])
+        
+        # One timestamp for the whole chunk
+        now = datetime.utcnow()
+        
+        assignment_rows = []
+        lead_updates = []
+        errors = []
+        by_icp: Dict[str, int] = {}
+        
+        for lead in leads:
+            try:
+                # Process against all ICPs
+                rows = await self.process_lead_against_icps(lead, icps, existing, compiled_by_icp, now)
+            except Exception as e:
+                logger.error(f"Error processing lead {lead.id}: {str(e)}")
+                lead_updates.append({
+                    "id": lead.id,
+                    "processing_status": "error",
+                    "processing_error": str(e),
+                    "last_processed_at": now
+                })
+                errors.append({"lead_id": str(lead.id), "error": str(e)})
+                continue
+            
+            assignment_rows.extend(rows)
+            lead_updates.append({
+                "id": lead.id,
+                "icp_match_count": len(rows),
+                "processing_status": "processed",
+                "last_processed_at": now,
+                "processing_error": None
+            })
+            
+            # Track per-ICP stats
+            for row in rows:
+                icp_name = icp_names[row["icp_id"]]
+                by_icp[icp_name] = by_icp.get(icp_name, 0) + 1
+        
+        try:
+            if assignment_rows:
+                self.db.execute(insert(LeadICPAssignment), assignment_rows)
+            self.db.execute(update(Lead), lead_updates)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error saving chunk of {len(lead_ids)} leads: {str(e)}")
+            self.db.query(Lead).filter(Lead.id.in_(lead_ids)).update(
+                {
+                    "processing_status": "error",
+                    "processing_error": str(e),
+                    "last_processed_at": now
+                },
+                synchronize_session=False
+            )
+            self.db.commit()
+            stats["errors"].extend({"lead_id": str(lead_id), "error": str(e)} for lead_id in lead_ids)
+            return
+        
+        stats["leads_processed"] += len(leads) - len(errors)
+        stats["total_assignments"] += len(assignment_rows)
+        stats["errors"].extend(errors)
+        for icp_name, count in by_icp.items():
+            stats["by_icp"][icp_name] = stats["by_icp"].get(icp_name, 0) + count
+    
+    def _iter_id_chunks(self, ids_query, limit: Optional[int] = None) -> Iterator[List[Any]]:
+        """
+        Page through a Lead.id query in chunks of CHUNK_SIZE
+        
+        Uses keyset pagination (id > last id) rather than a streamed cursor:
+        every chunk commits, which would close a server-side cursor, and
+        only one chunk of ids is held at a time.
+        
+        Args:
+            ids_query: Query selecting Lead.id
+            limit: Optional - stop after this many ids
+            
+        Yields:
+            Lists of lead ids
+        """
+        last_id = None
+        remaining = limit
+        
+        while remaining is None or remaining > 0:
+            size = self.CHUNK_SIZE if remaining is None else min(self.CHUNK_SIZE, remaining)
+            page_query = ids_query
+            if last_id is not None:
+                page_query = page_query.filter(Lead.id > last_id)
+            
+            chunk_ids = [lead_id for (lead_id,) in page_query.order_by(Lead.id).limit(size).all()]
+            if not chunk_ids:
+                return
+            
+            yield chunk_ids
+            
+            if len(chunk_ids) < size:
+                return
+            last_id = chunk_ids[-1]
+            if remaining is not None:
+                remaining -= len(chunk_ids)
+    
+    def _delete_assignments_for_icp(self, icp_id: str) -> int:
+        """
+        Delete an ICP's assignments in batches of DELETE_BATCH_SIZE
+        
+        Each batch is its own short transaction, so a large ICP does not hold
+        locks or build up one huge transaction.
+        
+        Args:
+            icp_id: ICP whose assignments are removed
+            
+        Returns:
+            Number of assignments deleted
+        """
+        deleted = 0
+        
+        while True:
+            batch_ids = select(LeadICPAssignment.id).where(
+                LeadICPAssignment.icp_id == icp_id
+            ).limit(self.DELETE_BATCH_SIZE).scalar_subquery()
+            
+            result = self.db.execute(
+                delete(LeadICPAssignment)
+                .where(LeadICPAssignment.id.in_(batch_ids))
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+            deleted += result.rowcount
+            
+            if result.rowcount < self.DELETE_BATCH_SIZE:
+                break
+        
+        logger.info(f"Deleted {deleted} assignments for ICP {icp_id}")
+        return deleted
+    
+    def _existing_pairs(self, lead_ids: List[Any], icp_ids: List[Any]) -> Set[Tuple[Any, Any]]:
+        """
+        Load the (lead_id, icp_id) pairs that already have an assignment
+        
+        Args:
+            lead_ids: Leads to check
+            icp_ids: ICPs to check
+            
+        Returns:
+            Set of existing (lead_id, icp_id) pairs
+        """
+        rows = self.db.query(
+            LeadICPAssignment.lead_id,
+            LeadICPAssignment.icp_id
+        ).filter(
+            LeadICPAssignment.lead_id.in_(lead_ids),
+            LeadICPAssignment.icp_id.in_(icp_ids)
+        ).all()
+        return {(lead_id, icp_id) for lead_id, icp_id in rows}
+    
     async def process_lead_against_icps(
         self, 
         lead: Lead, 
-        icps: List[ICP]
-    ) -> List[LeadICPAssignment]:
+        icps: List[ICP],
+        existing: Optional[Set[Tuple[Any, Any]]] = None,
+        compiled_by_icp: Optional[Dict[Any, CompiledICPRules]] = None,
+        now: Optional[datetime] = None
+    ) -> List[Dict]:
         """
         Process a single lead against multiple ICPs
         
         Args:
             lead: Lead to process
             icps: List of ICPs to check against
+            existing: Preloaded (lead_id, icp_id) pairs that are already
+                assigned (see _existing_pairs); loaded for this lead if omitted
+            compiled_by_icp: Precomputed ICP id -> compile_icp_rules(); compiled
+                per ICP if omitted
+            now: Batch timestamp for processed_at; current time if omitted
             
         Returns:
-            List of created LeadICPAssignment objects
+            Assignment rows (LeadICPAssignment column dicts) for the caller to bulk-insert
         """
+        if existing is None:
+            existing = self._existing_pairs([lead.id], [icp.id for icp in icps])
+        if compiled_by_icp is None:
+            compiled_by_icp = {icp.id: compile_icp_rules(icp.get_scoring_rules()) for icp in icps}
+        if now is None:
+            now = datetime.utcnow()
+        now_iso = now.isoformat()
+        
         assignments = []
+        job_title_lower = lead.job_title.lower() if lead.job_title else None
         
         for icp in icps:
             # Check if already assigned
-            existing = self.db.query(LeadICPAssignment).filter(
-                LeadICPAssignment.lead_id == lead.id,
-                LeadICPAssignment.icp_id == icp.id
-            ).first()
-            
-            if existing:
+            if (lead.id, icp.id) in existing:
                 logger.debug(f"Lead {lead.id} already assigned to ICP {icp.id}")
                 continue
             
-            # Check if lead matches ICP filters
-            if not icp.matches_filters(lead):
+            compiled = compiled_by_icp[icp.id]
+            rules = compiled.rules
+            
+            # Check filters and calculate fit score
+            matches, fit_score = compiled.evaluate(lead, job_title_lower)
+            if not matches:
                 logger.debug(f"Lead {lead.id} does not match filters for ICP {icp.id}")
                 continue
             
-            # Calculate fit score
-            fit_score = icp.calculate_fit_score(lead)
-            
-            # Get scoring rules for thresholds
-            rules = icp.get_scoring_rules()
+            # Thresholds from the scoring rules
             thresholds = rules.get('thresholds', {})
             
             # Determine bucket based on score
             bucket = self._determine_bucket(fit_score, thresholds)
             
             # Determine status based on bucket
-            status = self._bucket_to_status(bucket)
+            status = _BUCKET_TO_STATUS.get(bucket, 'pending_review')
             
             # Create scoring details
-            scoring_details = self._create_scoring_details(lead, icp, fit_score, rules)
+            scoring_details = self._create_scoring_details(lead, icp, fit_score, compiled, job_title_lower, now_iso)
             
             # Create assignment
-            assignment = LeadICPAssignment(
-                lead_id=lead.id,
-                icp_id=icp.id,
-                tenant_id=lead.tenant_id,
-                fit_score_percentage=fit_score,
-                bucket=bucket,
-                status=status,
-                scoring_details=scoring_details,
-                scoring_version=1,
-                processed_at=datetime.utcnow()
-            )
-            
-            self.db.add(assignment)
-            assignments.append(assignment)
+            assignments.append({
+                "lead_id": lead.id,
+                "icp_id": icp.id,
+                "tenant_id": lead.tenant_id,
+                "fit_score_percentage": fit_score,
+                "bucket": bucket,
+                "status": status,
+                "scoring_details": scoring_details,
+                "scoring_version": 1,
+                "processed_at": now
+            })
             
             logger.info(f"Created assignment: Lead {lead.id} → ICP {icp.id} (score: {fit_score}%, bucket: {bucket})")
         
@@ -233,34 +566,14 @@ class ICPProcessor:
         else:
             return 'rejected'  # Low score - auto-reject
     
-    def _bucket_to_status(self, bucket: str) -> str:
-        """
-        Convert bucket to status for backward compatibility
-        
-        Args:
-            bucket: Bucket name
-            
-        Returns:
-            Status string
-        """
-        bucket_to_status_map = {
-            'new': 'pending_review',
-            'score': 'pending_review',
-            'enriched': 'pending_review',
-            'verified': 'pending_review',
-            'review': 'pending_review',
-            'qualified': 'qualified',
-            'rejected': 'rejected',
-            'exported': 'exported'
-        }
-        return bucket_to_status_map.get(bucket, 'pending_review')
-    
     def _create_scoring_details(
         self, 
         lead: Lead, 
         icp: ICP, 
         fit_score: float,
-        rules: Dict
+        compiled: CompiledICPRules,
+        job_title_lower: Optional[str],
+        processed_at: str
     ) -> Dict:
         """
         Create detailed breakdown of scoring
@@ -269,23 +582,23 @@ class ICPProcessor:
             lead: Lead being scored
             icp: ICP being matched against
             fit_score: Calculated fit score
-            rules: ICP scoring rules
+            compiled: The ICP's compiled scoring rules
+            job_title_lower: lead.job_title lowercased (None if empty)
+            processed_at: Batch timestamp, ISO formatted
             
         Returns:
             Dictionary with scoring breakdown
         """
-        filters = rules.get('filters', {})
-        weights = rules.get('weights', {})
-        required = filters.get('required', {})
+        rules = compiled.rules
+        required = rules.get('filters', {}).get('required', {})
         
         # Determine which filters matched
         matched_filters = []
         failed_filters = []
         
         # Job title check
-        if required.get('job_titles') and lead.job_title:
-            job_title_lower = lead.job_title.lower()
-            if any(jt.lower() in job_title_lower for jt in required['job_titles']):
+        if required.get('job_titles') and job_title_lower:
+            if compiled.required_title_match(job_title_lower):
                 matched_filters.append('job_title')
             else:
                 failed_filters.append('job_title')
@@ -327,24 +640,10 @@ class ICPProcessor:
             "matched_filters": matched_filters,
             "failed_filters": failed_filters,
             "recommendation": recommendation,
-            "score_breakdown": {
-                "job_title_match": weights.get('job_title_match', 0),
-                "company_size_fit": weights.get('company_size_fit', 0),
-                "industry_match": weights.get('industry_match', 0),
-                "geographic_fit": weights.get('geographic_fit', 0),
-                "technographic_signals": weights.get('technographic_signals', 0)
-            },
+            "score_breakdown": compiled.score_breakdown,
             "scoring_version": 1,
-            "processed_at": datetime.utcnow().isoformat(),
-            "rules_used": {
-                "job_titles": required.get('job_titles', []),
-                "industries": required.get('industries', []),
-                "company_size_range": [
-                    required.get('company_size_min', 1),
-                    required.get('company_size_max', 999999)
-                ],
-                "countries": required.get('countries', [])
-            }
+            "processed_at": processed_at,
+            "rules_used": compiled.rules_used
         }
     
     async def reprocess_leads_for_icp(
@@ -370,29 +669,25 @@ class ICPProcessor:
                 "message": "ICP not found"
             }
         
-        # Get leads for this tenant
-        leads_query = self.db.query(Lead).filter(
+        # Get leads for this tenant (ids only, each chunk is loaded below)
+        leads_query = self.db.query(Lead.id).filter(
             Lead.tenant_id == icp.tenant_id
         )
         
         if not force:
-            # Only get leads not yet assigned to this ICP
-            leads_query = leads_query.filter(
-                not_(exists().where(
-                    and_(
-                        LeadICPAssignment.lead_id == Lead.id,
-                        LeadICPAssignment.icp_id == icp_id
-                    )
-                ))
+            # Only get leads not yet assigned to this ICP (anti-join)
+            leads_query = leads_query.outerjoin(
+                LeadICPAssignment,
+                and_(
+                    LeadICPAssignment.lead_id == Lead.id,
+                    LeadICPAssignment.icp_id == icp_id
+                )
+            ).filter(
+                LeadICPAssignment.id == None
             )
         else:
             # Delete existing assignments if force=True
-            self.db.query(LeadICPAssignment).filter(
-                LeadICPAssignment.icp_id == icp_id
-            ).delete()
-            self.db.commit()
-        
-        leads = leads_query.all()
+            self._delete_assignments_for_icp(icp_id)
         
         # Process each lead
         stats = {
@@ -400,19 +695,37 @@ class ICPProcessor:
             "assignments_created": 0,
             "errors": []
         }
-        
-        for lead in leads:
+        compiled_by_icp = {icp.id: compile_icp_rules(icp.get_scoring_rules())}
+        
+        for chunk_ids in self._iter_id_chunks(leads_query):
+            chunk = self.db.query(Lead).filter(Lead.id.in_(chunk_ids)).all()
+            assignment_rows = []
+            processed = 0
+            errors = []
+            existing = self._existing_pairs(chunk_ids, [icp.id])
+            now = datetime.utcnow()
+            
+            for lead in chunk:
+                try:
+                    assignment_rows.extend(await self.process_lead_against_icps(lead, [icp], existing, compiled_by_icp, now))
+                    processed += 1
+                except Exception as e:
+                    logger.error(f"Error reprocessing lead {lead.id}: {str(e)}")
+                    errors.append({"lead_id": str(lead.id), "error": str(e)})
+            
             try:
-                assignments = await self.process_lead_against_icps(lead, [icp])
-                stats["leads_processed"] += 1
-                stats["assignments_created"] += len(assignments)
+                if assignment_rows:
+                    self.db.execute(insert(LeadICPAssignment), assignment_rows)
                 self.db.commit()
             except Exception as e:
-                logger.error(f"Error reprocessing lead {lead.id}: {str(e)}")
-                stats["errors"].append({
-                    "lead_id": str(lead.id),
-                    "error": str(e)
-                })
+                self.db.rollback()
+                logger.error(f"Error saving chunk of {len(chunk)} leads: {str(e)}")
+                stats["errors"].extend({"lead_id": str(lead_id), "error": str(e)} for lead_id in chunk_ids)
+                continue
+            
+            stats["leads_processed"] += processed
+            stats["assignments_created"] += len(assignment_rows)
+            stats["errors"].extend(errors)
         
         icp.last_processed_at = datetime.utcnow()
         self.db.commit()
@@ -429,33 +742,28 @@ class ICPProcessor:
         Returns:
             Statistics dictionary
         """
-        total_leads = self.db.query(Lead).filter(
-            Lead.tenant_id == tenant_id
-        ).count()
-        
-        raw_leads = self.db.query(Lead).filter(
-            Lead.tenant_id == tenant_id,
-            or_(
+        # One pass over the tenant's leads with conditional aggregates
+        counts = self.db.query(
+            func.count().label('total'),
+            func.count().filter(or_(
                 Lead.processing_status == 'raw',
                 Lead.processing_status == None
-            )
-        ).count()
-        
-        processed_leads = self.db.query(Lead).filter(
-            Lead.tenant_id == tenant_id,
-            Lead.processing_status == 'processed'
-        ).count()
-        
-        error_leads = self.db.query(Lead).filter(
-            Lead.tenant_id == tenant_id,
-            Lead.processing_status == 'error'
-        ).count()
+            )).label('raw'),
+            func.count().filter(Lead.processing_status == 'processed').label('processed'),
+            func.count().filter(Lead.processing_status == 'error').label('error'),
+            func.count().filter(and_(
+                Lead.processing_status == 'processed',
+                Lead.icp_match_count == 0
+            )).label('orphaned')
+        ).select_from(Lead).filter(
+            Lead.tenant_id == tenant_id
+        ).one()
         
-        orphaned_leads = self.db.query(Lead).filter(
-            Lead.tenant_id == tenant_id,
-            Lead.processing_status == 'processed',
-            Lead.icp_match_count == 0
-        ).count()
+        total_leads = counts.total
+        raw_leads = counts.raw
+        processed_leads = counts.processed
+        error_leads = counts.error
+        orphaned_leads = counts.orphaned
         
         return {
             "total_leads": total_leads,
@@ -8,24 +8,239 @@ UPDATED:
 - Configurable criteria_pass_threshold (no hardcoded 50)
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List, Mapping, Pattern, Tuple
 from dataclasses import dataclass
+from collections import OrderedDict
+import json
 import logging
+import re
+import sys
+from types import MappingProxyType
 
+import orjson
 from sqlalchemy.orm import Session
 from app.models import Lead, ICP
+from app.utils.text_matching import AHOCORASICK_AVAILABLE, ahocorasick, title_matcher
 
 logger = logging.getLogger(__name__)
 
+COMPILED_ICP_CACHE_SIZE = 256
+
+# Dimension weights used when an ICP has no weight_config
+_DEFAULT_WEIGHTS = MappingProxyType({
+    "industry": 20,
+    "company_size": 15,
+    "seniority": 25,
+    "tech_stack": 20,
+    "geography": 10,
+    "company_type": 10
+})
+
+# ASCII unit separator: cannot appear in a technology name, so a substring
+# search over the joined tech stack never matches across two entries
+TECH_STACK_SEPARATOR = "\x1f"
+
+# Company size breakdown details keyed by (in ideal range, below minimum)
+COMPANY_SIZE_DETAILS = {
+    (True, False): "{count} employees (ideal range: {min_size}-{max_size})",
+    (False, True): "{count} employees (below min {min_size})",
+    (False, False): "{count} employees (above max {max_size})",
+}
+
+# Job title keywords per seniority level, highest level first: a title
+# matching several levels gets the first one
+SENIORITY_LEVELS = (
+    ("c-level", ("ceo", "cto", "cfo", "coo", "president", "founder", "chief")),
+    ("vp", ("vp", "vice president")),
+    ("director", ("director", "head of")),
+    ("manager", ("manager", "lead")),
+    ("senior", ("senior", "sr")),
+    ("junior", ("junior", "jr", "associate")),
+)
+
+
+def _build_seniority_detector() -> Callable[[str], Optional[str]]:
+    """
+    Build a job_title_lower -> seniority level (or None) lookup
+    
+    With pyahocorasick the title is scanned once for every keyword and the
+    highest-priority hit wins; otherwise the levels are checked in order.
+    """
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for priority, (_, keywords) in enumerate(SENIORITY_LEVELS):
+            for keyword in keywords:
+                if keyword not in automaton:
+                    automaton.add_word(keyword, priority)
+        automaton.make_automaton()
+        
+        def detect(job_title_lower: str) -> Optional[str]:
+            best = None
+            for _, priority in automaton.iter(job_title_lower):
+                if best is None or priority < best:
+                    best = priority
+                    if best == 0:
+                        break
+            return SENIORITY_LEVELS[best][0] if best is not None else None
+        
+        return detect
+    
+    def detect(job_title_lower: str) -> Optional[str]:
+        for level, keywords in SENIORITY_LEVELS:
+            if any(kw in job_title_lower for kw in keywords):
+                return level
+        return None
+    
+    return detect
+
+
+_detect_seniority = _build_seniority_detector()
+
+
+@dataclass(slots=True, frozen=True)
+class CompiledICP:
+    """
+    An ICP's scoring_rules normalized once for scoring many leads
+
+    Target lists are stored as tuples of lowercased strings so the
+    _score_* methods never re-lowercase them per lead. The original
+    lists are kept where they are echoed back in the breakdown.
+    """
+    rules: Dict[str, Any]
+    # weight_config, or the default weights (read-only either way)
+    weights: Mapping[str, Any]
+    target_industries: Tuple[str, ...]
+    target_industries_lc: Tuple[str, ...]
+    required_tech_lc: Tuple[str, ...]
+    preferred_tech_lc: Tuple[str, ...]
+    target_seniority_lc: Tuple[str, ...]
+    job_title_keywords_lc: Tuple[str, ...]
+    # Lowercased job title -> contains one of job_title_keywords
+    job_title_keyword_match: Callable[[str], bool]
+    target_geographies: Tuple[str, ...]
+    target_geos_lc: Tuple[str, ...]
+    positive_keywords_lc: Tuple[str, ...]
+    negative_keywords_lc: Tuple[str, ...]
+    # "Contains any of" alternations over the lowercased lists (None if empty)
+    industry_re: Optional[Pattern]
+    geo_re: Optional[Pattern]
+    negative_keywords_re: Optional[Pattern]
+
+
+def _lowered(values) -> Tuple[str, ...]:
+    return tuple(v.lower() for v in values or ())
+
+
+def _alternation(values_lc: Tuple[str, ...]) -> Optional[Pattern]:
+    """One regex matching any of `values_lc` literally, or None for no values"""
+    if not values_lc:
+        return None
+    return re.compile("|".join(map(re.escape, values_lc)))
+
+
+def _json_copy(value: Any) -> Any:
+    """Deep copy of a JSON value (non-JSON types come back as strings)"""
+    try:
+        return orjson.loads(orjson.dumps(value))
+    except TypeError:
+        return json.loads(json.dumps(value, default=str))
+
+
+def _coerce_weights(weight_config: Dict) -> Mapping[str, float]:
+    """weight_config as floats; values that aren't numbers count as 0 (dimension skipped)"""
+    weights = {}
+    for dimension, value in weight_config.items():
+        try:
+            weights[dimension] = float(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring non-numeric weight {value!r} for {dimension}")
+            weights[dimension] = 0.0
+    return MappingProxyType(weights)
+
+
+def _compile_icp(scoring_rules: Optional[Dict], weight_config: Optional[Dict]) -> CompiledICP:
+    """Build the CompiledICP for an ICP's scoring_rules and weights"""
+    # Round-trip through JSON so the compiled rules don't alias the ICP's
+    # (mutable) JSONB value
+    rules = _json_copy(scoring_rules or {})
+    # weight_config may hold strings like "2" (e.g. from form input)
+    weights = _coerce_weights(weight_config) if weight_config else _DEFAULT_WEIGHTS
+    target_industries = tuple(rules.get('target_industries') or ())
+    target_geographies = tuple(rules.get('target_geographies') or ())
+    job_title_keywords_lc = _lowered(rules.get('job_title_keywords'))
+    target_industries_lc = _lowered(target_industries)
+    target_geos_lc = _lowered(target_geographies)
+    negative_keywords_lc = _lowered(rules.get('excluded_keywords'))
+
+    return CompiledICP(
+        rules=rules,
+        weights=weights,
+        target_industries=target_industries,
+        target_industries_lc=target_industries_lc,
+        required_tech_lc=_lowered(rules.get('required_technologies')),
+        preferred_tech_lc=_lowered(rules.get('preferred_technologies')),
+        # Compared by equality against the SENIORITY_LEVELS names (interned
+        # literals), so interning lets the comparison short-circuit on identity
+        target_seniority_lc=tuple(map(sys.intern, _lowered(rules.get('target_seniority_levels')))),
+        job_title_keywords_lc=job_title_keywords_lc,
+        job_title_keyword_match=title_matcher(job_title_keywords_lc),
+        target_geographies=target_geographies,
+        target_geos_lc=target_geos_lc,
+        positive_keywords_lc=_lowered(rules.get('company_type_keywords')),
+        negative_keywords_lc=negative_keywords_lc,
+        industry_re=_alternation(target_industries_lc),
+        geo_re=_alternation(target_geos_lc),
+        negative_keywords_re=_alternation(negative_keywords_lc),
+    )
+
+
+# (icp id, updated_at) -> CompiledICP, least recently used first
+_compiled_icps: "OrderedDict[Tuple[Any, Any], CompiledICP]" = OrderedDict()
+
+
+def compile_icp(icp: ICP) -> CompiledICP:
+    """
+    Get the (cached) CompiledICP for an ICP
+
+    The cache is keyed on (id, updated_at): saving an edited ICP moves
+    updated_at, so the next lookup compiles the new rules. A hit costs a
+    dict lookup; the rules are only dumped when compiling. ICPs without
+    an id (not yet saved) are compiled on every call.
+    """
+    if icp.id is None:
+        return _compile_icp(icp.scoring_rules, icp.weight_config)
+    
+    key = (icp.id, icp.updated_at)
+    compiled = _compiled_icps.get(key)
+    if compiled is not None:
+        _compiled_icps.move_to_end(key)
+        return compiled
+    
+    compiled = _compile_icp(icp.scoring_rules, icp.weight_config)
+    _compiled_icps[key] = compiled
+    if len(_compiled_icps) > COMPILED_ICP_CACHE_SIZE:
+        _compiled_icps.popitem(last=False)
+    return compiled
+
 
 @dataclass
 class ScoreResult:
     """Result of scoring a lead against an ICP"""
-    score: float  # 0-100
-    confidence: float  # 0-100
-    breakdown: Dict[str, Any]
+    score_x100: int  # 0-10000 (score in hundredths of a percent)
+    confidence_x100: int  # 0-10000
+    breakdown: Optional[Dict[str, Any]]  # None unless scored with explain=True
     dimensions_scored: int
     total_dimensions: int
+    
+    @property
+    def score(self) -> float:
+        """Score as a 0-100 percentage with two decimals"""
+        return self.score_x100 / 100
+    
+    @property
+    def confidence(self) -> float:
+        """Confidence as a 0-100 percentage with two decimals"""
+        return self.confidence_x100 / 100
 
 
 class ICPScoringEngine:
@@ -42,90 +257,118 @@ class ICPScoringEngine:
     def __init__(self, db: Session):
         self.db = db
     
-    async def score_lead(self, lead: Lead, icp: ICP) -> ScoreResult:
-        """Score lead against ICP criteria"""
-        
-        # ✅ SET WEIGHTS FIRST!
-        self.weights = icp.weight_config or {
-            "industry": 20,
-            "company_size": 15,
-            "seniority": 25,
-            "tech_stack": 20,
-            "geography": 10,
-            "company_type": 10
-        }
+    def score_lead(self, lead: Lead, icp: ICP, explain: bool = False) -> ScoreResult:
+        """
+        Score lead against ICP criteria (pure CPU work, so not a coroutine)
         
-        # Extract scoring rules
-        scoring_rules = icp.scoring_rules or {}
+        The per-dimension breakdown is only built when `explain` is True;
+        otherwise ScoreResult.breakdown is None.
+        """
+        return self._score_compiled(lead, compile_icp(icp), explain)
+    
+    def score_leads(self, leads: List[Lead], icp: ICP, explain: bool = False) -> List[ScoreResult]:
+        """
+        Score a batch of leads against one ICP
+        
+        The ICP is compiled (or fetched from the cache) once for the whole
+        batch rather than per lead. Results are in the same order as `leads`.
+        """
+        compiled = compile_icp(icp)
+        return [self._score_compiled(lead, compiled, explain) for lead in leads]
+    
+    def _score_compiled(
+        self,
+        lead: Lead,
+        compiled: CompiledICP,
+        explain: bool
+    ) -> ScoreResult:
+        """Score one lead against an already compiled ICP"""
+        
+        scoring_rules = compiled.rules
+        weights = compiled.weights
         
         # Initialize scores
         total_score = 0
-        max_possible_score = 0
-        breakdown = {}
+        total_weight = 0
+        breakdown = {} if explain else None
         dimensions_scored = 0
         
-        # Score each dimension
+        # Score each dimension that has criteria and a non-zero weight;
+        # a zero-weight dimension cannot move the score, so it is skipped
         
         # 1. Industry match
-        if scoring_rules.get("target_industries"):
-            industry_score, industry_breakdown = self._score_industry(lead, scoring_rules)
-            breakdown["industry"] = industry_breakdown
-            total_score += industry_score
-            max_possible_score += 100
+        weight = weights.get("industry", 0)
+        if weight > 0 and scoring_rules.get("target_industries"):
+            industry_score, industry_breakdown = self._score_industry(lead, compiled, explain)
+            if explain:
+                breakdown["industry"] = industry_breakdown
+            total_score += industry_score * weight
+            total_weight += weight
             dimensions_scored += 1
         
         # 2. Company size
-        if scoring_rules.get("ideal_company_size_min") or scoring_rules.get("ideal_company_size_max"):
-            size_score, size_breakdown = self._score_company_size(lead, scoring_rules)
-            breakdown["company_size"] = size_breakdown
-            total_score += size_score
-            max_possible_score += 100
+        weight = weights.get("company_size", 0)
+        if weight > 0 and (scoring_rules.get("ideal_company_size_min") or scoring_rules.get("ideal_company_size_max")):
+            size_score, size_breakdown = self._score_company_size(lead, compiled, explain)
+            if explain:
+                breakdown["company_size"] = size_breakdown
+            total_score += size_score * weight
+            total_weight += weight
             dimensions_scored += 1
         
         # 3. Seniority
-        if scoring_rules.get("target_seniority_levels") or scoring_rules.get("job_title_keywords"):
-            seniority_score, seniority_breakdown = self._score_seniority(lead, scoring_rules)
-            breakdown["seniority"] = seniority_breakdown
-            total_score += seniority_score
-            max_possible_score += 100
+        weight = weights.get("seniority", 0)
+        if weight > 0 and (scoring_rules.get("target_seniority_levels") or scoring_rules.get("job_title_keywords")):
+            seniority_score, seniority_breakdown = self._score_seniority(lead, compiled, explain)
+            if explain:
+                breakdown["seniority"] = seniority_breakdown
+            total_score += seniority_score * weight
+            total_weight += weight
             dimensions_scored += 1
         
         # 4. Tech stack
-        if scoring_rules.get("required_technologies") or scoring_rules.get("preferred_technologies"):
-            tech_score, tech_breakdown = self._score_tech_stack(lead, scoring_rules)
-            breakdown["tech_stack"] = tech_breakdown
-            total_score += tech_score
-            max_possible_score += 100
+        weight = weights.get("tech_stack", 0)
+        if weight > 0 and (scoring_rules.get("required_technologies") or scoring_rules.get("preferred_technologies")):
+            tech_score, tech_breakdown = self._score_tech_stack(lead, compiled, explain)
+            if explain:
+                breakdown["tech_stack"] = tech_breakdown
+            total_score += tech_score * weight
+            total_weight += weight
             dimensions_scored += 1
         
         # 5. Geography
-        if scoring_rules.get("target_geographies"):
-            geo_score, geo_breakdown = self._score_geography(lead, scoring_rules)
-            breakdown["geography"] = geo_breakdown
-            total_score += geo_score
-            max_possible_score += 100
+        weight = weights.get("geography", 0)
+        if weight > 0 and scoring_rules.get("target_geographies"):
+            geo_score, geo_breakdown = self._score_geography(lead, compiled, explain)
+            if explain:
+                breakdown["geography"] = geo_breakdown
+            total_score += geo_score * weight
+            total_weight += weight
             dimensions_scored += 1
         
         # 6. Company type
-        if scoring_rules.get("company_type_keywords"):
-            type_score, type_breakdown = self._score_company_type(lead, scoring_rules)
-            breakdown["company_type"] = type_breakdown
-            total_score += type_score
-            max_possible_score += 100
+        weight = weights.get("company_type", 0)
+        if weight > 0 and scoring_rules.get("company_type_keywords"):
+            type_score, type_breakdown = self._score_company_type(lead, compiled, explain)
+            if explain:
+                breakdown["company_type"] = type_breakdown
+            total_score += type_score * weight
+            total_weight += weight
             dimensions_scored += 1
         
-        # Calculate final score
-        if max_possible_score > 0:
-            final_score = round((total_score / max_possible_score) * 100, 2)
+        # Final score: weighted mean of the scored dimensions (each 0-100),
+        # kept as an integer number of hundredths
+        if total_weight > 0:
+            score_x100 = round(total_score * 100 / total_weight)
         else:
-            final_score = 0.0
+            score_x100 = 0
         
-        # Calculate confidence
-        confidence = round((dimensions_scored / 6) * 100, 2)
+        # Calculate confidence (dimensions_scored / 6, rounded to 0.01%)
+        confidence_x100 = (dimensions_scored * 10000 + 3) // 6
         
         return ScoreResult(
-            score=final_score,
-            confidence=confidence,
+            score_x100=score_x100,
+            confidence_x100=confidence_x100,
             breakdown=breakdown,
             dimensions_scored=dimensions_scored,
             total_dimensions=6
@@ -154,93 +397,90 @@ class ICPScoringEngine:
         # Required locations
         if 'required_locations' in filter_rules:
             required_locs = [loc.lower() for loc in filter_rules['required_locations']]
-            lead_country = (lead.country or "").lower()
+            lead_country = lead.country_lc
             if not any(loc in lead_country for loc in required_locs):
                 return False, f"Location {lead.country} not in required: {filter_rules['required_locations']}"
         
         # Excluded industries
         if 'excluded_industries' in filter_rules:
             excluded = [ind.lower() for ind in filter_rules['excluded_industries']]
-            lead_industry = (lead.company_industry or "").lower()
+            lead_industry = lead.company_industry_lc
             if any(exc in lead_industry for exc in excluded):
                 return False, f"Industry {lead.company_industry} is excluded"
         
         return True, None
     
  # Find the company size scoring section
-    def _score_company_size(self, lead: Lead, scoring_rules: Dict) -> tuple:
+    def _score_company_size(self, lead: Lead, compiled: CompiledICP, explain: bool) -> tuple:
         """Score based on company size"""
         
         # Get employee count (handle both string and int)
         employee_count_str = lead.company_employee_count
         
         if not employee_count_str:
-            return 0, {
+            return 0, ({
                 "score": 0,
-                "weight": self.weights.get("company_size", 0),
+                "weight": compiled.weights.get("company_size", 0),
                 "weighted_score": 0,
                 "max_score": 100,
                 "details": "No employee count data",
                 "matched": False
-            }
+            } if explain else None)
         
-        # ✅ Convert to int safely
-        try:
-            employee_count = int(str(employee_count_str).replace(',', ''))
-        except (ValueError, AttributeError):
-            return 0, {
+        # Parsed once per lead, however many ICPs it is scored against
+        employee_count = lead.company_employee_count_int
+        if employee_count is None:
+            return 0, ({
                 "score": 0,
-                "weight": self.weights.get("company_size", 0),
+                "weight": compiled.weights.get("company_size", 0),
                 "weighted_score": 0,
                 "max_score": 100,
                 "details": f"Invalid employee count: {employee_count_str}",
                 "matched": False
-            }
+            } if explain else None)
         
-        # ✅ CORRECT - use scoring_rules parameter (already a dict!)
-        min_size = scoring_rules.get("ideal_company_size_min")
-        max_size = scoring_rules.get("ideal_company_size_max")
+        min_size = compiled.rules.get("ideal_company_size_min")
+        max_size = compiled.rules.get("ideal_company_size_max")
         
         if not min_size or not max_size:
-            return 50, {
+            return 50, ({
                 "score": 50,
-                "weight": self.weights.get("company_size", 0),
+                "weight": compiled.weights.get("company_size", 0),
                 "weighted_score": 0,
                 "max_score": 100,
                 "details": "No size criteria defined",
                 "matched": True
-            }
+            } if explain else None)
         
         # ✅ Ensure min/max are integers
         min_size = int(min_size)
         max_size = int(max_size)
         
-        # Score based on range
-        if min_size <= employee_count <= max_size:
-            score = 100
-            details = f"{employee_count} employees (ideal range: {min_size}-{max_size})"
-            matched = True
-        elif employee_count < min_size:
-            ratio = employee_count / min_size
-            score = int(ratio * 80)
-            details = f"{employee_count} employees (below min {min_size})"
-            matched = False
-        else:
-            ratio = max_size / employee_count
-            score = int(ratio * 80)
-            details = f"{employee_count} employees (above max {max_size})"
-            matched = False
+        # Score based on range: 100 inside it, otherwise up to 80 scaled by
+        # how close the count is to the bound it misses
+        matched = min_size <= employee_count <= max_size
+        below = employee_count < min_size
+        score = 100 if matched else int(
+            (employee_count / min_size if below else max_size / employee_count) * 80
+        )
         
-        return score, {
+        return score, ({
             "score": score,
-            "weight": self.weights.get("company_size", 0),
+            "weight": compiled.weights.get("company_size", 0),
             "weighted_score": 0,
             "max_score": 100,
-            "details": details,
+            "details": COMPANY_SIZE_DETAILS[matched, below].format(
+                count=employee_count, min_size=min_size, max_size=max_size
+            ),
             "matched": matched
-        }
+        } if explain else None)
     
-    def _score_industry(self, lead: Lead, scoring_rules: Dict) -> tuple[float, Dict[str, Any]]:
+    def _score_industry(
+        self,
+        lead: Lead,
+        compiled: CompiledICP,
+        explain: bool
+    ) -> tuple[float, Optional[Dict[str, Any]]]:
         """
         Score based on industry match
         
@@ -249,41 +489,46 @@ class ICPScoringEngine:
             "target_industries": ["Software", "SaaS", "Technology"]
         }
         """
-        industry = (lead.company_industry or "").lower()
-        
-        # Get target industries from ICP
-        target_industries = scoring_rules.get('target_industries', [])
+        industry = lead.company_industry_lc
         
-        if not target_industries:
+        if not compiled.target_industries:
             # No criteria defined - neutral score
-            return 50, {
+            return 50, ({
                 "score": 50,
                 "industry": lead.company_industry,
                 "note": "no_criteria_defined"
-            }
+            } if explain else None)
         
-        # Check for exact or partial matches
-        match_score = 0
-        matched_targets = []
-        for target in target_industries:
-            if target.lower() in industry:
-                match_score = 100
-                matched_targets.append(target)
-                break
+        # Check for exact or partial matches (partial credit if none)
+        matched = compiled.industry_re.search(industry) is not None
+        match_score = 100 if matched else 40
         
-        # Partial credit if no exact match
-        if match_score == 0:
-            match_score = 40
+        if not explain:
+            return match_score, None
+        
+        # Report the first target in ICP order, not the leftmost in the text
+        matched_targets = [
+            next(
+                target
+                for target, target_lc in zip(compiled.target_industries, compiled.target_industries_lc)
+                if target_lc in industry
+            )
+        ] if matched else []
         
         return match_score, {
             "score": match_score,
             "industry": lead.company_industry,
-            "target_industries": target_industries,
+            "target_industries": list(compiled.target_industries),
             "matched": matched_targets,
-            "exact_match": match_score == 100
+            "exact_match": matched
         }
     
-    def _score_tech_stack(self, lead: Lead, scoring_rules: Dict) -> tuple[float, Dict[str, Any]]:
+    def _score_tech_stack(
+        self,
+        lead: Lead,
+        compiled: CompiledICP,
+        explain: bool
+    ) -> tuple[float, Optional[Dict[str, Any]]]:
         """
         Score based on tech stack match
         
@@ -293,50 +538,48 @@ class ICPScoringEngine:
             "preferred_technologies": ["AWS", "Kubernetes"]
         }
         """
-        tech_stack = lead.enrichment_data.get('tech_stack', [])
+        # The raw list is only needed to echo it back in the breakdown
+        tech_stack = (lead.enrichment_data or {}).get('tech_stack', []) if explain else None
         
-        # Get tech requirements from ICP
-        required_tech = [t.lower() for t in scoring_rules.get('required_technologies', [])]
-        preferred_tech = [t.lower() for t in scoring_rules.get('preferred_technologies', [])]
+        required_tech = compiled.required_tech_lc
+        preferred_tech = compiled.preferred_tech_lc
         
         if not required_tech and not preferred_tech:
-            return 50, {
+            return 50, ({
                 "score": 50,
                 "tech_stack": tech_stack,
                 "note": "no_criteria_defined"
-            }
+            } if explain else None)
         
-        # Convert tech_stack to lowercase for matching
-        if isinstance(tech_stack, list):
-            tech_lower = [str(t).lower() for t in tech_stack]
-        else:
-            tech_lower = []
+        # Join the lead's (cached) lowercased tech_stack into one string so each
+        # requirement is a single substring search rather than a scan over
+        # every entry
+        tech_stack_lc = lead.tech_stack_lc
+        tech_blob = TECH_STACK_SEPARATOR.join(tech_stack_lc) if tech_stack_lc else None
         
         # Check required tech (must have ALL)
         required_matches = []
         if required_tech:
-            for req in required_tech:
-                if any(req in tech for tech in tech_lower):
-                    required_matches.append(req)
+            if tech_blob is not None:
+                required_matches = [req for req in required_tech if req in tech_blob]
             
             required_ratio = len(required_matches) / len(required_tech)
             if required_ratio < 1.0:
                 # Missing required tech - low score
                 score = required_ratio * 50
-                return score, {
+                return score, ({
                     "score": round(score, 2),
                     "tech_stack": tech_stack,
                     "required_matches": required_matches,
                     "required_missing": [r for r in required_tech if r not in required_matches],
                     "note": "missing_required_tech"
-                }
+                } if explain else None)
         
         # Check preferred tech (bonus points)
         preferred_matches = []
         if preferred_tech:
-            for pref in preferred_tech:
-                if any(pref in tech for tech in tech_lower):
-                    preferred_matches.append(pref)
+            if tech_blob is not None:
+                preferred_matches = [pref for pref in preferred_tech if pref in tech_blob]
             
             preferred_ratio = len(preferred_matches) / len(preferred_tech)
             bonus = preferred_ratio * 50
@@ -346,15 +589,20 @@ class ICPScoringEngine:
         # Final score: 50 base + 50 for preferred
         score = min(100, 50 + bonus)
         
-        return score, {
+        return score, ({
             "score": round(score, 2),
             "tech_stack": tech_stack,
             "required_matches": required_matches,
             "preferred_matches": preferred_matches,
             "all_required_met": len(required_matches) == len(required_tech) if required_tech else True
-        }
+        } if explain else None)
     
-    def _score_seniority(self, lead: Lead, scoring_rules: Dict) -> tuple[float, Dict[str, Any]]:
+    def _score_seniority(
+        self,
+        lead: Lead,
+        compiled: CompiledICP,
+        explain: bool
+    ) -> tuple[float, Optional[Dict[str, Any]]]:
         """
         Score based on seniority level
         
@@ -364,31 +612,15 @@ class ICPScoringEngine:
             "job_title_keywords": ["VP Sales", "Director Marketing"]
         }
         """
-        job_title = (lead.job_title or "").lower()
-        
-        # Get target seniority from ICP
-        target_seniority = [s.lower() for s in scoring_rules.get('target_seniority_levels', [])]
-        target_keywords = [k.lower() for k in scoring_rules.get('job_title_keywords', [])]
-        
-        # Seniority mapping
-        seniority_map = {
-            "c-level": ["ceo", "cto", "cfo", "coo", "president", "founder", "chief"],
-            "vp": ["vp", "vice president"],
-            "director": ["director", "head of"],
-            "manager": ["manager", "lead"],
-            "senior": ["senior", "sr"],
-            "junior": ["junior", "jr", "associate"]
-        }
+        job_title = lead.job_title_lc
+        
+        target_seniority = compiled.target_seniority_lc
         
         # Determine lead's seniority
-        lead_seniority = None
-        for level, keywords in seniority_map.items():
-            if any(kw in job_title for kw in keywords):
-                lead_seniority = level
-                break
+        lead_seniority = _detect_seniority(job_title)
         
         # Check exact job title keywords
-        keyword_match = any(kw in job_title for kw in target_keywords)
+        keyword_match = compiled.job_title_keyword_match(job_title)
         
         # Score based on target seniority match
         if keyword_match:
@@ -410,15 +642,20 @@ class ICPScoringEngine:
             score = 20
             reason = "low_seniority"
         
-        return score, {
+        return score, ({
             "score": score,
             "job_title": lead.job_title,
             "detected_seniority": lead_seniority,
-            "target_seniority": target_seniority,
+            "target_seniority": list(target_seniority),
             "reason": reason
-        }
+        } if explain else None)
     
-    def _score_geography(self, lead: Lead, scoring_rules: Dict) -> tuple[float, Dict[str, Any]]:
+    def _score_geography(
+        self,
+        lead: Lead,
+        compiled: CompiledICP,
+        explain: bool
+    ) -> tuple[float, Optional[Dict[str, Any]]]:
         """
         Score based on geographic location
         
@@ -427,34 +664,38 @@ class ICPScoringEngine:
             "target_geographies": ["USA", "Canada", "UK"]
         }
         """
-        country = (lead.country or "").lower()
+        country = lead.country_lc
         
-        # Get target geographies from ICP
-        target_geos = [g.lower() for g in scoring_rules.get('target_geographies', [])]
+        target_geos = compiled.target_geos_lc
         
         if not target_geos:
-            return 50, {
+            return 50, ({
                 "score": 50,
                 "country": lead.country,
                 "note": "no_criteria_defined"
-            }
+            } if explain else None)
         
         # Check for match
-        if any(geo in country for geo in target_geos):
+        if compiled.geo_re.search(country):
             score = 100
             matched = True
         else:
             score = 30  # Partial credit for being somewhere
             matched = False
         
-        return score, {
+        return score, ({
             "score": score,
             "country": lead.country,
-            "target_geographies": scoring_rules.get('target_geographies', []),
+            "target_geographies": list(compiled.target_geographies),
             "matched": matched
-        }
+        } if explain else None)
     
-    def _score_company_type(self, lead: Lead, scoring_rules: Dict) -> tuple[float, Dict[str, Any]]:
+    def _score_company_type(
+        self,
+        lead: Lead,
+        compiled: CompiledICP,
+        explain: bool
+    ) -> tuple[float, Optional[Dict[str, Any]]]:
         """
         Score based on company type/description
         
@@ -464,24 +705,27 @@ class ICPScoringEngine:
             "excluded_keywords": ["B2C", "Consumer"]
         }
         """
-        description = (lead.company_description or "").lower()
+        description = lead.company_description_lc
         
-        # Get keywords from ICP
-        positive_keywords = [k.lower() for k in scoring_rules.get('company_type_keywords', [])]
-        negative_keywords = [k.lower() for k in scoring_rules.get('excluded_keywords', [])]
+        positive_keywords = compiled.positive_keywords_lc
+        negative_keywords = compiled.negative_keywords_lc
         
         if not positive_keywords and not negative_keywords:
-            return 50, {
+            return 50, ({
                 "score": 50,
                 "description_snippet": description[:100],
                 "note": "no_criteria_defined"
-            }
+            } if explain else None)
         
-        # Check for matches
+        # Check for matches. Positives are counted per keyword (they may
+        # overlap), so they stay a scan; excluded keywords only need a hit
         positive_matches = [kw for kw in positive_keywords if kw in description]
-        negative_matches = [kw for kw in negative_keywords if kw in description]
+        has_negative = (
+            compiled.negative_keywords_re is not None
+            and compiled.negative_keywords_re.search(description) is not None
+        )
         
-        if negative_matches:
+        if has_negative:
             score = 20  # Has excluded keywords
         elif positive_matches:
             # Score based on how many positive keywords match
@@ -490,6 +734,14 @@ class ICPScoringEngine:
         else:
             score = 40  # No matches either way
         
+        if not explain:
+            return score, None
+        
+        # Listing which excluded keywords hit is only needed for the
+        # breakdown, and only when the regex found one
+        negative_matches = (
+            [kw for kw in negative_keywords if kw in description] if has_negative else []
+        )
         return score, {
             "score": round(score, 2),
             "description_snippet": description[:100],
@@ -8,7 +8,7 @@ from datetime import datetime
 from app.models import Lead
 from app.services.normalization import normalization_service
 from app.services.deduplication import deduplication_service
-from app.services.enrichment import enrichment_service
+from app.services.enrichment_service import clearbit_client
 from app.services.verification import verification_service
 from app.services.scoring import scoring_service
 from typing import List, Optional, Dict, Any
@@ -69,7 +69,7 @@ class LeadPipeline:
             
             # Stage 2: Enrichment
             if not skip_enrichment:
-                enrichment_data = await enrichment_service.enrich_lead(
+                enrichment_data = await clearbit_client.enrich_lead(
                     email=lead.email,
                     domain=lead.company_domain
                 )
@@ -25,6 +25,7 @@ from app.models import (
     ICP,
     LeadRejectionTracking
 )
+from app.database import AsyncSessionLocal
 from app.services.icp_scoring_engine import ICPScoringEngine
 from app.services.activity_logger import ActivityLogger
 from app.services.enrichment_service import create_enrichment_service
@@ -260,7 +261,7 @@ class PipelineOrchestrator:
                 lead.enrichment_status = 'completed'
                 lead.enriched_at = datetime.utcnow()
                 lead.enrichment_source = raw_lead.source_name
-                lead.enrichment_providers = plan.providers_to_use
+                lead.enrichment_providers = list(plan.providers_to_use)  # plans hold tuples
                 lead.enrichment_cost = enrich_result.get('cost', 0.0)
                 lead.next_refresh_date = self.strategy_service.calculate_next_refresh(raw_lead.source_name)
                 
@@ -353,17 +354,20 @@ class PipelineOrchestrator:
         """
         start_time = datetime.utcnow()
         
-        # Create enrichment service
-        enrichment_service = create_enrichment_service(self.db)
-        
-        # Enrich with ICP-specific config
-        result = await enrichment_service.enrich_lead_with_icp_config(
-            email=lead.email,
-            company_domain=lead.company_domain,
-            company_name=lead.company_name,
-            tenant_id=str(lead.tenant_id),
-            icp_id=str(icp.id)
-        )
+        # Enrichment awaits the DB, so it gets its own async session
+        # rather than blocking the event loop on self.db
+        async with AsyncSessionLocal() as enrichment_db:
+            enrichment_service = create_enrichment_service(enrichment_db)
+            
+            # Enrich with ICP-specific config
+            result = await enrichment_service.enrich_lead_with_icp_config(
+                email=lead.email,
+                company_domain=lead.company_domain,
+                company_name=lead.company_name,
+                tenant_id=str(lead.tenant_id),
+                icp_id=str(icp.id),
+                missing_fields=set(plan.fields_to_enrich) or None
+            )
         
         processing_time = self._elapsed_ms(start_time)
         
@@ -444,7 +448,7 @@ class PipelineOrchestrator:
         start_time = datetime.utcnow()
         
         # Score using Lead (has enriched data)
-        score_result = await self.scoring_engine.score_lead(lead, icp)
+        score_result = self.scoring_engine.score_lead(lead, icp, explain=True)
         
         # Update assignment
         assignment.fit_score = score_result.score
@@ -0,0 +1,104 @@
+# backend/app/services/provider_rate_limiter.py
+"""
+Async Rate Limiter for Paid/External API Providers
+
+Keeps bulk enrichment under provider limits:
+- Token bucket caps the request rate (e.g. 10 req/s)
+- Semaphore caps in-flight requests
+- A slot is only freed once the wrapped call has returned
+"""
+
+import asyncio
+import time
+from typing import Dict
+
+
+class ProviderRateLimiter:
+    """
+    Token bucket + concurrency limiter, used as an async context manager
+
+    Usage:
+        limiter = ProviderRateLimiter("serpapi", max_rate=10, time_period=1.0)
+        async with limiter:
+            response = await fetch(...)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_rate: float = 10,
+        time_period: float = 1.0,
+        max_concurrency: int = 8
+    ):
+        """
+        Args:
+            name: Provider name (for stats)
+            max_rate: Requests allowed per `time_period`
+            time_period: Window length in seconds
+            max_concurrency: Maximum requests in flight at once
+        """
+        self.name = name
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self.max_concurrency = max_concurrency
+
+        self._tokens = float(max_rate)
+        self._last_refill = time.monotonic()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._lock = asyncio.Lock()
+
+        # Stats
+        self.total_requests = 0
+        self.total_wait_seconds = 0.0
+
+    async def acquire(self):
+        """Wait for a concurrency slot, then for a rate token"""
+        await self._semaphore.acquire()
+        try:
+            await self._take_token()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        self.total_requests += 1
+
+    def release(self):
+        """Free the concurrency slot once the request has completed"""
+        self._semaphore.release()
+
+    async def _take_token(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                elapsed = now - self._last_refill
+                self._last_refill = now
+                self._tokens = min(
+                    float(self.max_rate),
+                    self._tokens + elapsed * self.max_rate / self.time_period
+                )
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                delay = (1 - self._tokens) * self.time_period / self.max_rate
+                self.total_wait_seconds += delay
+                await asyncio.sleep(delay)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+    def get_stats(self) -> Dict:
+        """Get current limiter stats"""
+        return {
+            "provider": self.name,
+            "max_rate": self.max_rate,
+            "time_period": self.time_period,
+            "max_concurrency": self.max_concurrency,
+            "total_requests": self.total_requests,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+        }
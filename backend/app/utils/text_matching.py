@@ -0,0 +1,45 @@
+# backend/app/utils/text_matching.py
+"""
+Substring matching helpers shared by the ICP processor and scoring engine
+"""
+
+from typing import Callable, Iterable
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+# Title lists longer than this match with an Aho-Corasick automaton (when
+# pyahocorasick is installed) instead of one scan per title
+AHOCORASICK_MIN_TITLES = 8
+
+
+def title_matcher(titles: Iterable[str]) -> Callable[[str], bool]:
+    """
+    Build a job_title_lower -> bool check for "contains any of `titles`"
+    
+    Titles are lowercased once here. Long lists use a single-pass
+    Aho-Corasick automaton when pyahocorasick is available.
+    """
+    needles = tuple(jt.lower() for jt in titles)
+    
+    if AHOCORASICK_AVAILABLE and len(needles) > AHOCORASICK_MIN_TITLES and all(needles):
+        automaton = ahocorasick.Automaton()
+        for needle in needles:
+            automaton.add_word(needle, needle)
+        automaton.make_automaton()
+        
+        def matches(job_title_lower: str) -> bool:
+            for _ in automaton.iter(job_title_lower):
+                return True
+            return False
+        
+        return matches
+    
+    def matches(job_title_lower: str) -> bool:
+        return any(jt in job_title_lower for jt in needles)
+    
+    return matches
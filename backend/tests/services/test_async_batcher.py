@@ -0,0 +1,101 @@
+# tests/services/test_async_batcher.py
+"""
+Tests for AsyncBatcher and AsyncBulkWriter
+
+Run with: pytest tests/services/test_async_batcher.py -v
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.async_batcher import AsyncBatcher, AsyncBulkWriter
+
+
+class TestAsyncBatcher:
+    """Test request coalescing"""
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_keys_share_one_call(self):
+        """Identical keys in one window trigger a single call"""
+        calls = []
+        
+        async def fetch(key):
+            calls.append(key)
+            return f"result-{key}"
+        
+        batcher = AsyncBatcher(fetch, max_size=10, wait=0.01)
+        
+        results = await asyncio.gather(
+            batcher.add("acme.com"),
+            batcher.add("acme.com"),
+            batcher.add("globex.com")
+        )
+        
+        assert results == ["result-acme.com", "result-acme.com", "result-globex.com"]
+        assert sorted(calls) == ["acme.com", "globex.com"]
+        assert batcher.get_stats()["calls_made"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_flushes_when_batch_full(self):
+        """A full batch flushes without waiting for the timer"""
+        async def fetch(key):
+            return key * 2
+        
+        batcher = AsyncBatcher(fetch, max_size=2, wait=60)
+        
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.add(1), batcher.add(2)),
+            timeout=1
+        )
+        
+        assert results == [2, 4]
+    
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_waiters(self):
+        """Exceptions from the call reach every waiter for that key"""
+        async def fetch(key):
+            raise ValueError(key)
+        
+        batcher = AsyncBatcher(fetch, wait=0.01)
+        
+        with pytest.raises(ValueError):
+            await batcher.add("broken.com")
+
+
+class TestAsyncBulkWriter:
+    """Test write-behind buffering"""
+    
+    @pytest.mark.asyncio
+    async def test_buffers_until_flush(self):
+        """Items are written together, not one by one"""
+        batches = []
+        
+        async def write(items):
+            batches.append(items)
+        
+        writer = AsyncBulkWriter(write, max_size=50, wait=60)
+        for i in range(3):
+            writer.add(i)
+        
+        assert batches == []
+        
+        await writer.flush()
+        
+        assert batches == [[0, 1, 2]]
+        assert writer.get_stats()["items_written"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_flushes_when_buffer_full(self):
+        """A full buffer is written without waiting for the timer"""
+        batches = []
+        
+        async def write(items):
+            batches.append(items)
+        
+        writer = AsyncBulkWriter(write, max_size=2, wait=60)
+        writer.add("a")
+        writer.add("b")
+        await asyncio.sleep(0)
+        
+        assert batches == [["a", "b"]]
@@ -20,10 +20,11 @@ from datetime import datetime, timedelta
 from uuid import uuid4
 from decimal import Decimal
 from unittest.mock import Mock, patch, AsyncMock
+import asyncio
 import hashlib
 import json
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.enrichment_service import (
     EnrichmentService,
@@ -40,10 +41,13 @@ from app.models import EnrichmentCache, ICP
 @pytest.fixture
 def mock_db():
     """Mock database session"""
-    db = Mock(spec=Session)
-    db.query = Mock()
+    db = Mock(spec=AsyncSession)
+    db.execute = AsyncMock()
+    db.execute.return_value = Mock()
+    db.execute.return_value.first.return_value = None  # Cache miss by default
+    db.execute.return_value.scalar_one_or_none.return_value = None
     db.add = Mock()
-    db.commit = Mock()
+    db.commit = AsyncMock()
     return db
 
 
@@ -105,7 +109,7 @@ class TestCacheOperations:
             expires_at=datetime.utcnow() + timedelta(days=90)
         )
         
-        mock_db.query.return_value.filter.return_value.first.return_value = cached_entry
+        mock_db.execute.return_value.first.return_value = cached_entry
         
         # Mock Redis miss
         with patch('app.services.enrichment_service.redis_client') as mock_redis:
@@ -127,6 +131,71 @@ class TestCacheOperations:
         assert "company_description" in result.enriched_data
         assert result.providers_used == ["serpapi"]
     
+    @pytest.mark.asyncio
+    async def test_redis_hit_skips_database(self, mock_db):
+        """Test Redis hit is decoded without touching Postgres"""
+        service = EnrichmentService(mock_db)
+        
+        cached = b'{"enriched_data":{"company_cms":"WordPress"},"providers_used":["wappalyzer"]}'
+        
+        with patch('app.services.enrichment_service.redis_client') as mock_redis:
+            mock_redis.get = AsyncMock(return_value=cached)
+            
+            result = await service._get_from_cache("abc123", str(uuid4()))
+        
+        assert result["enriched_data"] == {"company_cms": "WordPress"}
+        assert result["providers_used"] == ["wappalyzer"]
+        mock_db.execute.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_cache_hit_counted_in_redis(self, mock_db):
+        """Test DB cache hits bump a Redis counter instead of writing hit_count"""
+        service = EnrichmentService(mock_db)
+        tenant_id = str(uuid4())
+        
+        mock_db.execute.return_value.first.return_value = Mock(
+            enrichment_data={"company_cms": "WordPress", "_providers": ["wappalyzer"]},
+            cache_key_hash="abc123"
+        )
+        
+        with patch('app.services.enrichment_service.redis_client') as mock_redis:
+            mock_redis.get = AsyncMock(return_value=None)
+            mock_redis.setex = AsyncMock()
+            mock_redis.hincrby = AsyncMock()
+            
+            result = await service._get_from_cache("abc123", tenant_id)
+        
+        assert result["providers_used"] == ["wappalyzer"]
+        mock_redis.hincrby.assert_awaited_once_with(
+            "enrich:hit_counts", f"{tenant_id}:abc123", 1
+        )
+        mock_db.commit.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_negative_cache_hit_skips_providers(self, mock_db):
+        """Test a cached "nothing found" answer returns empty without API calls"""
+        service = EnrichmentService(mock_db, serpapi_key="key")
+        
+        cached = b'{"enriched_data":{"_negative":true,"_providers":[]},"providers_used":[]}'
+        
+        with patch('app.services.enrichment_service.redis_client') as mock_redis:
+            mock_redis.get = AsyncMock(return_value=cached)
+            mock_redis.incr = AsyncMock()
+            
+            with patch.object(service, '_enrich_from_serpapi', new_callable=AsyncMock) as mock_serp:
+                result = await service.enrich_lead(
+                    email="test@unknown.io",
+                    company_domain="unknown.io",
+                    company_name="Unknown",
+                    tenant_id=str(uuid4())
+                )
+        
+        assert result.success is True
+        assert result.cache_hit is True
+        assert result.enriched_data == {}
+        mock_serp.assert_not_called()
+        mock_redis.incr.assert_awaited_once_with("enrich:negative_hits")
+    
     @pytest.mark.asyncio
     async def test_cache_miss_triggers_enrichment(self, mock_db):
         """Test cache miss triggers new enrichment"""
@@ -139,7 +208,7 @@ class TestCacheOperations:
         tenant_id = str(uuid4())
         
         # Mock cache miss
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        mock_db.execute.return_value.first.return_value = None
         
         # Mock Redis miss
         with patch('app.services.enrichment_service.redis_client') as mock_redis:
@@ -188,7 +257,7 @@ class TestCacheOperations:
         )
         
         # Mock returns None for expired entries (filtered by expires_at > now)
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        mock_db.execute.return_value.first.return_value = None
         
         with patch('app.services.enrichment_service.redis_client') as mock_redis:
             mock_redis.get = AsyncMock(return_value=None)
@@ -199,6 +268,41 @@ class TestCacheOperations:
         # Assert
         assert cached is None
 
+    @pytest.mark.asyncio
+    async def test_missing_upsert_constraint_remembered(self):
+        """Without the unique constraint, later flushes skip the upsert and warn once"""
+        from sqlalchemy.exc import ProgrammingError
+        from app.services import enrichment_service
+        
+        no_constraint = ProgrammingError(
+            "INSERT", {},
+            Exception("there is no unique or exclusion constraint matching the ON CONFLICT specification")
+        )
+        session = Mock()
+        session.execute = AsyncMock(side_effect=[no_constraint, None, None])
+        session.commit = AsyncMock()
+        session.rollback = AsyncMock()
+        session_factory = Mock()
+        session_factory.return_value.__aenter__ = AsyncMock(return_value=session)
+        session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        row = {
+            "tenant_id": uuid4(),
+            "cache_key_hash": "abc123",
+            "cache_type": "company_enrichment",
+            "enrichment_data": {},
+        }
+        
+        with patch('app.database.AsyncSessionLocal', session_factory), \
+             patch.object(enrichment_service, '_cache_upsert_supported', True), \
+             patch.object(enrichment_service.logger, 'warning') as mock_warning:
+            await enrichment_service._write_cache_rows([row])
+            await enrichment_service._write_cache_rows([row])
+        
+        # Failed upsert + fallback INSERT, then a single INSERT
+        assert session.execute.await_count == 3
+        assert session.commit.await_count == 2
+        mock_warning.assert_called_once()
+
 
 # ============================================================================
 # TEST: Wappalyzer Tech Detection
@@ -222,6 +326,7 @@ class TestWappalyzerTechDetection:
         <body>WordPress site</body>
         </html>
         """.lower()
+        mock_response.iter_content.return_value = [mock_response.text.encode()]
         mock_response.headers = {}
         
         with patch('requests.get', return_value=mock_response):
@@ -244,6 +349,7 @@ class TestWappalyzerTechDetection:
         <script>var __react_version = "18.0"</script>
         </html>
         """.lower()
+        mock_response.iter_content.return_value = [mock_response.text.encode()]
         mock_response.headers = {}
         
         with patch('requests.get', return_value=mock_response):
@@ -262,6 +368,7 @@ class TestWappalyzerTechDetection:
         <script src="https://www.google-analytics.com/analytics.js"></script>
         <script>gtag('config', 'GA-XXXXX');</script>
         """.lower()
+        mock_response.iter_content.return_value = [mock_response.text.encode()]
         mock_response.headers = {}
         
         with patch('requests.get', return_value=mock_response):
@@ -270,6 +377,54 @@ class TestWappalyzerTechDetection:
         assert "Google Analytics" in result["technologies"]
         assert "Google Analytics" in result["analytics"]
     
+    @pytest.mark.asyncio
+    async def test_detect_mixed_case_signatures(self, mock_db):
+        """Test fingerprints match regardless of case in raw HTML"""
+        service = EnrichmentService(mock_db, enable_wappalyzer=True)
+        
+        mock_response = Mock()
+        mock_response.text = """
+        <link href="/WP-Content/themes/x.css">
+        <script src="https://cdn.Shopify.com/s/app.js"></script>
+        """
+        mock_response.iter_content.return_value = [mock_response.text.encode()]
+        mock_response.headers = {}
+        
+        with patch('requests.get', return_value=mock_response):
+            result = await service._detect_tech_stack_direct("example.com")
+        
+        assert result["technologies"] == ["WordPress", "Shopify"]
+        assert result["cms"] == "Shopify"
+        assert result["categories"] == ["CMS", "E-commerce"]
+
+    @pytest.mark.asyncio
+    async def test_stream_scan_matches_across_chunks(self, mock_db):
+        """Test split fingerprints match and download stops once all are found"""
+        service = EnrichmentService(mock_db, enable_wappalyzer=True)
+
+        chunks = [
+            b'<script src="/wp-con', b'tent/x.js"></script><script src="cdn.shop',
+            b'ify.com"></script>gtag react',
+            b'never read',
+        ]
+        read = []
+
+        def iter_content(size):
+            for chunk in chunks:
+                read.append(chunk)
+                yield chunk
+
+        mock_response = Mock()
+        mock_response.iter_content.side_effect = iter_content
+        mock_response.headers = {}
+
+        with patch('requests.get', return_value=mock_response):
+            result = await service._detect_tech_stack_direct("example.com")
+
+        assert set(result["technologies"]) == {"WordPress", "Shopify", "Google Analytics", "React"}
+        assert b'never read' not in read
+        mock_response.close.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_detect_multiple_technologies(self, mock_db):
         """Test detecting multiple technologies"""
@@ -283,6 +438,7 @@ class TestWappalyzerTechDetection:
         <script src="google-analytics.com"></script>
         <script src="segment.com/analytics.js"></script>
         """.lower()
+        mock_response.iter_content.return_value = [mock_response.text.encode()]
         mock_response.headers = {"server": "cloudflare"}
         
         with patch('requests.get', return_value=mock_response):
@@ -350,6 +506,21 @@ class TestSerpApiEnrichment:
         assert result["company_revenue"] == "$31.35 billion"
         assert result["company_industry"] == "Software"
     
+    @pytest.mark.asyncio
+    async def test_serpapi_requests_only_knowledge_graph(self, mock_db):
+        """Test SerpApi payload is restricted to the knowledge graph"""
+        mock_response = Mock()
+        mock_response.content = b'{"knowledge_graph": {"type": "Software company", "founded": "2004"}}'
+        
+        with patch('requests.get', return_value=mock_response) as mock_get:
+            result = await EnrichmentService._search_serpapi("test_key", "Acme")
+        
+        assert result == {
+            "company_type": "Software company",
+            "company_founded": "2004"
+        }
+        assert mock_get.call_args.kwargs["params"]["json_restrictor"] == "knowledge_graph"
+    
     @pytest.mark.asyncio
     async def test_serpapi_organic_results_fallback(self, mock_db):
         """Test fallback to organic results when no knowledge graph"""
@@ -484,7 +655,7 @@ class TestMultiProviderOrchestration:
         tenant_id = str(uuid4())
         
         # Mock cache miss
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        mock_db.execute.return_value.first.return_value = None
         
         # Mock all provider responses
         with patch('app.services.enrichment_service.redis_client') as mock_redis:
@@ -545,7 +716,7 @@ class TestMultiProviderOrchestration:
         tenant_id = str(uuid4())
         
         # Mock cache miss
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        mock_db.execute.return_value.first.return_value = None
         
         with patch('app.services.enrichment_service.redis_client') as mock_redis:
             mock_redis.get = AsyncMock(return_value=None)
@@ -580,7 +751,7 @@ class TestMultiProviderOrchestration:
         )
         
         tenant_id = str(uuid4())
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        mock_db.execute.return_value.first.return_value = None
         
         with patch('app.services.enrichment_service.redis_client') as mock_redis:
             mock_redis.get = AsyncMock(return_value=None)
@@ -603,6 +774,142 @@ class TestMultiProviderOrchestration:
         assert result.cost == 0.003
 
 
+    @pytest.mark.asyncio
+    async def test_providers_merge_without_overwriting(self, mock_db):
+        """Test concurrent providers only fill fields that are still missing"""
+        service = EnrichmentService(
+            db=mock_db,
+            serpapi_key="key",
+            enable_wappalyzer=True,
+            enable_serpapi=True
+        )
+        
+        tenant_id = str(uuid4())
+        mock_db.execute.return_value.first.return_value = None
+        
+        with patch('app.services.enrichment_service.redis_client') as mock_redis:
+            mock_redis.get = AsyncMock(return_value=None)
+            mock_redis.setex = AsyncMock()
+            
+            with patch.object(service, '_enrich_from_wappalyzer', new_callable=AsyncMock) as mock_wapp, \
+                 patch.object(service, '_enrich_from_serpapi', new_callable=AsyncMock) as mock_serp, \
+                 patch.object(service, '_enrich_from_google_kg', new_callable=AsyncMock) as mock_kg:
+                mock_wapp.side_effect = Exception("Tech detection failed")
+                mock_serp.return_value = {"company_description": "From SerpApi"}
+                mock_kg.return_value = {
+                    "company_description": "From Google KG",
+                    "company_employee_count": 500
+                }
+                
+                result = await service.enrich_lead(
+                    email="test@test.com",
+                    company_domain="test.com",
+                    company_name="Test",
+                    tenant_id=tenant_id
+                )
+        
+        assert result.success is True
+        assert result.providers_used == ["serpapi", "google_kg"]
+        assert result.enriched_data["company_description"] == "From SerpApi"
+        assert result.enriched_data["company_employee_count"] == 500
+        assert result.cost == 0.002
+
+
+    @pytest.mark.asyncio
+    async def test_skips_providers_for_present_fields(self, mock_db):
+        """Test only providers that can fill missing fields are called"""
+        service = EnrichmentService(
+            db=mock_db,
+            serpapi_key="key",
+            enable_wappalyzer=True,
+            enable_serpapi=True
+        )
+
+        with patch('app.services.enrichment_service.redis_client') as mock_redis:
+            mock_redis.get = AsyncMock(return_value=None)
+            mock_redis.setex = AsyncMock()
+
+            with patch.object(service, '_enrich_from_wappalyzer', new_callable=AsyncMock) as mock_wapp, \
+                 patch.object(service, '_enrich_from_serpapi', new_callable=AsyncMock) as mock_serp, \
+                 patch.object(service, '_enrich_from_google_kg', new_callable=AsyncMock) as mock_kg, \
+                 patch.object(service, '_save_to_cache', new_callable=AsyncMock) as mock_save:
+                mock_wapp.return_value = {"company_tech_stack": ["React"]}
+
+                result = await service.enrich_lead(
+                    email="test@test.com",
+                    company_domain="test.com",
+                    company_name="Test",
+                    tenant_id=str(uuid4()),
+                    missing_fields={"company_tech_stack"}
+                )
+
+        assert result.success is True
+        assert result.providers_used == ["wappalyzer"]
+        mock_serp.assert_not_called()
+        mock_kg.assert_not_called()
+        # Partial results must not be cached for full lookups
+        mock_save.assert_not_called()
+
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_enrichment(self, mock_db):
+        """Test concurrent misses for the same key only run providers once"""
+        service = EnrichmentService(mock_db, enable_wappalyzer=True, enable_serpapi=False)
+        tenant_id = str(uuid4())
+        
+        async def slow_tech(domain):
+            await asyncio.sleep(0.01)
+            return {"company_cms": "WordPress"}
+        
+        with patch('app.services.enrichment_service.redis_client') as mock_redis:
+            mock_redis.get = AsyncMock(return_value=None)
+            mock_redis.setex = AsyncMock()
+            
+            with patch.object(service, '_enrich_from_wappalyzer', side_effect=slow_tech) as mock_wapp, \
+                 patch.object(service, '_enrich_from_google_kg', new_callable=AsyncMock) as mock_kg:
+                mock_kg.return_value = {}
+                
+                first, second = await asyncio.gather(*(
+                    service.enrich_lead(
+                        email="a@acme.com",
+                        company_domain="acme.com",
+                        company_name="Acme",
+                        tenant_id=tenant_id
+                    )
+                    for _ in range(2)
+                ))
+        
+        assert mock_wapp.call_count == 1
+        assert first.enriched_data == second.enriched_data
+        assert [first.cache_hit, second.cache_hit] == [False, True]
+        assert second.cost == 0.0
+    
+    @pytest.mark.asyncio
+    async def test_clearbit_company_mapped_to_flat_fields(self, mock_db):
+        """Test Clearbit company data joins the waterfall as flat fields"""
+        service = EnrichmentService(mock_db)
+        
+        clearbit_company = {
+            "company": {
+                "description": "Payments infrastructure",
+                "industry": "Internet Software & Services",
+                "employee_count": 4000,
+                "founded_year": None
+            }
+        }
+        
+        with patch('app.services.enrichment_service.clearbit_client') as mock_clearbit:
+            mock_clearbit.enrich_company = AsyncMock(return_value=clearbit_company)
+            
+            result = await service._enrich_from_clearbit("stripe.com")
+        
+        assert result == {
+            "company_description": "Payments infrastructure",
+            "company_industry": "Internet Software & Services",
+            "company_employee_count": 4000
+        }
+
+
 # ============================================================================
 # TEST: ICP-Specific Configuration
 # ============================================================================
@@ -631,8 +938,8 @@ class TestICPSpecificConfiguration:
             }
         )
         
-        mock_db.query.return_value.filter.return_value.first.return_value = icp
-        mock_db.query.return_value.filter.return_value.first.return_value = None  # Cache miss
+        mock_db.execute.return_value.scalar_one_or_none.return_value = icp
+        mock_db.execute.return_value.first.return_value = None  # Cache miss
         
         with patch('app.services.enrichment_service.redis_client') as mock_redis:
             mock_redis.get = AsyncMock(return_value=None)
@@ -667,7 +974,7 @@ class TestErrorHandling:
         )
         
         tenant_id = str(uuid4())
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        mock_db.execute.return_value.first.return_value = None
         
         with patch('app.services.enrichment_service.redis_client') as mock_redis:
             mock_redis.get = AsyncMock(return_value=None)
@@ -702,7 +1009,7 @@ class TestErrorHandling:
         )
         
         tenant_id = str(uuid4())
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        mock_db.execute.return_value.first.return_value = None
         
         with patch('app.services.enrichment_service.redis_client') as mock_redis:
             mock_redis.get = AsyncMock(return_value=None)
@@ -721,6 +1028,68 @@ class TestErrorHandling:
         assert result.success is False
         assert result.error is not None
 
+    @pytest.mark.asyncio
+    async def test_provider_timeout_not_negative_cached(self, mock_db):
+        """Test a timed-out provider doesn't get cached as "nothing found" """
+        service = EnrichmentService(
+            db=mock_db,
+            serpapi_key="key",
+            enable_wappalyzer=True,
+            enable_serpapi=True
+        )
+
+        with patch('app.services.enrichment_service.redis_client') as mock_redis:
+            mock_redis.get = AsyncMock(return_value=None)
+
+            with patch.object(service, '_enrich_from_wappalyzer', new_callable=AsyncMock) as mock_tech, \
+                 patch.object(service, '_enrich_from_serpapi', new_callable=AsyncMock) as mock_serp, \
+                 patch.object(service, '_enrich_from_google_kg', new_callable=AsyncMock) as mock_kg, \
+                 patch.object(service, '_save_to_cache', new_callable=AsyncMock) as mock_save:
+                mock_tech.side_effect = asyncio.TimeoutError()
+                mock_serp.return_value = {}
+                mock_kg.return_value = {}
+
+                result = await service.enrich_lead(
+                    email="test@slow.io",
+                    company_domain="slow.io",
+                    company_name="Slow",
+                    tenant_id=str(uuid4())
+                )
+
+        assert result.success is False
+        mock_save.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_clean_empty_answers_negative_cached(self, mock_db):
+        """Test providers that all answer "nothing found" are negative-cached"""
+        service = EnrichmentService(
+            db=mock_db,
+            serpapi_key="key",
+            enable_wappalyzer=True,
+            enable_serpapi=True
+        )
+
+        with patch('app.services.enrichment_service.redis_client') as mock_redis:
+            mock_redis.get = AsyncMock(return_value=None)
+
+            with patch.object(service, '_enrich_from_wappalyzer', new_callable=AsyncMock) as mock_tech, \
+                 patch.object(service, '_enrich_from_serpapi', new_callable=AsyncMock) as mock_serp, \
+                 patch.object(service, '_enrich_from_google_kg', new_callable=AsyncMock) as mock_kg, \
+                 patch.object(service, '_save_to_cache', new_callable=AsyncMock) as mock_save:
+                mock_tech.return_value = {}
+                mock_serp.return_value = {}
+                mock_kg.return_value = {}
+
+                await service.enrich_lead(
+                    email="test@empty.io",
+                    company_domain="empty.io",
+                    company_name="Empty",
+                    tenant_id=str(uuid4())
+                )
+
+        mock_save.assert_awaited_once()
+        assert mock_save.call_args.kwargs["enriched_data"] == {"_negative": True}
+
 
 # ============================================================================
 # TEST: Factory Function
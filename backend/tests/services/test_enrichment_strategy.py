@@ -0,0 +1,217 @@
+# tests/services/test_enrichment_strategy.py
+"""
+Tests for EnrichmentStrategyService plan decisions
+
+Coverage:
+- Plans agree with the original list-based decision rules
+- ICP field masking
+- Provider order and cost
+- Plan caching and create_plans_bulk
+
+Run with: pytest tests/services/test_enrichment_strategy.py -v
+"""
+
+from datetime import datetime, timedelta
+from itertools import product
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.enrichment_strategy import (
+    EnrichmentPlan,
+    EnrichmentStrategyService,
+    MissingField,
+)
+
+
+NOW = datetime(2024, 6, 1)
+
+SOURCES = ["apollo", "linkedin_scraper", "website_scraper", "csv_upload", "mystery_source"]
+AGES = [None, 5, 45, 75, 120]
+ICPS = [
+    None,
+    {"scoring_rules": {}},
+    {"scoring_rules": {"target_industries": ["SaaS"]}},
+    {"scoring_rules": {"required_technologies": ["react"], "ideal_company_size_min": 50}},
+    SimpleNamespace(scoring_rules={"preferred_technologies": ["hubspot"]}),
+]
+
+
+def make_pair(source_name, age_days, present):
+    """(raw_lead, lead) with the fields in `present` filled in"""
+    raw_lead = SimpleNamespace(source_name=source_name)
+    lead = SimpleNamespace(
+        email="lead@acme.com",
+        enriched_at=NOW - timedelta(days=age_days) if age_days is not None else None,
+        company_employee_count=250 if "company_employee_count" in present else None,
+        company_industry="SaaS" if "company_industry" in present else None,
+        company_description="B2B software" if "company_description" in present else None,
+        country="US" if "country" in present else None,
+        enrichment_data={"tech_stack": ["react"]} if "company_tech_stack" in present else {},
+    )
+    return raw_lead, lead
+
+
+def reference_plan(source_name, age_days, present, icp):
+    """The original per-lead decision rules, with missing fields kept as a list"""
+    quality = EnrichmentStrategyService.SOURCE_QUALITY.get(source_name, "unknown")
+    skip = ("skip", (), 0.0)
+
+    if quality == "high" and (age_days is None or age_days < 90):
+        return (False,) + skip + ((),)
+
+    is_stale = age_days is not None and age_days >= EnrichmentStrategyService.REFRESH_INTERVALS[quality]
+
+    missing = [
+        field for field in (
+            "company_employee_count", "company_industry", "company_description",
+            "country", "company_tech_stack"
+        )
+        if field not in present
+    ]
+    rules = (icp.get("scoring_rules") if isinstance(icp, dict) else getattr(icp, "scoring_rules", None)) or {}
+    if rules:
+        if not rules.get("required_technologies") and not rules.get("preferred_technologies"):
+            missing = [f for f in missing if f != "company_tech_stack"]
+        if not rules.get("ideal_company_size_min"):
+            missing = [f for f in missing if f != "company_employee_count"]
+
+    if not missing and not is_stale:
+        return (False,) + skip + ((),)
+
+    providers = []
+    if quality != "high":
+        if "company_tech_stack" in missing:
+            providers.append("wappalyzer")
+        if any(f in missing for f in ("company_description", "company_industry", "country")):
+            providers.append("serpapi")
+        if "company_employee_count" in missing:
+            providers.append("google_kg")
+
+    if not providers:
+        return (False,) + skip + (tuple(missing),)
+
+    if age_days is None and len(missing) >= 3:
+        priority = "high"
+    elif quality in ("low", "unknown") or is_stale:
+        priority = "high"
+    elif len(missing) >= 2:
+        priority = "medium"
+    else:
+        priority = "low"
+
+    cost = sum(EnrichmentStrategyService.PROVIDER_COSTS.get(p, 0) for p in providers)
+    return True, priority, tuple(providers), cost, tuple(missing)
+
+
+FIELDS = ["company_employee_count", "company_industry", "company_description", "country", "company_tech_stack"]
+PRESENT_SETS = [
+    frozenset(field for field, keep in zip(FIELDS, bits) if keep)
+    for bits in product([False, True], repeat=len(FIELDS))
+]
+
+
+@pytest.fixture
+def service():
+    """Strategy service"""
+    return EnrichmentStrategyService()
+
+
+class TestPlanDecisions:
+    """Test plans agree with the original decision rules"""
+
+    @pytest.mark.parametrize("source_name", SOURCES)
+    def test_matches_reference_rules(self, service, source_name):
+        """Every age/field/ICP combination gets the original decision"""
+        for age_days, present, icp in product(AGES, PRESENT_SETS, ICPS):
+            raw_lead, lead = make_pair(source_name, age_days, present)
+
+            plan = service.create_enrichment_plan(raw_lead, lead, icp, now=NOW)
+            should_enrich, priority, providers, cost, fields = reference_plan(
+                source_name, age_days, present, icp
+            )
+
+            context = (source_name, age_days, sorted(present), icp)
+            assert plan.should_enrich == should_enrich, context
+            assert plan.priority == priority, context
+            assert plan.providers_to_use == providers, context
+            assert plan.fields_to_enrich == fields, context
+            assert plan.estimated_cost == pytest.approx(cost), context
+
+    def test_plan_fields_are_tuples(self, service):
+        """Shared plans can't be mutated through their lists"""
+        plan = service.create_enrichment_plan(*make_pair("csv_upload", None, frozenset()), now=NOW)
+
+        assert isinstance(plan.providers_to_use, tuple)
+        assert isinstance(plan.fields_to_enrich, tuple)
+        with pytest.raises(AttributeError):
+            plan.priority = "low"
+
+
+class TestMissingFields:
+    """Test the MissingField flags and ICP masking"""
+
+    def test_to_tuple_in_definition_order(self):
+        """Field names come out in declaration order, not bit-set order"""
+        fields = MissingField.COUNTRY | MissingField.COMPANY_EMPLOYEE_COUNT
+
+        assert fields.to_tuple() == ("company_employee_count", "country")
+        assert MissingField(0).to_tuple() == ()
+
+    def test_icp_without_tech_or_size_rules_masks_them(self, service):
+        """An ICP that ignores tech and size doesn't ask for them"""
+        _, lead = make_pair("csv_upload", None, frozenset())
+
+        missing = service._get_missing_fields(lead, {"scoring_rules": {"target_industries": ["SaaS"]}})
+
+        assert not missing & MissingField.COMPANY_TECH_STACK
+        assert not missing & MissingField.COMPANY_EMPLOYEE_COUNT
+        assert missing & MissingField.COMPANY_INDUSTRY
+
+    def test_no_icp_keeps_every_field(self, service):
+        """Without an ICP every empty field counts as missing"""
+        _, lead = make_pair("csv_upload", None, frozenset())
+
+        assert service._get_missing_fields(lead, None) == ~MissingField(0)
+
+
+class TestProviderSelection:
+    """Test provider order and cost"""
+
+    def test_provider_order_is_fixed(self, service):
+        """Providers come cheapest/most specific first, without duplicates"""
+        plan = service.create_enrichment_plan(*make_pair("csv_upload", None, frozenset()), now=NOW)
+
+        assert plan.providers_to_use == ("wappalyzer", "serpapi", "google_kg")
+        assert plan.estimated_cost == pytest.approx(0.002)
+
+    def test_high_quality_source_uses_no_providers(self, service):
+        """Stale data from a high-quality source still picks no providers"""
+        plan = service.create_enrichment_plan(*make_pair("apollo", 120, frozenset()), now=NOW)
+
+        assert plan.should_enrich is False
+        assert plan.reason == "No providers available"
+
+
+class TestPlanCaching:
+    """Test plan caching and the bulk path"""
+
+    def test_same_key_shares_plan(self, service):
+        """Leads with the same source, age and missing fields share one plan"""
+        first = service.create_enrichment_plan(*make_pair("csv_upload", 10, frozenset({"country"})), now=NOW)
+        second = service.create_enrichment_plan(*make_pair("csv_upload", 10, frozenset({"country"})), now=NOW)
+
+        assert first is second
+
+    def test_bulk_matches_single(self, service):
+        """create_plans_bulk returns the same plans as one call per lead"""
+        icp = {"scoring_rules": {"required_technologies": ["react"]}}
+        pairs = [
+            make_pair(source_name, None, present)
+            for source_name, present in product(SOURCES, PRESENT_SETS[::5])
+        ]
+
+        plans = service.create_plans_bulk(pairs, icp)
+
+        assert all(isinstance(plan, EnrichmentPlan) for plan in plans)
+        assert plans == [service.create_enrichment_plan(raw_lead, lead, icp) for raw_lead, lead in pairs]
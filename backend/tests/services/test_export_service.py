@@ -0,0 +1,191 @@
+# tests/services/test_export_service.py
+"""
+Tests for the campaign platform exporters and CSV streaming
+
+Coverage:
+- Email deduplication before API export
+- Retry/backoff on rate limiting
+- Byte-chunked CSV streaming
+
+Run with: pytest tests/services/test_export_service.py -v
+"""
+
+import csv
+import io
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import orjson
+import pytest
+
+from app.services.export_service import (
+    ExportService,
+    GenericCSVExporter,
+    InstantlyExporter,
+    SmartleadExporter,
+    _dedupe_by_email,
+)
+
+
+def make_leads(count, start=0):
+    """Leads with distinct emails"""
+    return [
+        {
+            "email": f"lead{i}@acme.com",
+            "first_name": f"Lead{i}",
+            "company": {"name": "Acme", "website": "acme.com"},
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def mock_client(statuses, requests):
+    """HTTP client answering each request with the next status in `statuses`"""
+    responses = iter(statuses)
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(next(responses), json={}, headers={"Retry-After": "0"})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestDedupe:
+    """Test leads are deduplicated by email before export"""
+
+    def test_drops_repeats_and_missing_emails(self):
+        """The first lead per email is kept; blank and missing emails are dropped"""
+        leads = make_leads(3) + [
+            {"email": " LEAD0@acme.com "},
+            {"email": ""},
+            {"first_name": "No email"},
+        ]
+
+        unique, skipped = _dedupe_by_email(leads)
+
+        assert [lead["email"] for lead in unique] == [
+            "lead0@acme.com", "lead1@acme.com", "lead2@acme.com"
+        ]
+        assert skipped == 3
+
+    @pytest.mark.asyncio
+    async def test_export_reports_skipped(self):
+        """Skipped leads are counted in the export result, not posted"""
+        requests = []
+        exporter = InstantlyExporter("key")
+        exporter._client = mock_client([200], requests)
+
+        result = await exporter.export_leads(make_leads(2) + make_leads(1))
+
+        assert result == {"success": 2, "failed": 0, "skipped": 1, "errors": []}
+        assert len(orjson.loads(requests[0].content)["leads"]) == 2
+
+
+class TestRetry:
+    """Test batch retry on retryable statuses"""
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_batch_retried(self):
+        """A 429 is retried after the Retry-After delay and then succeeds"""
+        requests = []
+        exporter = InstantlyExporter("key")
+        exporter._client = mock_client([429, 200], requests)
+
+        with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            result = await exporter.export_leads(make_leads(3), campaign_id="c1")
+
+        assert result["success"] == 3
+        assert result["failed"] == 0
+        assert len(requests) == 2
+        mock_sleep.assert_awaited_once_with(0.0)
+        assert str(requests[0].url) == "https://api.instantly.ai/api/v1/lead/add"
+        assert orjson.loads(requests[1].content)["campaign_id"] == "c1"
+
+    @pytest.mark.asyncio
+    async def test_server_error_not_retried(self):
+        """A 500 fails the batch without a retry (the endpoint isn't idempotent)"""
+        requests = []
+        exporter = SmartleadExporter("key")
+        exporter._client = mock_client([500], requests)
+
+        with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            result = await exporter.export_leads(make_leads(3))
+
+        assert result["success"] == 0
+        assert result["failed"] == 3
+        assert result["errors"][0]["batch"] == 0
+        assert len(requests) == 1
+        mock_sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self):
+        """A batch that keeps getting 503 fails after MAX_ATTEMPTS posts"""
+        requests = []
+        exporter = SmartleadExporter("key")
+        exporter._client = mock_client([503] * SmartleadExporter.MAX_ATTEMPTS, requests)
+
+        with patch("asyncio.sleep", new_callable=AsyncMock):
+            result = await exporter.export_leads(make_leads(1))
+
+        assert result["failed"] == 1
+        assert len(requests) == SmartleadExporter.MAX_ATTEMPTS
+
+    @pytest.mark.asyncio
+    async def test_batches_split_by_platform_limit(self):
+        """Smartlead posts at most BATCH_SIZE leads per request"""
+        requests = []
+        exporter = SmartleadExporter("key")
+        exporter._client = mock_client([201, 201, 201], requests)
+
+        result = await exporter.export_leads(make_leads(120))
+
+        assert result["success"] == 120
+        assert sorted(len(orjson.loads(r.content)["lead_list"]) for r in requests) == [20, 50, 50]
+
+
+class TestCSVStreaming:
+    """Test byte-chunked CSV output"""
+
+    def test_chunk_boundaries(self):
+        """The header rides with the first chunk, then every chunk_rows rows"""
+        chunks = list(InstantlyExporter("").iter_csv_chunks(make_leads(5), chunk_rows=2))
+
+        assert len(chunks) == 3
+        assert [chunk.count(b"\r\n") for chunk in chunks] == [3, 2, 1]
+
+    def test_exact_multiple_has_no_empty_chunk(self):
+        """A row count divisible by chunk_rows doesn't yield a trailing empty chunk"""
+        chunks = list(InstantlyExporter("").iter_csv_chunks(make_leads(4), chunk_rows=2))
+
+        assert len(chunks) == 2
+        assert all(chunks)
+
+    def test_no_leads_yields_header_only(self):
+        """An empty export is just the header row"""
+        chunks = list(SmartleadExporter("").iter_csv_chunks([]))
+
+        assert chunks == [b'"Email","First Name","Last Name","Company","Title","Phone","Website","LinkedIn"\r\n']
+
+    def test_utf8_matches_generate_csv(self):
+        """Streamed bytes are the UTF-8 encoding of the one-shot CSV"""
+        leads = make_leads(3) + [{"email": "zoë@acme.com", "first_name": "Zoë", "company": {"name": "Café ☕"}}]
+        exporter = InstantlyExporter("")
+
+        streamed = b"".join(exporter.iter_csv_chunks(leads, chunk_rows=1))
+
+        assert streamed == exporter.generate_csv(leads).encode("utf-8")
+        rows = list(csv.reader(io.StringIO(streamed.decode("utf-8"))))
+        assert rows[-1][:4] == ["zoë@acme.com", "Zoë", "", "Café ☕"]
+
+    def test_generic_columns(self):
+        """The generic exporter streams the requested columns"""
+        leads = [{"email": "a@acme.com", "company": {"name": "Acme"}}]
+
+        streamed = b"".join(GenericCSVExporter().iter_csv_chunks(leads, ["email", "company_name"]))
+
+        assert streamed == b'"email","company_name"\r\n"a@acme.com","Acme"\r\n'
+
+    def test_unknown_destination(self):
+        """ExportService.iter_csv rejects unknown destinations"""
+        with pytest.raises(ValueError):
+            ExportService().iter_csv([], "mailchimp")
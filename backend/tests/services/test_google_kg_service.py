@@ -0,0 +1,179 @@
+# tests/services/test_google_kg_service.py
+"""
+Tests for GoogleKnowledgeGraphService result and Wikipedia caching
+
+Run with: pytest tests/services/test_google_kg_service.py -v
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import orjson
+import pytest
+
+from app.services import google_kg_service
+from app.services.google_kg_service import GoogleKnowledgeGraphService
+
+
+@pytest.fixture
+def kg_service():
+    """Service with an API key and a stubbed fetch"""
+    with patch.dict("os.environ", {"GOOGLE_KG_API_KEY": "test-key"}):
+        service = GoogleKnowledgeGraphService()
+    service._fetch_company = AsyncMock(return_value={"company_employee_count": 8100})
+    return service
+
+
+class TestEnrichCompanyCache:
+    """Test per-company result caching"""
+    
+    @pytest.mark.asyncio
+    async def test_repeat_lookup_served_from_cache(self, kg_service):
+        """Same company (any case/whitespace) is fetched once"""
+        first = await kg_service.enrich_company("Shopify", "shopify.com")
+        second = await kg_service.enrich_company(" shopify ", "Shopify.com")
+        
+        assert first == second == {"company_employee_count": 8100}
+        assert kg_service._fetch_company.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_cached_result_is_a_copy(self, kg_service):
+        """Callers can't modify the cached entry"""
+        result = await kg_service.enrich_company("Shopify")
+        result["company_employee_count"] = 1
+        
+        assert await kg_service.enrich_company("Shopify") == {"company_employee_count": 8100}
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_fetch(self, kg_service):
+        """Concurrent lookups of one company share a single fetch"""
+        async def slow_fetch(company_name, domain=None):
+            await asyncio.sleep(0.01)
+            return {"company_industry": "E-commerce"}
+        
+        kg_service._fetch_company = AsyncMock(side_effect=slow_fetch)
+        
+        results = await asyncio.gather(*(kg_service.enrich_company("Shopify") for _ in range(5)))
+        
+        assert all(r == {"company_industry": "E-commerce"} for r in results)
+        assert kg_service._fetch_company.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_empty_result_not_cached(self, kg_service):
+        """Failed/empty lookups are retried next time"""
+        kg_service._fetch_company = AsyncMock(return_value={})
+        
+        await kg_service.enrich_company("Unknown Co")
+        await kg_service.enrich_company("Unknown Co")
+        
+        assert kg_service._fetch_company.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_expired_entry_refetched(self, kg_service):
+        """Entries past the TTL are fetched again"""
+        kg_service.CACHE_TTL_SECONDS = -1
+        
+        await kg_service.enrich_company("Shopify")
+        await kg_service.enrich_company("Shopify")
+        
+        assert kg_service._fetch_company.await_count == 2
+
+    
+    @pytest.mark.asyncio
+    async def test_batch_bounded_and_ordered(self, kg_service):
+        """Batch lookups respect the concurrency cap and keep input order"""
+        running = 0
+        peak = 0
+        
+        async def fetch(company_name, domain=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {"company_name": company_name}
+        
+        kg_service._fetch_company = AsyncMock(side_effect=fetch)
+        companies = [(f"Company {i}", f"company{i}.com") for i in range(10)]
+        
+        results = await kg_service.enrich_companies_batch(companies, concurrency=3)
+        
+        assert [r["company_name"] for r in results] == [name for name, _ in companies]
+        assert peak == 3
+
+
+class TestWikipediaCache:
+    """Test the on-disk Wikipedia lookup cache"""
+    
+    URL = "https://en.wikipedia.org/wiki/Shopify"
+    HTML = (
+        '<table class="infobox"><tr><th>Number of employees</th>'
+        '<td>8,100 (2024)</td></tr></table>'
+    )
+    
+    @pytest.fixture(autouse=True)
+    def cache_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(google_kg_service, "WIKI_CACHE_DIR", str(tmp_path))
+        return tmp_path
+    
+    @pytest.mark.asyncio
+    async def test_second_lookup_skips_fetch(self):
+        """A parsed page is reused instead of fetched again"""
+        service = GoogleKnowledgeGraphService()
+        response = Mock(raise_for_status=Mock(), content=orjson.dumps({"parse": {"text": self.HTML}}))
+        client = Mock(get=AsyncMock(return_value=response))
+        service._get_client = Mock(return_value=client)
+        
+        assert await service._extract_from_wikipedia(self.URL) == 8100
+        assert await service._extract_from_wikipedia(self.URL) == 8100
+        
+        assert client.get.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_fetches_lead_section_via_api(self):
+        """Article URLs go through the parse API for section 0 only"""
+        service = GoogleKnowledgeGraphService()
+        response = Mock(raise_for_status=Mock(), content=orjson.dumps({"parse": {"text": self.HTML}}))
+        client = Mock(get=AsyncMock(return_value=response))
+        service._get_client = Mock(return_value=client)
+        
+        await service._extract_from_wikipedia("https://en.wikipedia.org/wiki/L%27Or%C3%A9al")
+        
+        args, kwargs = client.get.call_args
+        assert args == ("https://en.wikipedia.org/w/api.php",)
+        assert kwargs["params"]["page"] == "L'Oréal"
+        assert kwargs["params"]["section"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_non_article_url_fetches_page(self):
+        """URLs without a /wiki/<title> path fall back to the page HTML"""
+        service = GoogleKnowledgeGraphService()
+        url = "https://en.wikipedia.org/w/index.php?curid=123"
+        client = Mock(get=AsyncMock(return_value=Mock(text=self.HTML, raise_for_status=Mock())))
+        service._get_client = Mock(return_value=client)
+        
+        assert await service._extract_from_wikipedia(url) == 8100
+        assert client.get.call_args.args == (url,)
+    
+    @pytest.mark.asyncio
+    async def test_fetch_error_not_cached(self, cache_dir):
+        """Failed fetches leave no cache entry"""
+        service = GoogleKnowledgeGraphService()
+        client = Mock(get=AsyncMock(side_effect=httpx.ReadTimeout("timeout")))
+        service._get_client = Mock(return_value=client)
+        
+        assert await service._extract_from_wikipedia(self.URL) is None
+        
+        assert list(cache_dir.iterdir()) == []
+    
+    def test_paragraph_fallback_with_filtered_parse(self):
+        """Paragraphs outside the infobox are still read"""
+        service = GoogleKnowledgeGraphService()
+        html = (
+            '<div id="nav"><ul><li><a href="/x">Home</a></li></ul></div>'
+            '<table class="infobox"><tr><th>Founded</th><td>2006</td></tr></table>'
+            '<div><p>The company employs over 12,000 people.</p></div>'
+        )
+        
+        assert service._employee_count_from_wikipedia_html(html) == 12000
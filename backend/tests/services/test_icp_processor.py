@@ -0,0 +1,228 @@
+# tests/services/test_icp_processor.py
+"""
+Tests for ICPProcessor: compiled rules, chunked processing and batched deletes
+
+Run with: pytest tests/services/test_icp_processor.py -v
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.models import ICP
+from app.services.icp_processor import ICPProcessor, compile_icp_rules
+from app.utils import text_matching
+from app.utils.text_matching import AHOCORASICK_MIN_TITLES, title_matcher
+
+
+RULES = {
+    "filters": {
+        "required": {
+            "job_titles": ["CTO", "VP"],
+            "industries": ["SaaS"],
+            "countries": ["US"],
+            "company_size_min": 10,
+            "company_size_max": 1000
+        },
+        "excluded": {
+            "job_titles": ["Intern"],
+            "domains": ["gmail.com"]
+        }
+    }
+}
+
+
+def make_lead(**overrides):
+    """Lead-like object with the fields the ICP rules read"""
+    fields = {
+        "id": uuid4(),
+        "tenant_id": uuid4(),
+        "job_title": "CTO",
+        "company_industry": "SaaS",
+        "company_size": 100,
+        "country": "US",
+        "email": "cto@acme.com"
+    }
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+@pytest.fixture
+def icp():
+    """ICP whose rules require a SaaS CTO/VP in the US"""
+    return ICP(id=uuid4(), name="US SaaS leaders", scoring_rules=RULES)
+
+
+@pytest.fixture
+def processor(mock_db):
+    """Processor on the shared mock session"""
+    return ICPProcessor(mock_db)
+
+
+class TestCompileICPRules:
+    """Test compile_icp_rules against ICP.matches_filters/calculate_fit_score"""
+
+    @pytest.mark.parametrize("overrides", [
+        {},
+        {"job_title": "VP Engineering", "country": "UK"},
+        {"job_title": "Intern VP"},
+        {"job_title": None},
+        {"company_industry": "Retail"},
+        {"company_size": 5000},
+        {"company_size": None},
+        {"email": "cto@gmail.com"},
+        {"email": None},
+    ])
+    def test_matches_model_methods(self, icp, overrides):
+        """evaluate() agrees with the uncompiled model methods"""
+        rules = icp.get_scoring_rules()
+        compiled = compile_icp_rules(rules)
+        lead = make_lead(**overrides)
+
+        job_title_lower = lead.job_title.lower() if lead.job_title else None
+        matches, score = compiled.evaluate(lead, job_title_lower)
+
+        assert matches == icp.matches_filters(lead, rules)
+        if matches:
+            assert score == pytest.approx(icp.calculate_fit_score(lead, rules))
+        else:
+            assert score == 0.0
+
+    def test_breakdown_built_once(self, icp):
+        """Per-ICP scoring details are computed at compile time"""
+        compiled = compile_icp_rules(icp.get_scoring_rules())
+
+        assert compiled.score_breakdown["job_title_match"] == 40
+        assert compiled.rules_used["company_size_range"] == [10, 1000]
+        assert compiled.required_title_match("senior vp sales")
+        assert not compiled.required_title_match("engineer")
+
+
+# More titles than AHOCORASICK_MIN_TITLES, so the automaton path is taken
+MANY_TITLES = ["CTO", "VP", "Head of Sales", "Founder", "Director", "Owner", "CEO", "COO", "CFO", "Partner"]
+JOB_TITLES = ["chief technology officer", "svp engineering", "cto", "head of sales emea",
+              "software engineer", "", "co-founder & ceo", "account executive"]
+
+
+class TestTitleMatcher:
+    """Test title_matcher gives the same answers on both of its paths"""
+
+    def test_scan_path(self):
+        """Without pyahocorasick, each title is checked by substring"""
+        with patch.object(text_matching, 'AHOCORASICK_AVAILABLE', False):
+            matches = title_matcher(MANY_TITLES)
+
+        assert [matches(t) for t in JOB_TITLES] == [
+            any(needle.lower() in t for needle in MANY_TITLES) for t in JOB_TITLES
+        ]
+
+    def test_automaton_path(self):
+        """Long title lists use the Aho-Corasick automaton with the same results"""
+        pytest.importorskip("ahocorasick")
+        assert len(MANY_TITLES) > AHOCORASICK_MIN_TITLES
+
+        with patch.object(text_matching, 'AHOCORASICK_AVAILABLE', False):
+            scan = title_matcher(MANY_TITLES)
+        with patch.object(text_matching, 'AHOCORASICK_AVAILABLE', True):
+            automaton = title_matcher(MANY_TITLES)
+
+        assert automaton.__code__ is not scan.__code__
+        assert [automaton(t) for t in JOB_TITLES] == [scan(t) for t in JOB_TITLES]
+
+
+class TestProcessChunk:
+    """Test one chunk is scored and written in a single transaction"""
+
+    @pytest.mark.asyncio
+    async def test_writes_assignments_and_lead_updates(self, processor, mock_db, icp):
+        """Assignments are bulk-inserted and every lead is marked processed"""
+        leads = [make_lead(), make_lead()]
+        mock_db.query.return_value.all.return_value = leads
+        mock_db.execute = Mock()
+        stats = {"leads_processed": 0, "total_assignments": 0, "by_icp": {}, "errors": []}
+        row = {"lead_id": leads[0].id, "icp_id": icp.id}
+
+        with patch.object(processor, '_existing_pairs', return_value=set()), \
+             patch.object(processor, 'process_lead_against_icps', new_callable=AsyncMock) as mock_process:
+            mock_process.side_effect = [[row], []]
+
+            await processor._process_chunk(
+                [lead.id for lead in leads], [icp], {icp.id: icp.name}, {}, stats
+            )
+
+        assert mock_db.execute.call_count == 2
+        insert_rows = mock_db.execute.call_args_list[0].args[1]
+        lead_updates = mock_db.execute.call_args_list[1].args[1]
+        assert insert_rows == [row]
+        assert [u["icp_match_count"] for u in lead_updates] == [1, 0]
+        assert {u["processing_status"] for u in lead_updates} == {"processed"}
+        assert stats["leads_processed"] == 2
+        assert stats["total_assignments"] == 1
+        assert stats["by_icp"] == {icp.name: 1}
+        assert stats["errors"] == []
+
+    @pytest.mark.asyncio
+    async def test_failed_lead_marked_as_error(self, processor, mock_db, icp):
+        """A lead that fails to score is recorded without failing the chunk"""
+        leads = [make_lead(), make_lead()]
+        mock_db.query.return_value.all.return_value = leads
+        mock_db.execute = Mock()
+        stats = {"leads_processed": 0, "total_assignments": 0, "by_icp": {}, "errors": []}
+
+        with patch.object(processor, '_existing_pairs', return_value=set()), \
+             patch.object(processor, 'process_lead_against_icps', new_callable=AsyncMock) as mock_process:
+            mock_process.side_effect = [ValueError("bad lead"), []]
+
+            await processor._process_chunk(
+                [lead.id for lead in leads], [icp], {icp.id: icp.name}, {}, stats
+            )
+
+        # Nothing to insert, so only the lead update runs
+        lead_updates = mock_db.execute.call_args.args[1]
+        assert [u["processing_status"] for u in lead_updates] == ["error", "processed"]
+        assert stats["leads_processed"] == 1
+        assert stats["errors"] == [{"lead_id": str(leads[0].id), "error": "bad lead"}]
+
+    @pytest.mark.asyncio
+    async def test_write_failure_marks_whole_chunk(self, processor, mock_db, icp):
+        """If the bulk write fails, the chunk is rolled back and every lead errors"""
+        leads = [make_lead(), make_lead()]
+        mock_db.query.return_value.all.return_value = leads
+        mock_db.execute = Mock(side_effect=Exception("deadlock"))
+        stats = {"leads_processed": 0, "total_assignments": 0, "by_icp": {}, "errors": []}
+
+        with patch.object(processor, '_existing_pairs', return_value=set()), \
+             patch.object(processor, 'process_lead_against_icps', new_callable=AsyncMock) as mock_process:
+            mock_process.return_value = []
+
+            await processor._process_chunk(
+                [lead.id for lead in leads], [icp], {icp.id: icp.name}, {}, stats
+            )
+
+        mock_db.rollback.assert_called_once()
+        assert stats["leads_processed"] == 0
+        assert [e["lead_id"] for e in stats["errors"]] == [str(lead.id) for lead in leads]
+
+
+class TestDeleteAssignments:
+    """Test force-reprocess deletes run in bounded batches"""
+
+    def test_deletes_until_short_batch(self, processor, mock_db):
+        """Batches repeat until one deletes fewer than DELETE_BATCH_SIZE rows"""
+        processor.DELETE_BATCH_SIZE = 2
+        mock_db.execute = Mock(side_effect=[Mock(rowcount=2), Mock(rowcount=2), Mock(rowcount=1)])
+
+        deleted = processor._delete_assignments_for_icp(uuid4())
+
+        assert deleted == 5
+        assert mock_db.execute.call_count == 3
+        assert mock_db.commit.call_count == 3
+
+    def test_nothing_to_delete(self, processor, mock_db):
+        """An ICP without assignments costs a single statement"""
+        mock_db.execute = Mock(return_value=Mock(rowcount=0))
+
+        assert processor._delete_assignments_for_icp(uuid4()) == 0
+        mock_db.execute.assert_called_once()
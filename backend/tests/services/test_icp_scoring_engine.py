@@ -0,0 +1,192 @@
+# tests/services/test_icp_scoring_engine.py
+"""
+Tests for ICPScoringEngine dimension weighting and compiled-ICP caching
+
+Run with: pytest tests/services/test_icp_scoring_engine.py -v
+"""
+
+from datetime import datetime
+from unittest.mock import Mock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.models import Lead, ICP
+from app.services import icp_scoring_engine
+from app.services.icp_scoring_engine import ICPScoringEngine, compile_icp
+
+
+# Industry matches (100); 200 employees against a 500-1000 target scores
+# int(200 / 500 * 80) = 32
+SCORING_RULES = {
+    "target_industries": ["Software"],
+    "ideal_company_size_min": 500,
+    "ideal_company_size_max": 1000,
+}
+
+
+@pytest.fixture
+def engine():
+    """Scoring engine (scoring never touches the session)"""
+    return ICPScoringEngine(Mock())
+
+
+@pytest.fixture
+def lead():
+    """Software company with 200 employees"""
+    return Lead(company_industry="Software", company_employee_count="200")
+
+
+def make_icp(weight_config=None, scoring_rules=None):
+    """ICP with SCORING_RULES and its own id"""
+    return ICP(
+        id=uuid4(),
+        updated_at=datetime(2024, 1, 1),
+        scoring_rules=scoring_rules or SCORING_RULES,
+        weight_config=weight_config
+    )
+
+
+class TestDimensionWeights:
+    """Test how weight_config combines dimension scores"""
+
+    def test_default_weights(self, engine, lead):
+        """Without weight_config, industry (20) and company size (15) are averaged"""
+        result = engine.score_lead(lead, make_icp())
+
+        assert result.score_x100 == round((100 * 20 + 32 * 15) * 100 / 35)
+        assert result.dimensions_scored == 2
+
+    def test_partial_weight_config(self, engine, lead):
+        """Dimensions missing from weight_config get no weight"""
+        result = engine.score_lead(lead, make_icp({"industry": 10}))
+
+        assert result.score == 100
+        assert result.dimensions_scored == 1
+
+    def test_zero_weight_skips_dimension(self, engine, lead):
+        """A zero-weight dimension is neither scored nor counted"""
+        result = engine.score_lead(lead, make_icp({"industry": 0, "company_size": 15}), explain=True)
+
+        assert result.score == 32
+        assert result.dimensions_scored == 1
+        assert "industry" not in result.breakdown
+
+    def test_string_weights_coerced(self, engine, lead):
+        """Numeric strings in weight_config are used as numbers"""
+        result = engine.score_lead(lead, make_icp({"industry": "1", "company_size": "3"}))
+
+        assert result.score == (100 * 1 + 32 * 3) / 4
+
+    def test_non_numeric_weight_ignored(self, engine, lead):
+        """A weight that isn't a number counts as zero"""
+        result = engine.score_lead(lead, make_icp({"industry": "high", "company_size": 15}))
+
+        assert result.score == 32
+        assert result.dimensions_scored == 1
+
+
+class TestExplain:
+    """Test the optional per-dimension breakdown"""
+
+    @pytest.mark.parametrize("weight_config", [None, {"industry": 10}, {"industry": 1, "company_size": 3}])
+    def test_explain_does_not_change_score(self, engine, lead, weight_config):
+        """explain=True and explain=False give the same score and confidence"""
+        icp = make_icp(weight_config)
+
+        plain = engine.score_lead(lead, icp)
+        explained = engine.score_lead(lead, icp, explain=True)
+
+        assert plain.breakdown is None
+        assert set(explained.breakdown) >= {"industry"}
+        assert plain.score_x100 == explained.score_x100
+        assert plain.confidence_x100 == explained.confidence_x100
+
+    def test_score_leads_matches_score_lead(self, engine, lead):
+        """Batch scoring gives the same results as scoring one lead at a time"""
+        icp = make_icp()
+        other = Lead(company_industry="Retail", company_employee_count="700")
+
+        batch = engine.score_leads([lead, other], icp)
+
+        assert [r.score_x100 for r in batch] == [
+            engine.score_lead(lead, icp).score_x100,
+            engine.score_lead(other, icp).score_x100
+        ]
+
+
+class TestCompileICP:
+    """Test the compiled-ICP cache"""
+
+    def test_cached_per_version(self):
+        """The same ICP version compiles once"""
+        icp = make_icp()
+
+        assert compile_icp(icp) is compile_icp(icp)
+
+    def test_recompiled_when_updated(self, engine, lead):
+        """Editing the rules and bumping updated_at picks up the new rules"""
+        icp = make_icp({"industry": 1, "company_size": 1})
+        assert engine.score_lead(lead, icp).score == 66
+
+        icp.scoring_rules = {**SCORING_RULES, "ideal_company_size_min": 100}
+        icp.updated_at = datetime(2024, 2, 1)
+
+        assert engine.score_lead(lead, icp).score == 100
+
+    def test_compiled_rules_are_a_copy(self):
+        """Mutating the ICP's rules in place doesn't leak into the cache"""
+        rules = {"target_industries": ["Software"]}
+        icp = make_icp(scoring_rules=rules)
+
+        compiled = compile_icp(icp)
+        rules["target_industries"].append("Retail")
+
+        assert compiled.rules["target_industries"] == ["Software"]
+
+
+class TestSeniorityDetector:
+    """Test both seniority detection paths agree"""
+
+    TITLES = [
+        "chief technology officer", "vp of sales", "senior director, engineering",
+        "head of marketing", "sr. engineer", "associate", "team lead", "ceo & founder",
+        "software engineer", ""
+    ]
+
+    def test_scan_path(self):
+        """Levels are checked in priority order"""
+        with patch.object(icp_scoring_engine, "AHOCORASICK_AVAILABLE", False):
+            detect = icp_scoring_engine._build_seniority_detector()
+
+        assert detect("senior vp, head of sales") == "vp"
+        assert detect("software engineer") is None
+
+    def test_automaton_path(self):
+        """The Aho-Corasick detector returns the same level as the scan"""
+        pytest.importorskip("ahocorasick")
+
+        with patch.object(icp_scoring_engine, "AHOCORASICK_AVAILABLE", False):
+            scan = icp_scoring_engine._build_seniority_detector()
+        with patch.object(icp_scoring_engine, "AHOCORASICK_AVAILABLE", True):
+            automaton = icp_scoring_engine._build_seniority_detector()
+
+        assert [automaton(t) for t in self.TITLES] == [scan(t) for t in self.TITLES]
+
+
+class TestLeadTechStack:
+    """Test Lead.tech_stack_lc caching"""
+
+    def test_in_place_update_picked_up(self):
+        """Appending to the tech_stack list invalidates the cached lowercase copy"""
+        lead = Lead(enrichment_data={"tech_stack": ["React"]})
+        assert lead.tech_stack_lc == ("react",)
+
+        lead.enrichment_data["tech_stack"].append("HubSpot")
+
+        assert lead.tech_stack_lc == ("react", "hubspot")
+
+    def test_missing_or_invalid_is_empty(self):
+        """A missing or non-list tech_stack gives an empty tuple"""
+        assert Lead(enrichment_data=None).tech_stack_lc == ()
+        assert Lead(enrichment_data={"tech_stack": "React"}).tech_stack_lc == ()
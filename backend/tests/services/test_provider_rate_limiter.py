@@ -0,0 +1,50 @@
+# tests/services/test_provider_rate_limiter.py
+"""
+Tests for ProviderRateLimiter
+
+Run with: pytest tests/services/test_provider_rate_limiter.py -v
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.provider_rate_limiter import ProviderRateLimiter
+
+
+class TestProviderRateLimiter:
+    """Test rate and concurrency limits"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrency_slot_held_until_exit(self):
+        """In-flight requests never exceed max_concurrency"""
+        limiter = ProviderRateLimiter("test", max_rate=1000, max_concurrency=2)
+        in_flight = 0
+        peak = 0
+        
+        async def call():
+            nonlocal in_flight, peak
+            async with limiter:
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+        
+        await asyncio.gather(*(call() for _ in range(6)))
+        
+        assert peak == 2
+        assert limiter.get_stats()["total_requests"] == 6
+    
+    @pytest.mark.asyncio
+    async def test_rate_is_capped(self):
+        """Requests beyond the bucket size wait for refill"""
+        limiter = ProviderRateLimiter("test", max_rate=5, time_period=0.1, max_concurrency=10)
+        
+        start = time.monotonic()
+        for _ in range(10):
+            async with limiter:
+                pass
+        
+        # 5 immediate tokens, 5 more refilled over ~0.1s
+        assert time.monotonic() - start >= 0.08